@@ -0,0 +1,216 @@
+import os
+import tempfile
+
+import numpy as np
+
+from loaders.data_loader import EvaluationLevel
+from loaders.symbol_table import (compact_edges, decode_symbols, edge_keys, empty_edges, encode_symbols,
+                                  keys_to_edges)
+
+KEY_TYPE = np.int64
+
+# Keys sorted in memory before they are written as a sorted run
+RUN_SIZE = 1 << 24
+
+# Keys read from every sorted file at once while merging
+MERGE_BLOCK_SIZE = 1 << 20
+
+ADDED = 'added'
+REMOVED = 'removed'
+
+
+def read_key_blocks(path, block_size=MERGE_BLOCK_SIZE):
+    if os.path.getsize(path) == 0:
+        return
+
+    keys = np.memmap(path, dtype=KEY_TYPE, mode='r')
+    for start in range(0, len(keys), block_size):
+        yield np.array(keys[start:start + block_size])
+    del keys
+
+
+def merge_sorted_blocks(block_iterators):
+    # Walks several sorted key streams side by side, every step yields the keys of all streams up to a common
+    # bound, so equal keys of different streams always arrive in the same step
+    block_iterators = [iter(blocks) for blocks in block_iterators]
+    buffers = [np.empty(0, dtype=KEY_TYPE) for _ in block_iterators]
+    exhausted = [False] * len(block_iterators)
+
+    while True:
+        for index, blocks in enumerate(block_iterators):
+            while len(buffers[index]) == 0 and not exhausted[index]:
+                block = next(blocks, None)
+                if block is None:
+                    exhausted[index] = True
+                else:
+                    buffers[index] = block
+
+        if all(len(buffer) == 0 for buffer in buffers):
+            return
+
+        # Streams that may still deliver keys bound the step by the last key they hold
+        bounds = [buffer[-1] for buffer, is_exhausted in zip(buffers, exhausted) if not is_exhausted]
+        bound = min(bounds) if bounds else max(buffer[-1] for buffer in buffers if len(buffer))
+
+        parts = []
+        for index, buffer in enumerate(buffers):
+            cut = np.searchsorted(buffer, bound, side='right')
+            parts.append(buffer[:cut])
+            buffers[index] = buffer[cut:]
+
+        yield parts
+
+
+class SortedKeyWriter(object):
+    # External sort of edge keys, keys arrive in any order and repeated and end up sorted and distinct in one
+    # file. Runs of at most run_size keys are sorted in memory and merged block by block.
+    def __init__(self, folder, run_size=RUN_SIZE):
+        self.folder = folder
+        self.run_size = run_size
+        self.pending_keys = []
+        self.pending_count = 0
+        self.run_paths = []
+
+    def add_keys(self, keys):
+        self.pending_keys.append(np.asarray(keys, dtype=KEY_TYPE))
+        self.pending_count += len(keys)
+        if self.pending_count >= self.run_size:
+            self.write_run()
+
+    def write_run(self):
+        keys = np.unique(np.concatenate(self.pending_keys)) if self.pending_keys else np.empty(0, dtype=KEY_TYPE)
+        file_descriptor, run_path = tempfile.mkstemp(prefix='run-', suffix='.bin', dir=self.folder)
+        with os.fdopen(file_descriptor, 'wb') as file:
+            keys.tofile(file)
+
+        self.run_paths.append(run_path)
+        self.pending_keys = []
+        self.pending_count = 0
+
+    def finish(self, path):
+        # Write the merged keys to path and return their number
+        if self.pending_keys or not self.run_paths:
+            self.write_run()
+
+        count = 0
+        with open(path, 'wb') as file:
+            for parts in merge_sorted_blocks([read_key_blocks(run_path) for run_path in self.run_paths]):
+                keys = np.unique(np.concatenate(parts))
+                keys.tofile(file)
+                count += len(keys)
+
+        for run_path in self.run_paths:
+            os.remove(run_path)
+        self.run_paths = []
+
+        return count
+
+
+def write_sorted_levels(level_chunks, evaluation_levels, folder, name, run_size=RUN_SIZE):
+    # Sort the streamed edges of every level into a file of distinct keys, returns the path and size per level
+    writers = {evaluation_level: SortedKeyWriter(folder, run_size) for evaluation_level in evaluation_levels}
+    for chunk in level_chunks:
+        for evaluation_level, writer in writers.items():
+            if evaluation_level in chunk:
+                writer.add_keys(edge_keys(chunk[evaluation_level]))
+
+    sorted_levels = {}
+    for evaluation_level, writer in writers.items():
+        path = os.path.join(folder, f"{name}.{evaluation_level.name.lower()}.bin")
+        sorted_levels[evaluation_level] = (path, writer.finish(path))
+
+    return sorted_levels
+
+
+def diff_sorted_files(old_path, new_path, block_size=MERGE_BLOCK_SIZE):
+    # Streaming merge of two sorted key files, yields the removed and added keys block by block
+    for old_keys, new_keys in merge_sorted_blocks([read_key_blocks(old_path, block_size),
+                                                   read_key_blocks(new_path, block_size)]):
+        yield (np.setdiff1d(old_keys, new_keys, assume_unique=True),
+               np.setdiff1d(new_keys, old_keys, assume_unique=True))
+
+
+def diff_snapshots(old_chunks, new_chunks, evaluation_levels, folder=None, run_size=RUN_SIZE):
+    # Edges added and removed between two snapshots given as streams of level chunks interned in the same symbol
+    # table. Only the delta is held in memory, the snapshots are sorted on disk. Returns the delta and the
+    # number of distinct edges of both snapshots per level.
+    with tempfile.TemporaryDirectory(prefix='diff-', dir=folder) as temporary_folder:
+        old_levels = write_sorted_levels(old_chunks, evaluation_levels, temporary_folder, 'old', run_size)
+        new_levels = write_sorted_levels(new_chunks, evaluation_levels, temporary_folder, 'new', run_size)
+
+        delta = EdgeDelta()
+        sizes = {}
+        for evaluation_level in evaluation_levels:
+            (old_path, old_count), (new_path, new_count) = old_levels[evaluation_level], new_levels[evaluation_level]
+            removed_keys, added_keys = [np.empty(0, dtype=KEY_TYPE)], [np.empty(0, dtype=KEY_TYPE)]
+            for removed, added in diff_sorted_files(old_path, new_path):
+                removed_keys.append(removed)
+                added_keys.append(added)
+
+            delta.added[evaluation_level] = keys_to_edges(np.concatenate(added_keys))
+            delta.removed[evaluation_level] = keys_to_edges(np.concatenate(removed_keys))
+            sizes[evaluation_level] = (old_count, new_count)
+
+    return delta, sizes
+
+
+class EdgeDelta(object):
+    # Edges added and removed per level between two snapshots, a whole snapshot is the delta from an empty one.
+    # Stored with the symbols it uses and every edge list as gaps between sorted keys, which compress well.
+    def __init__(self, added=None, removed=None):
+        self.added = added if added is not None else {}
+        self.removed = removed if removed is not None else {}
+
+    def get_levels(self):
+        return [evaluation_level for evaluation_level in EvaluationLevel if
+                evaluation_level in self.added or evaluation_level in self.removed]
+
+    def get_edge_lists(self):
+        return [(f"{kind}_{evaluation_level.name}", edges.get(evaluation_level, empty_edges())) for
+                evaluation_level in self.get_levels() for kind, edges in [(ADDED, self.added),
+                                                                           (REMOVED, self.removed)]]
+
+    def apply(self, levels):
+        # The snapshot this delta leads to from the given one, levels the delta does not know are kept as they are
+        applied_levels = dict(levels)
+        for evaluation_level in self.get_levels():
+            keys = edge_keys(levels.get(evaluation_level, empty_edges()))
+            removed_keys = edge_keys(self.removed.get(evaluation_level, empty_edges()))
+            keys = keys[~np.isin(keys, removed_keys)]
+            added_keys = edge_keys(self.added.get(evaluation_level, empty_edges()))
+            applied_levels[evaluation_level] = keys_to_edges(np.union1d(keys, added_keys))
+
+        return applied_levels
+
+    def store(self, path, symbol_table):
+        edge_lists = self.get_edge_lists()
+
+        # Renumbering keeps the order of the symbol ids, so the keys stay sorted over the local ids
+        ids, local_edges = compact_edges(np.concatenate([edges for _, edges in edge_lists] + [empty_edges()]))
+        symbols, symbol_lengths = encode_symbols(symbol_table.get_symbols(ids))
+
+        arrays = {'symbols': symbols, 'symbol_lengths': symbol_lengths}
+        start = 0
+        for name, edges in edge_lists:
+            keys = np.unique(edge_keys(local_edges[start:start + len(edges)]))
+            arrays[name] = np.diff(keys, prepend=KEY_TYPE(0))
+            start += len(edges)
+
+        # Write to a temporary file first so an interrupted run never leaves a truncated delta
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'wb') as file:
+            np.savez_compressed(file, **arrays)
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path, symbol_table):
+        delta = cls()
+        with np.load(path) as entry:
+            ids = symbol_table.intern_all(decode_symbols(entry['symbols'], entry['symbol_lengths']))
+            for name in entry.files:
+                kind, _, level_name = name.partition('_')
+                if kind in (ADDED, REMOVED):
+                    edges = ids[keys_to_edges(np.cumsum(entry[name]))] if len(entry[name]) else empty_edges()
+                    getattr(delta, kind)[EvaluationLevel[level_name]] = edges
+
+        return delta
@@ -0,0 +1,12 @@
+import numpy as np
+
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+
+
+def mix_keys(keys, seed=0):
+    # SplitMix64 finalizer, spreads packed edge keys uniformly over 64 bits, different seeds give independent hashes
+    with np.errstate(over='ignore'):
+        mixed = keys.astype(np.uint64) + np.uint64((GOLDEN_GAMMA * (seed + 1)) & 0xFFFFFFFFFFFFFFFF)
+        mixed = (mixed ^ (mixed >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        mixed = (mixed ^ (mixed >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return mixed ^ (mixed >> np.uint64(31))
@@ -0,0 +1,48 @@
+import numpy as np
+
+from comparison.membership import MembershipRegions, membership_masks
+
+KEY_TYPE = np.int64
+
+
+class IncrementalComparison(object):
+    # Regions of the comparison of a tool whose edges keep arriving against tools whose edges are all known.
+    # Starts from the regions of the known tools alone and moves every new edge of the growing tool into the
+    # region of the tools sharing it, so the regions are up to date after every block of edges.
+    def __init__(self, key_arrays, tool_index):
+        self.tool_count = len(key_arrays)
+        self.tool_index = tool_index
+        self.tool_bit = np.uint64(1) << np.uint64(tool_index)
+
+        known_key_arrays = [np.empty(0, dtype=KEY_TYPE) if index == tool_index else keys for index, keys in
+                            enumerate(key_arrays)]
+        self.known_keys, self.known_masks = membership_masks(known_key_arrays)
+        self.regions = MembershipRegions.from_masks(self.tool_count, self.known_masks)
+
+        # Distinct keys of the growing tool seen so far, sorted
+        self.seen_keys = np.empty(0, dtype=KEY_TYPE)
+
+    def add_keys(self, keys):
+        # Only the new block is sorted, its unseen keys are found by binary search and inserted at their positions
+        keys = np.unique(np.asarray(keys, dtype=KEY_TYPE))
+        positions = np.searchsorted(self.seen_keys, keys)
+        is_seen = positions < len(self.seen_keys)
+        is_seen[is_seen] = self.seen_keys[positions[is_seen]] == keys[is_seen]
+        keys = keys[~is_seen]
+        if len(keys) == 0:
+            return
+
+        self.seen_keys = np.insert(self.seen_keys, positions[~is_seen], keys)
+
+        # Masks of the known tools for the new keys, zero for keys no other tool found
+        indexes = np.searchsorted(self.known_keys, keys)
+        is_known = indexes < len(self.known_keys)
+        is_known[is_known] = self.known_keys[indexes[is_known]] == keys[is_known]
+        masks = np.zeros(len(keys), dtype=np.uint64)
+        masks[is_known] = self.known_masks[indexes[is_known]]
+
+        self.regions = (self.regions - MembershipRegions.from_masks(self.tool_count, masks[is_known]) +
+                        MembershipRegions.from_masks(self.tool_count, masks | self.tool_bit))
+
+    def get_size(self):
+        return len(self.seen_keys)
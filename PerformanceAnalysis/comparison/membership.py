@@ -0,0 +1,114 @@
+import numpy as np
+
+# Membership masks keep one bit per tool
+MAX_TOOLS = 64
+
+BYTE_POPCOUNTS = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+
+def popcount(masks):
+    masks = np.ascontiguousarray(masks, dtype=np.uint64)
+    return BYTE_POPCOUNTS[masks.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+def membership_masks(key_arrays):
+    # Give every distinct key the bits of the arrays it appears in, the arrays must hold distinct keys
+    if len(key_arrays) > MAX_TOOLS:
+        raise ValueError(f"At most {MAX_TOOLS} tools can be compared, got {len(key_arrays)}")
+
+    all_keys = np.concatenate(key_arrays)
+    if len(all_keys) == 0:
+        return all_keys, np.empty(0, dtype=np.uint64)
+
+    tool_bits = np.repeat(np.left_shift(np.uint64(1), np.arange(len(key_arrays), dtype=np.uint64)),
+                          [len(keys) for keys in key_arrays])
+
+    # Sort once and OR the bits of equal keys together
+    order = np.argsort(all_keys, kind='stable')
+    sorted_keys = all_keys[order]
+    is_start = np.ones(len(sorted_keys), dtype=bool)
+    is_start[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    starts = np.flatnonzero(is_start)
+
+    return sorted_keys[starts], np.bitwise_or.reduceat(tool_bits[order], starts)
+
+
+class MembershipRegions(object):
+    # Number of distinct edges in every region of the Venn diagram of k tools, regions are identified by
+    # the mask of the tools sharing them, only non-empty regions are kept
+    def __init__(self, tool_count, masks=None, counts=None):
+        self.tool_count = tool_count
+        self.masks = masks if masks is not None else np.empty(0, dtype=np.uint64)
+        self.counts = counts if counts is not None else np.empty(0, dtype=np.int64)
+
+    @classmethod
+    def from_masks(cls, tool_count, masks):
+        region_masks, counts = np.unique(masks, return_counts=True)
+        return cls(tool_count, region_masks.astype(np.uint64), counts.astype(np.int64))
+
+    @classmethod
+    def from_key_arrays(cls, key_arrays):
+        _, masks = membership_masks(key_arrays)
+        return cls.from_masks(len(key_arrays), masks)
+
+    def __add__(self, other):
+        # Regions of disjoint edge sets add up
+        masks, inverse = np.unique(np.concatenate([self.masks, other.masks]), return_inverse=True)
+        counts = np.zeros(len(masks), dtype=np.int64)
+        np.add.at(counts, inverse.reshape(-1), np.concatenate([self.counts, other.counts]))
+        return MembershipRegions(self.tool_count, masks, counts)
+
+    def __sub__(self, other):
+        # Regions of a subset of the edges taken out, regions left empty are dropped
+        regions = self + MembershipRegions(other.tool_count, other.masks, -other.counts)
+        non_empty = regions.counts != 0
+        return MembershipRegions(self.tool_count, regions.masks[non_empty], regions.counts[non_empty])
+
+    def get_tool_bit(self, tool_index):
+        return np.uint64(1) << np.uint64(tool_index)
+
+    def get_full_mask(self):
+        return np.uint64((1 << self.tool_count) - 1)
+
+    def get_region_count(self, mask):
+        index = np.searchsorted(self.masks, np.uint64(mask))
+        if index < len(self.masks) and self.masks[index] == mask:
+            return int(self.counts[index])
+
+        return 0
+
+    def get_total_count(self):
+        return int(self.counts.sum())
+
+    def get_sizes(self):
+        return [int(self.counts[(self.masks & self.get_tool_bit(tool_index)) != 0].sum()) for tool_index in
+                range(self.tool_count)]
+
+    def get_unique_counts(self):
+        return [self.get_region_count(self.get_tool_bit(tool_index)) for tool_index in range(self.tool_count)]
+
+    def get_shared_count(self):
+        return self.get_region_count(self.get_full_mask())
+
+    def get_multiplicity_counts(self):
+        # Number of distinct edges found by exactly n tools, indexed by n
+        return np.bincount(popcount(self.masks), weights=self.counts, minlength=self.tool_count + 1).astype(np.int64)
+
+    def get_venn_labels(self, fill=('number', 'percent')):
+        # Labels in the format of pyvenn, keys are one character per tool with the first tool on the left
+        total_count = self.get_total_count()
+        labels = {}
+        for mask in range(1, 1 << self.tool_count):
+            key = ''.join('1' if mask & (1 << tool_index) else '0' for tool_index in range(self.tool_count))
+            count = self.get_region_count(mask)
+
+            label = ''
+            if 'logic' in fill:
+                label += f"{key}: "
+            if 'number' in fill:
+                label += str(count)
+            if 'percent' in fill:
+                label += f"({100.0 * count / total_count if total_count else 0.0:.1f}%)"
+            labels[key] = label
+
+        return labels
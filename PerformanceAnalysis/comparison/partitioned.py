@@ -0,0 +1,130 @@
+import math
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from comparison.hashing import mix_keys
+from comparison.membership import MembershipRegions
+
+KEY_TYPE = np.int64
+
+# Sorting, masks and the concatenated keys need a few times the size of the keys of a partition
+MEMORY_OVERHEAD = 4
+
+# Keys read at once while a partition that does not fit in the budget is split again
+SPLIT_BLOCK_SIZE = 1 << 22
+
+# Partitions made of few, heavily repeated keys can not shrink by splitting, so give up after a few rounds
+MAX_SPLIT_DEPTH = 8
+
+
+def partition_keys(keys, partition_count, seed):
+    # Group the keys by partition, returns the partition of every group and its keys
+    partitions = (mix_keys(keys, seed) % np.uint64(partition_count)).astype(np.int64)
+    order = np.argsort(partitions, kind='stable')
+    counts = np.bincount(partitions, minlength=partition_count)
+    groups = np.split(keys[order], np.cumsum(counts)[:-1])
+
+    return [(partition, group) for partition, group in enumerate(groups) if len(group)]
+
+
+def compare_partition(tool_paths):
+    # Runs in a worker process, keys of a partition may repeat since loaders stream chunks
+    key_arrays = [np.unique(np.fromfile(path, dtype=KEY_TYPE)) if os.path.isfile(path) else np.empty(0, KEY_TYPE)
+                  for path in tool_paths]
+    return MembershipRegions.from_key_arrays(key_arrays)
+
+
+class PartitionedComparison(object):
+    # Compares the edges of several tools without holding them in memory at once. Edge keys are spread over
+    # on-disk partitions by hash, equal keys always land in the same partition, so every partition is compared
+    # on its own and the region counts of all partitions add up to the result of an in-memory comparison.
+    def __init__(self, tool_count, folder=None, partition_count=64, memory_budget=1 << 30, workers=1):
+        self.tool_count = tool_count
+        self.partition_count = partition_count
+        self.memory_budget = memory_budget
+        self.workers = workers
+
+        if folder is not None:
+            os.makedirs(folder, exist_ok=True)
+        self.folder = tempfile.mkdtemp(prefix='partitions-', dir=folder)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def get_partition_path(self, partition, tool_index):
+        return os.path.join(self.folder, f"{partition}.{tool_index}.bin")
+
+    def add_keys(self, tool_index, keys):
+        self.append_keys(tool_index, keys, '', self.partition_count, 0)
+
+    def append_keys(self, tool_index, keys, prefix, partition_count, seed):
+        for partition, group in partition_keys(np.asarray(keys, dtype=KEY_TYPE), partition_count, seed):
+            with open(self.get_partition_path(f"{prefix}{partition}", tool_index), 'ab') as file:
+                group.tofile(file)
+
+    def get_partition_size(self, partition):
+        return sum(os.path.getsize(path) for path in self.get_tool_paths(partition) if os.path.isfile(path))
+
+    def get_tool_paths(self, partition):
+        return [self.get_partition_path(partition, tool_index) for tool_index in range(self.tool_count)]
+
+    def split_partition(self, partition, seed):
+        # Spread a partition that exceeds the budget of a worker over sub-partitions with an independent hash
+        worker_budget = self.memory_budget // self.workers
+        partition_count = max(2, math.ceil(self.get_partition_size(partition) * MEMORY_OVERHEAD / worker_budget))
+
+        for tool_index, path in enumerate(self.get_tool_paths(partition)):
+            if not os.path.isfile(path):
+                continue
+
+            keys = np.memmap(path, dtype=KEY_TYPE, mode='r') if os.path.getsize(path) else np.empty(0, KEY_TYPE)
+            for start in range(0, len(keys), SPLIT_BLOCK_SIZE):
+                self.append_keys(tool_index, np.array(keys[start:start + SPLIT_BLOCK_SIZE]), f"{partition}-",
+                                 partition_count, seed)
+            del keys
+            os.remove(path)
+
+        return [f"{partition}-{sub_partition}" for sub_partition in range(partition_count)]
+
+    def get_fitting_partitions(self):
+        worker_budget = self.memory_budget // self.workers
+
+        partitions = [(str(partition), 1) for partition in range(self.partition_count)]
+        fitting_partitions = []
+        while partitions:
+            partition, seed = partitions.pop()
+            size = self.get_partition_size(partition)
+            if size == 0:
+                continue
+
+            if size * MEMORY_OVERHEAD > worker_budget and seed <= MAX_SPLIT_DEPTH:
+                partitions.extend((sub_partition, seed + 1) for sub_partition in self.split_partition(partition, seed))
+            else:
+                fitting_partitions.append(partition)
+
+        return fitting_partitions
+
+    def compare(self):
+        partitions = self.get_fitting_partitions()
+        tool_paths = [self.get_tool_paths(partition) for partition in partitions]
+
+        regions = MembershipRegions(self.tool_count)
+        if self.workers > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                for partition_regions in executor.map(compare_partition, tool_paths):
+                    regions += partition_regions
+        else:
+            for paths in tool_paths:
+                regions += compare_partition(paths)
+
+        return regions
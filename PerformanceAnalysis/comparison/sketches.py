@@ -0,0 +1,202 @@
+import math
+
+import numpy as np
+
+from comparison.hashing import mix_keys
+from comparison.membership import MembershipRegions
+
+# Error bounds are reported for a 95% confidence interval
+CONFIDENCE_Z = 1.96
+
+HASH_BITS = 64
+
+
+def bit_length(values):
+    # Number of significant bits of every uint64 value
+    values = values.copy()
+    lengths = np.zeros(len(values), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        is_long = values >= np.uint64(1 << shift)
+        lengths[is_long] += shift
+        values[is_long] >>= np.uint64(shift)
+
+    return lengths + (values > 0)
+
+
+class HyperLogLog(object):
+    # Cardinality sketch, 2^precision one byte registers with a relative standard error of 1.04 / sqrt(2^precision)
+    def __init__(self, precision=14, registers=None):
+        self.precision = precision
+        self.registers = registers if registers is not None else np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes):
+        if len(hashes) == 0:
+            return
+
+        # The first bits select the register, the rank is the position of the first set bit in the remaining ones
+        remaining_bits = HASH_BITS - self.precision
+        indexes = (hashes >> np.uint64(remaining_bits)).astype(np.int64)
+        remainders = hashes & np.uint64((1 << remaining_bits) - 1)
+        ranks = (remaining_bits - bit_length(remainders) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, indexes, ranks)
+
+    def merge(self, other):
+        return HyperLogLog(self.precision, np.maximum(self.registers, other.registers))
+
+    def get_estimate(self):
+        register_count = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / register_count)
+        estimate = alpha * register_count ** 2 / np.ldexp(1.0, -self.registers.astype(np.int64)).sum()
+
+        # Linear counting is more accurate for small cardinalities
+        empty_registers = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * register_count and empty_registers:
+            estimate = register_count * math.log(register_count / empty_registers)
+
+        return estimate
+
+    def get_relative_error(self):
+        return 1.04 / math.sqrt(len(self.registers))
+
+
+class MinHashSignature(object):
+    # Bottom-k (KMV) MinHash signature, keeps the k smallest distinct hashes of a set. The k smallest hashes of a
+    # union are a uniform sample of it, and whether a sampled hash belongs to a set is known exactly from the
+    # signature of that set, since it must be among the k smallest of the set as well.
+    def __init__(self, size=4096, hashes=None):
+        self.size = size
+        self.hashes = hashes if hashes is not None else np.empty(0, dtype=np.uint64)
+
+    def is_saturated(self):
+        # Until k distinct hashes were seen the signature holds the whole set
+        return len(self.hashes) >= self.size
+
+    def add_hashes(self, hashes):
+        if self.is_saturated():
+            hashes = hashes[hashes < self.hashes[-1]]
+        self.hashes = np.unique(np.concatenate([self.hashes, hashes]))[:self.size]
+
+    def merge(self, other):
+        return MinHashSignature(self.size, np.union1d(self.hashes, other.hashes)[:self.size])
+
+    def contains(self, hashes):
+        return np.isin(hashes, self.hashes, assume_unique=True)
+
+
+class EdgeSketch(object):
+    # Constant size summary of the edges of one tool
+    def __init__(self, precision=14, signature_size=4096, cardinality=None, signature=None):
+        self.cardinality = cardinality if cardinality is not None else HyperLogLog(precision)
+        self.signature = signature if signature is not None else MinHashSignature(signature_size)
+
+    def add_keys(self, keys):
+        hashes = mix_keys(keys)
+        self.cardinality.add_hashes(hashes)
+        self.signature.add_hashes(hashes)
+
+    def merge(self, other):
+        return EdgeSketch(cardinality=self.cardinality.merge(other.cardinality),
+                          signature=self.signature.merge(other.signature))
+
+    def get_count(self):
+        # Estimated number of distinct edges and its error bound, exact while the signature holds every edge
+        if not self.signature.is_saturated():
+            return len(self.signature.hashes), 0.0
+
+        estimate = self.cardinality.get_estimate()
+        return estimate, CONFIDENCE_Z * self.cardinality.get_relative_error() * estimate
+
+
+def get_fraction(hits, sample_size, exact):
+    # Fraction of a uniform sample and the error bound of its Wilson score interval, which stays meaningful
+    # for small samples and fractions close to 0 or 1
+    if exact:
+        return hits / sample_size if sample_size else 0.0, 0.0
+    if sample_size == 0:
+        return 0.0, 1.0
+
+    fraction = hits / sample_size
+    z_square = CONFIDENCE_Z ** 2
+    center = (fraction + z_square / (2 * sample_size)) / (1 + z_square / sample_size)
+    half_width = CONFIDENCE_Z / (1 + z_square / sample_size) * math.sqrt(
+        fraction * (1 - fraction) / sample_size + z_square / (4 * sample_size ** 2))
+
+    return fraction, max(fraction - (center - half_width), center + half_width - fraction)
+
+
+def get_product(value, value_error, scale, scale_error):
+    # Error bound of a product of two independent estimates
+    return value * scale, math.sqrt((scale * value_error) ** 2 + (value * scale_error) ** 2)
+
+
+class ApproximateComparison(object):
+    # Estimates of the comparison of several tools from their sketches only, every estimate comes as a pair of
+    # the value and its error bound
+    def __init__(self, sketches):
+        self.sketches = sketches
+        self.tool_count = len(sketches)
+
+        self.union = sketches[0]
+        for sketch in sketches[1:]:
+            self.union = self.union.merge(sketch)
+
+        # Membership of every sampled edge of the union
+        self.sample = self.union.signature.hashes
+        self.masks = np.zeros(len(self.sample), dtype=np.uint64)
+        for tool_index, sketch in enumerate(sketches):
+            self.masks[sketch.signature.contains(self.sample)] |= np.uint64(1) << np.uint64(tool_index)
+
+    def get_total_count(self):
+        return self.union.get_count()
+
+    def get_sizes(self):
+        return [sketch.get_count() for sketch in self.sketches]
+
+    def get_unique_fractions(self):
+        # Fraction of the edges of every tool that no other tool found. The signature of a tool is a sample of its
+        # edges, whether another tool found a sampled edge is only known below the largest hash of its signature.
+        fractions = []
+        for tool_index, sketch in enumerate(self.sketches):
+            sample = sketch.signature.hashes
+            others = [other.signature for other_index, other in enumerate(self.sketches) if other_index != tool_index]
+            for other in others:
+                if other.is_saturated():
+                    sample = sample[sample <= other.hashes[-1]]
+
+            is_shared = np.zeros(len(sample), dtype=bool)
+            for other in others:
+                is_shared |= other.contains(sample)
+
+            exact = not sketch.signature.is_saturated() and len(sample) == len(sketch.signature.hashes)
+            fractions.append(get_fraction(int(np.count_nonzero(~is_shared)), len(sample), exact))
+
+        return fractions
+
+    def get_unique_counts(self):
+        return [get_product(fraction, fraction_error, size, size_error) for (fraction, fraction_error), (
+            size, size_error) in zip(self.get_unique_fractions(), self.get_sizes())]
+
+    def get_pairwise_estimates(self):
+        # Jaccard index and intersection size of every pair of tools, from the signature of the pair's union
+        estimates = {}
+        for first in range(self.tool_count):
+            for second in range(first + 1, self.tool_count):
+                union = self.sketches[first].merge(self.sketches[second])
+                sample = union.signature.hashes
+                hits = int(np.count_nonzero(
+                    self.sketches[first].signature.contains(sample) & self.sketches[second].signature.contains(sample)))
+
+                jaccard = get_fraction(hits, len(sample), not union.signature.is_saturated())
+                intersection = get_product(*jaccard, *union.get_count())
+                estimates[(first, second)] = (jaccard, intersection)
+
+        return estimates
+
+    def get_regions(self):
+        # Region counts of the sample scaled to the estimated number of edges, for drawing a Venn diagram
+        total_count, _ = self.get_total_count()
+        regions = MembershipRegions.from_masks(self.tool_count, self.masks)
+        if len(self.sample):
+            regions.counts = np.rint(regions.counts * (total_count / len(self.sample))).astype(np.int64)
+
+        return regions
@@ -0,0 +1,124 @@
+import argparse
+
+from comparison.delta import RUN_SIZE, EdgeDelta, diff_snapshots
+from loaders.data_loader import EvaluationLevel
+from loaders.refexpo import RefExpoDataLoader
+from loaders.symbol_table import SymbolTable, empty_edges
+
+# Deltas and snapshots written by this tool, any other input is read as a RefExpo export
+DELTA_EXTENSION = '.npz'
+
+
+def is_delta_file(path):
+    return path.endswith(DELTA_EXTENSION)
+
+
+def iter_snapshot_chunks(path, evaluation_levels, symbol_table):
+    # RefExpo exports are streamed chunk by chunk, stored snapshots are small enough to come at once
+    if is_delta_file(path):
+        levels = EdgeDelta.load(path, symbol_table).apply({})
+        yield {evaluation_level: levels.get(evaluation_level, empty_edges()) for evaluation_level in evaluation_levels}
+    else:
+        loader = RefExpoDataLoader(None, file_path=path, symbol_table=symbol_table)
+        yield from loader.iter_level_edges(evaluation_levels)
+
+
+def load_snapshot(path, evaluation_levels, symbol_table):
+    if is_delta_file(path):
+        levels = EdgeDelta.load(path, symbol_table).apply({})
+        return {evaluation_level: levels.get(evaluation_level, empty_edges()) for evaluation_level in evaluation_levels}
+
+    return RefExpoDataLoader(None, file_path=path, symbol_table=symbol_table).load_levels(evaluation_levels)
+
+
+def print_edges(delta, evaluation_level, symbol_table):
+    for edge in symbol_table.format_edges(delta.removed.get(evaluation_level, empty_edges())):
+        print(f"- {edge}")
+    for edge in symbol_table.format_edges(delta.added.get(evaluation_level, empty_edges())):
+        print(f"+ {edge}")
+
+
+def run_diff(args, evaluation_levels):
+    symbol_table = SymbolTable()
+    delta, sizes = diff_snapshots(iter_snapshot_chunks(args.old, evaluation_levels, symbol_table),
+                                  iter_snapshot_chunks(args.new, evaluation_levels, symbol_table),
+                                  evaluation_levels, args.temporary_folder, args.run_size)
+
+    for evaluation_level in evaluation_levels:
+        old_count, new_count = sizes[evaluation_level]
+        print(f"{evaluation_level.name} level: {old_count} -> {new_count} edges, "
+              f"{len(delta.added[evaluation_level])} added, {len(delta.removed[evaluation_level])} removed")
+        if args.list:
+            print_edges(delta, evaluation_level, symbol_table)
+
+    if args.output:
+        delta.store(args.output, symbol_table)
+
+
+def run_apply(args):
+    # Rebuild the snapshot a delta leads to and store it as a delta from an empty snapshot
+    symbol_table = SymbolTable()
+    delta = EdgeDelta.load(args.delta, symbol_table)
+    evaluation_levels = delta.get_levels()
+    levels = delta.apply(load_snapshot(args.base, evaluation_levels, symbol_table))
+
+    snapshot = EdgeDelta(added=levels)
+    for evaluation_level in evaluation_levels:
+        print(f"{evaluation_level.name} level: {len(levels[evaluation_level])} edges")
+        if args.list:
+            print_edges(snapshot, evaluation_level, symbol_table)
+
+    if args.output:
+        snapshot.store(args.output, symbol_table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare two RefExpo exports and apply the differences.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    diff_parser = commands.add_parser('diff', help='Find the edges added and removed between two exports')
+    diff_parser.add_argument('old', type=str,
+                             help=f"The older refExpo.csv, compressed or not, or a {DELTA_EXTENSION} snapshot")
+    diff_parser.add_argument('new', type=str,
+                             help=f"The newer refExpo.csv, compressed or not, or a {DELTA_EXTENSION} snapshot")
+
+    diff_parser.add_argument('-e', '--evaluation', type=str, choices=['FILE', 'CLASS', 'METHOD', 'ALL'],
+                             default='ALL', help='The evaluation level to compare, ALL compares every level')
+
+    diff_parser.add_argument('-o', '--output', type=str,
+                             help=f"The {DELTA_EXTENSION} file the delta is written to")
+
+    diff_parser.add_argument('--run-size', type=int, default=RUN_SIZE,
+                             help='The number of edges sorted in memory at once, bounds the memory of the diff')
+
+    diff_parser.add_argument('--temporary-folder', type=str,
+                             help='The folder the sorted edges are spilled to, the system one by default')
+
+    diff_parser.add_argument('-l', '--list', action='store_true',
+                             help='Print every removed and added edge')
+
+    apply_parser = commands.add_parser('apply', help='Rebuild the newer snapshot from the older one and a delta')
+    apply_parser.add_argument('base', type=str,
+                              help=f"The refExpo.csv or {DELTA_EXTENSION} snapshot the delta was taken from")
+    apply_parser.add_argument('delta', type=str, help=f"The {DELTA_EXTENSION} delta written by diff")
+
+    apply_parser.add_argument('-o', '--output', type=str,
+                              help=f"The {DELTA_EXTENSION} file the rebuilt snapshot is written to")
+
+    apply_parser.add_argument('-l', '--list', action='store_true',
+                              help='Print every edge of the rebuilt snapshot')
+
+    args = parser.parse_args()
+
+    if args.command == 'diff':
+        if args.evaluation == 'ALL':
+            evaluation_levels = list(EvaluationLevel)
+        else:
+            evaluation_levels = [EvaluationLevel[args.evaluation]]
+        run_diff(args, evaluation_levels)
+    else:
+        run_apply(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import argparse
+import csv
+import sys
+
+from loaders.data_loader import EvaluationLevel
+from loaders.provenance import ProvenanceIndex, get_provenance_folder
+from loaders.refexpo import RefExpoDataLoader
+from loaders.utils import read_csv_records
+
+# Columns printed for every record unless others are asked for
+LOOKUP_COLUMNS = ['sourcePath', 'sourceLine', 'targetPath', 'targetLine']
+
+
+def create_loader(args):
+    loader = RefExpoDataLoader(args.project, file_path=args.input)
+    if not loader.file_exists():
+        raise FileNotFoundError(f"File not found: {loader.get_file_path()}")
+
+    loader.provenance_index = ProvenanceIndex(get_provenance_folder(loader.get_file_path()))
+    return loader
+
+
+def run_build(loader, args):
+    evaluation_levels = list(EvaluationLevel) if args.evaluation == 'ALL' else [EvaluationLevel[args.evaluation]]
+    if loader.provenance_index.is_current(loader, evaluation_levels):
+        print(f"The index at {loader.provenance_index.folder} is up to date")
+        return
+
+    levels = loader.load_levels_with_provenance(evaluation_levels)
+    for evaluation_level, edges in levels.items():
+        print(f"{evaluation_level.name} level: {len(edges)} edges")
+    print(f"Index written to {loader.provenance_index.folder}")
+
+
+def run_lookup(loader, args):
+    evaluation_level = EvaluationLevel[args.evaluation]
+    if not loader.provenance_index.is_current(loader, [evaluation_level]):
+        raise RuntimeError(f"No current {args.evaluation} index of {loader.get_file_path()}, run build first")
+
+    offsets = loader.provenance_index.lookup(args.source, args.target, evaluation_level)
+    print(f"{len(offsets)} records of {loader.get_file_path()} give {args.source} -> {args.target}", file=sys.stderr)
+
+    records = read_csv_records(loader.get_file_path(), offsets[:args.limit] if args.limit else offsets)
+    writer = csv.DictWriter(sys.stdout, fieldnames=['offset'] + args.columns, extrasaction='ignore')
+    writer.writeheader()
+    for offset, record in zip(offsets, records):
+        writer.writerow(dict(record, offset=offset))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find the RefExpo records an edge comes from.')
+    parser.add_argument('-p', '--project', type=str,
+                        help='The name of the project folder under the data directory holding refExpo.csv')
+
+    parser.add_argument('-i', '--input', type=str,
+                        help='Read the RefExpo export from this path instead of the project folder')
+
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = commands.add_parser('build', help='Parse the export and index the records of every edge')
+    build_parser.add_argument('-e', '--evaluation', type=str, choices=['FILE', 'CLASS', 'METHOD', 'ALL'],
+                              default='ALL', help='The evaluation level to index, ALL indexes every level')
+
+    lookup_parser = commands.add_parser('lookup', help='Print the records an edge comes from')
+    lookup_parser.add_argument('source', type=str, help='The normalized source of the edge')
+    lookup_parser.add_argument('target', type=str, help='The normalized target of the edge')
+    lookup_parser.add_argument('-e', '--evaluation', type=str, choices=['FILE', 'CLASS', 'METHOD'],
+                               default='METHOD', help='The evaluation level of the edge')
+    lookup_parser.add_argument('-c', '--columns', type=str, nargs='+', default=LOOKUP_COLUMNS,
+                               help='The columns of the records to print')
+    lookup_parser.add_argument('-n', '--limit', type=int, help='Print at most this many records')
+
+    args = parser.parse_args()
+
+    if args.project is None and args.input is None:
+        parser.error('either -p/--project or -i/--input is required')
+
+    loader = create_loader(args)
+    if args.command == 'build':
+        run_build(loader, args)
+    else:
+        run_lookup(loader, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import argparse
+import csv
+
+from loaders.data_loader import EvaluationLevel
+from loaders.dependency_finder import DependencyFinderDataLoader
+from loaders.jarviz import JarvizDataLoader
+from loaders.pycg import PyCGDataLoader
+from loaders.pyan import PyanDataLoader
+from loaders.refexpo import RefExpoDataLoader
+from loaders.snoragraph import SonargraphDataLoader
+from loaders.store import EdgeStore, get_store_folder
+from loaders.symbol_table import SymbolTable
+
+TOOL_LOADERS = {
+    'refexpo': RefExpoDataLoader,
+    'jarviz': JarvizDataLoader,
+    'dependencyfinder': DependencyFinderDataLoader,
+    'sonargraph': SonargraphDataLoader,
+    'pyan': PyanDataLoader,
+    'pycg': PyCGDataLoader,
+}
+
+STATS_COLUMNS = ['snapshot', 'edges', 'added', 'removed', 'churn', 'chunks']
+
+
+def get_evaluation_levels(evaluation):
+    return list(EvaluationLevel) if evaluation == 'ALL' else [EvaluationLevel[evaluation]]
+
+
+def run_add(store, args):
+    loader = TOOL_LOADERS[args.tool](args.project, file_path=args.input, symbol_table=store.symbol_table)
+    if not loader.file_exists():
+        raise FileNotFoundError(f"File not found: {loader.get_file_path()}")
+
+    evaluation_levels = [evaluation_level for evaluation_level in get_evaluation_levels(args.evaluation) if
+                         loader.support_evaluation_level(evaluation_level)]
+    levels = {evaluation_level: loader.load(evaluation_level) for evaluation_level in evaluation_levels}
+
+    metadata = dict(item.split('=', 1) for item in args.metadata)
+    metadata.update(tool=loader.get_name(), input=loader.get_file_path())
+
+    written_count, reused_count = store.add_snapshot(args.name, levels, metadata)
+    print(f"Snapshot {args.name}: {written_count} chunks written, {reused_count} chunks shared with other snapshots")
+
+
+def run_list(store):
+    for name in store.get_history():
+        levels = store.get_manifest(name)['levels']
+        counts = ", ".join(f"{level_name} {level['count']}" for level_name, level in levels.items())
+        print(f"{name}: {counts}")
+
+
+def run_materialize(store, args):
+    edges = store.materialize(args.name, EvaluationLevel[args.evaluation])
+    if edges is None:
+        raise KeyError(f"Snapshot {args.name} has no {args.evaluation} level")
+
+    lines = store.symbol_table.format_edges(edges)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.writelines(f"{line}\n" for line in lines)
+    else:
+        for line in lines:
+            print(line)
+
+
+def run_stats(store, args):
+    stats = store.get_history_stats(EvaluationLevel[args.evaluation])
+    if args.output:
+        with open(args.output, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=STATS_COLUMNS)
+            writer.writeheader()
+            writer.writerows(stats)
+        return
+
+    for row in stats:
+        churn = f"{row['churn'] * 100:.2f}%" if row['churn'] is not None else "-"
+        print(f"{row['snapshot']}: {row['edges']} edges, +{row['added']} -{row['removed']}, churn {churn}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Keep the edges of a project across its history in a versioned, '
+                                                 'deduplicated store.')
+    parser.add_argument('-p', '--project', type=str,
+                        help='The name of the project folder under the data directory, its store is kept there')
+
+    parser.add_argument('-s', '--store', type=str,
+                        help='The folder of the store, instead of the one of the project')
+
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add_parser = commands.add_parser('add', help='Store the edges of a tool output as a new snapshot')
+    add_parser.add_argument('name', type=str, help='The name of the snapshot, e.g. a release or a commit')
+    add_parser.add_argument('-t', '--tool', type=str, choices=list(TOOL_LOADERS), default='refexpo',
+                            help='The tool whose output is stored')
+    add_parser.add_argument('-i', '--input', type=str,
+                            help='Read the output of the tool from this path instead of the project folder')
+    add_parser.add_argument('-e', '--evaluation', type=str, choices=['FILE', 'CLASS', 'METHOD', 'ALL'],
+                            default='ALL', help='The evaluation level to store, ALL stores every level of the tool')
+    add_parser.add_argument('-m', '--metadata', action='append', default=[], metavar='KEY=VALUE',
+                            help='Information kept with the snapshot, e.g. commit=abc123')
+
+    commands.add_parser('list', help='List the snapshots in the order they were added')
+
+    materialize_parser = commands.add_parser('materialize', help='Write the edges of a level of a snapshot')
+    materialize_parser.add_argument('name', type=str, help='The name of the snapshot')
+    materialize_parser.add_argument('-e', '--evaluation', type=str, choices=['FILE', 'CLASS', 'METHOD'],
+                                    default='METHOD', help='The evaluation level to write')
+    materialize_parser.add_argument('-o', '--output', type=str,
+                                    help='The file the edges are written to, one per line, instead of printing them')
+
+    stats_parser = commands.add_parser('stats', help='Edge counts and churn of every snapshot against the previous')
+    stats_parser.add_argument('-e', '--evaluation', type=str, choices=['FILE', 'CLASS', 'METHOD'],
+                              default='METHOD', help='The evaluation level to compute the statistics of')
+    stats_parser.add_argument('-o', '--output', type=str, help='A CSV file to write the statistics to')
+
+    remove_parser = commands.add_parser('remove', help='Remove a snapshot and the chunks only it refers to')
+    remove_parser.add_argument('name', type=str, help='The name of the snapshot')
+
+    args = parser.parse_args()
+
+    if args.store is None and args.project is None:
+        parser.error('either -p/--project or -s/--store is required')
+    if args.command == 'add' and args.project is None and args.input is None:
+        parser.error('add needs -p/--project or -i/--input to find the tool output')
+    if args.command == 'add' and any('=' not in item for item in args.metadata):
+        parser.error('metadata should be given as KEY=VALUE')
+
+    store = EdgeStore(args.store or get_store_folder(args.project), SymbolTable())
+
+    if args.command == 'add':
+        run_add(store, args)
+    elif args.command == 'list':
+        run_list(store)
+    elif args.command == 'materialize':
+        run_materialize(store, args)
+    elif args.command == 'stats':
+        run_stats(store, args)
+    else:
+        print(f"Snapshot {args.name} removed with {store.remove_snapshot(args.name)} chunks")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,22 @@
+import argparse
 import glob
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+
+from loaders.state import get_file_fingerprint, load_json_state, store_json_state
+
+# Records the markdown files already extracted, so unchanged ones are skipped
+EXTRACTION_STATE_FILE = '.extracted.json'
+
+CALL_ANNOTATION_PATTERN = re.compile(r'@(?:Direct|Indirect)Call\s*\(([^()]*)\)')
+CALL_NAME_PATTERN = re.compile(r'\bname\s*=\s*"([^"]*)"')
+RESOLVED_TARGETS_PATTERN = re.compile(r'\bresolvedTargets\s*=\s*(\{[^}]*\}|"[^"]*")')
+QUOTED_PATTERN = re.compile(r'"([^"]*)"')
+TYPE_DECLARATION_PATTERN = re.compile(r'\b(?:class|interface|enum)\s+(\w+)')
+METHOD_DECLARATION_PATTERN = re.compile(r'(\w+)\s*\(')
+STRING_LITERAL_PATTERN = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'')
+ORIGINAL_FILE_PATTERN = re.compile(r'^//\s*([\w/]+)/\w+\.java\s*$', re.MULTILINE)
 
 
 def list_md_files(path):
@@ -58,15 +74,138 @@ def create_folder_and_java_files(base_path, file_path, headers, java_blocks):
                 java_file.write(code_with_package)
 
 
-def process_md_files(path):
+def process_md_file(path, file_path):
+    with open(file_path, 'r', encoding='utf-8') as file:
+        content = file.read()
+    headers, java_blocks = extract_level2_headers_and_java_blocks(content)
+    create_folder_and_java_files(path, file_path, headers, java_blocks)
+
+
+def process_md_files(path, workers=1):
+    # Only extract the markdown files that changed since the last run
+    state_path = os.path.join(path, EXTRACTION_STATE_FILE)
+    state = load_json_state(state_path)
+
     md_files = list_md_files(path)
-    for file_path in md_files:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
-        headers, java_blocks = extract_level2_headers_and_java_blocks(content)
-        create_folder_and_java_files(path, file_path, headers, java_blocks)
+    fingerprints = {os.path.basename(file_path): get_file_fingerprint(file_path) for file_path in md_files}
+    changed_files = [file_path for file_path in md_files if
+                     state.get(os.path.basename(file_path)) != fingerprints[os.path.basename(file_path)]]
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(process_md_file, [path] * len(changed_files), changed_files))
+    else:
+        for file_path in changed_files:
+            process_md_file(path, file_path)
+
+    store_json_state(state_path, fingerprints)
+    return changed_files
+
+
+def strip_code(line):
+    # The code of a line without string literals and line comments, so braces in them are not counted
+    return STRING_LITERAL_PATTERN.sub('""', line).split('//', 1)[0]
+
+
+def get_original_packages(code):
+    # Packages of the original JCG files, given by the comment naming every file, e.g. // vc/Class.java
+    return {path.replace('/', '.') for path in ORIGINAL_FILE_PATTERN.findall(code)}
+
+
+def get_type_name(type_descriptor):
+    # Lvc/Class$Inner; -> (vc, Class.Inner)
+    path = type_descriptor.strip()
+    if path.startswith('L') and path.endswith(';'):
+        path = path[1:-1]
+    package_path, _, class_name = path.rpartition('/')
+
+    return package_path.replace('/', '.'), class_name.replace('$', '.')
+
+
+def extract_call_annotations(code):
+    # The calls expected by the commented out JCG annotations as (source class, source method, name, resolved
+    # targets) where targets are type descriptors, the source is the method following the annotations
+    annotations = []
+    pending_calls = []
+    annotation_lines = None
+    types = []
+    depth = 0
+
+    for line in code.splitlines():
+        stripped_line = line.strip()
+        if stripped_line.startswith('//'):
+            comment = stripped_line[2:].strip()
+            if annotation_lines is None and re.match(r'@(?:Direct|Indirect)Calls?\b', comment):
+                annotation_lines = []
+            if annotation_lines is not None:
+                annotation_lines.append(comment)
+                text = ' '.join(annotation_lines)
+                # The annotation ends once its parentheses are balanced
+                if text.count('(') == text.count(')'):
+                    for attributes in CALL_ANNOTATION_PATTERN.findall(text):
+                        name = CALL_NAME_PATTERN.search(attributes)
+                        targets = RESOLVED_TARGETS_PATTERN.search(attributes)
+                        if name and targets:
+                            pending_calls.append((name.group(1), QUOTED_PATTERN.findall(targets.group(1))))
+                    annotation_lines = None
+            continue
+
+        code_line = strip_code(line)
+        if pending_calls and code_line.strip() and not code_line.strip().startswith('@'):
+            method = METHOD_DECLARATION_PATTERN.search(code_line)
+            if method and types:
+                source_class = '.'.join(name for name, _, _ in types)
+                source_method = method.group(1)
+                if source_method == types[-1][0]:
+                    source_method = '<init>'
+                for name, targets in pending_calls:
+                    annotations.append((source_class, source_method, name, targets))
+            pending_calls = []
+
+        # Track the types enclosing the current line by the brace depth they were declared at
+        type_declaration = TYPE_DECLARATION_PATTERN.search(code_line)
+        if type_declaration:
+            types.append([type_declaration.group(1), depth, '{' in code_line[type_declaration.end():]])
+        depth += code_line.count('{') - code_line.count('}')
+        if types and depth > types[-1][1]:
+            types[-1][2] = True
+        while types and types[-1][2] and depth <= types[-1][1]:
+            types.pop()
+
+    return annotations
+
+
+def extract_expected_calls(code, package_name):
+    # Expected (source, target) method edges of a test case and the (source, name) call sites they answer for
+    original_packages = get_original_packages(code)
+    edges = []
+    call_sites = []
+    for source_class, source_method, name, targets in extract_call_annotations(code):
+        source = f"{package_name}.{source_class}.{source_method}"
+        call_sites.append((source, name))
+        for target in targets:
+            target_package, target_class = get_type_name(target)
+            # Classes of the test case were moved into its package when it was extracted
+            if target_package in original_packages or not target_package:
+                target_package = package_name
+            edges.append((source, f"{target_package}.{target_class}.{name}"))
+
+    return edges, call_sites
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract the Java test cases of JCG markdown files.')
+    parser.add_argument('path', type=str,
+                        help='The folder of the markdown files, test cases are extracted next to them')
+
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='The number of processes extracting markdown files')
+
+    args = parser.parse_args()
+
+    changed_files = process_md_files(args.path, args.workers)
+    print(f"Extracted {len(changed_files)} changed markdown files")
 
 
-# Example usage
-path = '/home/vahid/Desktop/DependencyExtraction/jcg/jcg_testcases/src/main/resources'
-process_md_files(path)
+if __name__ == "__main__":
+    main()
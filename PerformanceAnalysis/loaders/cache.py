@@ -0,0 +1,138 @@
+import hashlib
+import io
+import json
+import os
+import shutil
+
+import numpy as np
+
+from loaders.symbol_table import compact_edges, decode_symbols, encode_symbols
+
+CACHE_FOLDER = '.cache'
+CACHE_FORMAT_VERSION = 2
+FINGERPRINTS_FOLDER = 'fingerprints'
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def get_cache_folder(project, data_folder='data'):
+    return os.path.join(data_folder, project, CACHE_FOLDER)
+
+
+class EdgeCache(object):
+    def __init__(self, folder):
+        self.folder = folder
+
+    def purge(self):
+        if os.path.isdir(self.folder):
+            shutil.rmtree(self.folder)
+
+    def load(self, loader, evaluation_levels):
+        key = self.get_key(loader)
+
+        levels = {}
+        for evaluation_level in evaluation_levels:
+            entry_path = self.get_entry_path(loader, evaluation_level, key)
+            if not os.path.isfile(entry_path):
+                return None
+
+            with open(entry_path, 'rb') as file:
+                levels[evaluation_level] = self.decode_edges(file.read(), loader.symbol_table)
+
+        return levels
+
+    def store(self, loader, levels):
+        key = self.get_key(loader)
+        os.makedirs(self.folder, exist_ok=True)
+
+        for evaluation_level, edges in levels.items():
+            self.remove_stale_entries(loader, evaluation_level)
+
+            # Write to a temporary file first so an interrupted run never leaves a truncated entry, and processes
+            # storing the same entry at once do not write into each other's file
+            entry_path = self.get_entry_path(loader, evaluation_level, key)
+            temporary_path = f"{entry_path}.{os.getpid()}.tmp"
+            with open(temporary_path, 'wb') as file:
+                file.write(self.encode_edges(edges, loader.symbol_table))
+            os.replace(temporary_path, entry_path)
+
+    def get_key(self, loader):
+        size, mtime, content_hash = self.get_fingerprint(loader.get_file_path())
+        key = f"{CACHE_FORMAT_VERSION}:{type(loader).__name__}:{loader.version}:{size}:{mtime}:{content_hash}"
+        for dependency_path in loader.get_dependency_paths():
+            dependency_fingerprint = self.get_fingerprint(dependency_path) if os.path.isfile(dependency_path) else None
+            key += f":{dependency_fingerprint}"
+
+        return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+    def get_fingerprint(self, file_path):
+        stat = os.stat(file_path)
+
+        # Hashing multi-GB inputs is slow, so reuse the hash while size and mtime are unchanged
+        fingerprint = self.load_fingerprint(file_path)
+        if fingerprint is not None and fingerprint['size'] == stat.st_size and fingerprint['mtime'] == stat.st_mtime_ns:
+            return stat.st_size, stat.st_mtime_ns, fingerprint['hash']
+
+        content_hash = self.hash_file(file_path)
+        self.store_fingerprint(file_path, {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'hash': content_hash})
+
+        return stat.st_size, stat.st_mtime_ns, content_hash
+
+    def hash_file(self, file_path):
+        content_hash = hashlib.blake2b()
+        with open(file_path, 'rb') as file:
+            while block := file.read(HASH_BLOCK_SIZE):
+                content_hash.update(block)
+
+        return content_hash.hexdigest()
+
+    def get_fingerprint_path(self, file_path):
+        # Every input has its own fingerprint file, so loaders running in parallel never overwrite each other's
+        path_hash = hashlib.blake2b(os.path.abspath(file_path).encode('utf-8'), digest_size=16).hexdigest()
+        return os.path.join(self.folder, FINGERPRINTS_FOLDER, f"{path_hash}.json")
+
+    def load_fingerprint(self, file_path):
+        fingerprint_path = self.get_fingerprint_path(file_path)
+        if not os.path.isfile(fingerprint_path):
+            return None
+
+        with open(fingerprint_path, 'r') as file:
+            fingerprint = json.load(file)
+
+        # Guard against another path hashing to the same file name
+        return fingerprint if fingerprint['path'] == os.path.abspath(file_path) else None
+
+    def store_fingerprint(self, file_path, fingerprint):
+        fingerprint_path = self.get_fingerprint_path(file_path)
+        os.makedirs(os.path.dirname(fingerprint_path), exist_ok=True)
+
+        # Replace the file at once so readers in other processes never see it half written
+        temporary_path = f"{fingerprint_path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'w') as file:
+            json.dump(dict(fingerprint, path=os.path.abspath(file_path)), file)
+        os.replace(temporary_path, fingerprint_path)
+
+    def get_entry_prefix(self, loader, evaluation_level):
+        return f"{loader.get_file_name()}.{evaluation_level.name.lower()}."
+
+    def get_entry_path(self, loader, evaluation_level, key):
+        return os.path.join(self.folder, f"{self.get_entry_prefix(loader, evaluation_level)}{key}.bin")
+
+    def remove_stale_entries(self, loader, evaluation_level):
+        prefix = self.get_entry_prefix(loader, evaluation_level)
+        for file_name in os.listdir(self.folder):
+            if file_name.startswith(prefix) and not file_name.endswith('.tmp'):
+                os.remove(os.path.join(self.folder, file_name))
+
+    def encode_edges(self, edges, symbol_table):
+        # Symbol ids are only meaningful within a run, so store the used symbols with edges renumbered over them
+        ids, local_edges = compact_edges(edges)
+        symbols, symbol_lengths = encode_symbols(symbol_table.get_symbols(ids))
+
+        data = io.BytesIO()
+        np.savez_compressed(data, symbols=symbols, symbol_lengths=symbol_lengths, edges=local_edges)
+        return data.getvalue()
+
+    def decode_edges(self, data, symbol_table):
+        with np.load(io.BytesIO(data)) as entry:
+            symbols = decode_symbols(entry['symbols'], entry['symbol_lengths'])
+            return symbol_table.import_edges(symbols, entry['edges'])
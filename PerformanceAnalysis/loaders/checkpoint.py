@@ -0,0 +1,87 @@
+import io
+import json
+import os
+
+import numpy as np
+
+from loaders.symbol_table import compact_edges, decode_symbols, empty_edges, encode_symbols
+
+CHECKPOINT_FOLDER = '.checkpoints'
+
+# Seconds between two checkpoints of a parse
+CHECKPOINT_INTERVAL = 300
+
+
+class Checkpoint(object):
+    # The state of an unfinished parse: the position in the input to continue from and the distinct edges of every
+    # level parsed before it. It is kept in a hidden folder next to the input and only resumed while the input, the
+    # loader and the levels are the same as when it was written.
+    def __init__(self, loader, evaluation_levels):
+        self.loader = loader
+        self.evaluation_levels = evaluation_levels
+
+        file_path = os.path.abspath(loader.get_file_path())
+        level_names = "-".join(evaluation_level.name.lower() for evaluation_level in evaluation_levels)
+        self.path = os.path.join(os.path.dirname(file_path), CHECKPOINT_FOLDER,
+                                 f"{os.path.basename(file_path)}.{level_names}.npz")
+
+    def get_key(self):
+        stat = os.stat(self.loader.get_file_path())
+        return {
+            'loader': type(self.loader).__name__,
+            'version': self.loader.version,
+            'levels': [evaluation_level.name for evaluation_level in self.evaluation_levels],
+            'size': stat.st_size,
+            'mtime': stat.st_mtime_ns,
+        }
+
+    def exists(self):
+        return os.path.isfile(self.path)
+
+    def load(self):
+        # The position and the level edges of the checkpoint, None when there is none for the current input
+        if not self.exists():
+            return None
+
+        with np.load(self.path) as entry:
+            state = json.loads(entry['state'].tobytes().decode('utf-8'))
+            if state['key'] != self.get_key():
+                return None
+
+            symbols = decode_symbols(entry['symbols'], entry['symbol_lengths'])
+            edges = self.loader.symbol_table.import_edges(symbols, entry['edges'])
+
+        levels = {}
+        start = 0
+        for evaluation_level, count in zip(self.evaluation_levels, state['counts']):
+            levels[evaluation_level] = edges[start:start + count]
+            start += count
+
+        return state['position'], levels
+
+    def store(self, position, levels):
+        # Symbol ids are only meaningful within a run, so store the used symbols with edges renumbered over them
+        edges = [levels[evaluation_level] for evaluation_level in self.evaluation_levels]
+        ids, local_edges = compact_edges(np.concatenate(edges + [empty_edges()]))
+        symbols, symbol_lengths = encode_symbols(self.loader.symbol_table.get_symbols(ids))
+
+        state = {'key': self.get_key(), 'position': position, 'counts': [len(level_edges) for level_edges in edges]}
+        data = io.BytesIO()
+        np.savez(data, state=np.frombuffer(json.dumps(state).encode('utf-8'), dtype=np.uint8), symbols=symbols,
+                 symbol_lengths=symbol_lengths, edges=local_edges)
+
+        # Replace the previous checkpoint at once, a run interrupted while writing still finds the previous one
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'wb') as file:
+            file.write(data.getvalue())
+        os.replace(temporary_path, self.path)
+
+    def remove(self):
+        if self.exists():
+            os.remove(self.path)
+
+        # Leave no empty folder behind next to the input
+        folder = os.path.dirname(self.path)
+        if os.path.isdir(folder) and not os.listdir(folder):
+            os.rmdir(folder)
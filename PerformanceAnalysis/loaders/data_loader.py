@@ -1,6 +1,11 @@
 import os
+import time
 from enum import Enum
 
+from loaders.checkpoint import Checkpoint
+from loaders.symbol_table import SymbolTable, concatenate_edges, unique_edges
+from loaders.utils import COMPRESSED_EXTENSIONS, STDIN_PATH, input_exists, is_plain_file, open_input
+
 
 class EvaluationLevel(Enum):
     FILE = 1
@@ -9,19 +14,72 @@ class EvaluationLevel(Enum):
 
 
 class DataLoader(object):
-    def __init__(self, project, data_folder='data'):
+    # Bump whenever the normalized output of a loader changes to invalidate its cached edges
+    version = 2
+
+    # Loaders that can continue a parse from a position in their input implement iter_positioned_chunks
+    resumable = False
+
+    def __init__(self, project, data_folder='data', cache=None, file_path=None, symbol_table=None,
+                 checkpoint_interval=None, resume=False):
         self.project = project
         self.data_folder = data_folder
+        self.cache = cache
+        # Loaders whose edges are compared must share the same symbol table
+        self.symbol_table = symbol_table if symbol_table is not None else SymbolTable()
+        # Overrides the file looked up in the project folder, '-' reads the standard input
+        self.file_path = file_path
+        # Seconds between checkpoints of a parse, None never writes any
+        self.checkpoint_interval = checkpoint_interval
+        # Continue from the checkpoint of an interrupted parse instead of starting over
+        self.resume = resume
+        self.loaded_levels = {}
+
+    def __getstate__(self):
+        # Symbol ids are private to a process, a loader sent to another process starts with an empty symbol table
+        state = dict(self.__dict__)
+        state['symbol_table'] = None
+        state['loaded_levels'] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.symbol_table = SymbolTable()
 
     def file_exists(self):
-        return os.path.isfile(self.get_file_path())
+        return input_exists(self.get_file_path())
 
     def get_file_path(self):
-        return os.path.join(self.data_folder, self.project, self.get_file_name())
+        if self.file_path is not None:
+            return self.file_path
+
+        # Prefer the plain file and fall back to its compressed variants
+        file_path = os.path.join(self.data_folder, self.project, self.get_file_name())
+        for candidate in [file_path] + [file_path + extension for extension in COMPRESSED_EXTENSIONS]:
+            if os.path.isfile(candidate):
+                return candidate
+
+        return file_path
+
+    def is_stdin(self):
+        return self.get_file_path() == STDIN_PATH
+
+    def is_plain_file(self):
+        return is_plain_file(self.get_file_path())
+
+    def open_file(self, text=False):
+        return open_input(self.get_file_path(), text)
+
+    def get_paths_file_path(self):
+        return os.path.join(self.data_folder, self.project, "paths.txt")
+
+    def get_dependency_paths(self):
+        # Files besides the input that the normalized output depends on, they are part of the cache key
+        return []
 
     def get_paths(self):
         paths = []
-        with open(os.path.join(self.data_folder, self.project, "paths.txt"), 'r') as file:
+        with open(self.get_paths_file_path(), 'r') as file:
             for line in file:
                 if line.startswith("./"):
                     line = line.replace("./", "", 1)
@@ -41,5 +99,116 @@ class DataLoader(object):
     def support_evaluation_level(self, evaluation_level: EvaluationLevel):
         raise NotImplementedError
 
+    def get_supported_evaluation_levels(self):
+        return [level for level in EvaluationLevel if self.support_evaluation_level(level)]
+
+    def get_level_passes(self):
+        # Groups of evaluation levels that come out of the same parse of the input file
+        return [self.get_supported_evaluation_levels()]
+
     def load(self, evaluation_level: EvaluationLevel):
+        if not self.support_evaluation_level(evaluation_level):
+            return None
+
+        # Parse the input once for all the levels sharing the pass and keep the results
+        if evaluation_level not in self.loaded_levels:
+            for evaluation_levels in self.get_level_passes():
+                if evaluation_level in evaluation_levels:
+                    self.loaded_levels.update(self.load_pass(evaluation_levels))
+                    break
+
+        return self.loaded_levels.get(evaluation_level)
+
+    def load_all_levels(self):
+        for evaluation_level in self.get_supported_evaluation_levels():
+            self.load(evaluation_level)
+
+        return dict(self.loaded_levels)
+
+    def load_pass(self, evaluation_levels):
+        # The standard input has no fingerprint to key the cache on
+        use_cache = self.cache is not None and not self.is_stdin()
+        if use_cache:
+            levels = self.cache.load(self, evaluation_levels)
+            if levels is not None:
+                return levels
+
+        levels = self.load_levels(evaluation_levels)
+        if use_cache:
+            self.cache.store(self, levels)
+
+        return levels
+
+    def use_checkpoints(self):
+        # Checkpoints need an input that can be read again from a position and a folder next to it to be written to
+        return self.resumable and self.checkpoint_interval is not None and not self.is_stdin() and os.access(
+            os.path.dirname(os.path.abspath(self.get_file_path())), os.W_OK)
+
+    def load_levels(self, evaluation_levels):
+        # Parse the input file once and return the distinct edges of the given levels keyed by level
+        if self.use_checkpoints():
+            return self.load_levels_with_checkpoints(evaluation_levels)
+
+        level_edges = {evaluation_level: [] for evaluation_level in evaluation_levels}
+        for chunk in self.iter_level_chunks(evaluation_levels):
+            for evaluation_level in evaluation_levels:
+                level_edges[evaluation_level].append(chunk[evaluation_level])
+
+        return {evaluation_level: unique_edges(concatenate_edges(edges)) for evaluation_level, edges in
+                level_edges.items()}
+
+    def load_levels_with_checkpoints(self, evaluation_levels):
+        # Parse like load_levels and store the distinct edges found so far with the position reached every
+        # checkpoint interval, a resumed parse starts from the last checkpoint
+        checkpoint = Checkpoint(self, evaluation_levels)
+        level_edges = {evaluation_level: [] for evaluation_level in evaluation_levels}
+        position = None
+        restored = checkpoint.load() if self.resume else None
+        if restored is not None:
+            position, levels = restored
+            for evaluation_level, edges in levels.items():
+                level_edges[evaluation_level].append(edges)
+            print(f"Resuming {self.get_name()} from byte {position['offset']} of {self.get_file_path()}")
+
+        last_checkpoint = time.monotonic()
+        for chunk, position in self.iter_positioned_chunks(evaluation_levels, position):
+            for evaluation_level in evaluation_levels:
+                level_edges[evaluation_level].append(chunk[evaluation_level])
+
+            # Chunks ending inside a record have no position to resume from
+            if position is not None and time.monotonic() - last_checkpoint >= self.checkpoint_interval:
+                levels = {evaluation_level: unique_edges(concatenate_edges(edges)) for evaluation_level, edges in
+                          level_edges.items()}
+                checkpoint.store(position, levels)
+                level_edges = {evaluation_level: [edges] for evaluation_level, edges in levels.items()}
+                last_checkpoint = time.monotonic()
+
+        checkpoint.remove()
+        return {evaluation_level: unique_edges(concatenate_edges(edges)) for evaluation_level, edges in
+                level_edges.items()}
+
+    def iter_edges(self, evaluation_level: EvaluationLevel):
+        # Stream the edges of a level chunk by chunk without keeping them, chunks may repeat edges
+        for chunk in self.iter_level_edges([evaluation_level]):
+            yield chunk[evaluation_level]
+
+    def iter_level_edges(self, evaluation_levels):
+        # Stream the edges of several levels keyed by level, parsing the input once per pass
+        for pass_levels in self.get_level_passes():
+            levels = [evaluation_level for evaluation_level in pass_levels if evaluation_level in evaluation_levels]
+            if levels:
+                for chunk in self.iter_level_chunks(levels):
+                    yield {evaluation_level: chunk[evaluation_level] for evaluation_level in levels}
+
+    def iter_level_chunks(self, evaluation_levels):
+        # Yield the edges of at least the given levels, as (source, target) symbol id arrays keyed by level, chunk
+        # by chunk
+        raise NotImplementedError
+
+    def iter_positioned_chunks(self, evaluation_levels, position=None):
+        # Like iter_level_chunks from a position returned before, every chunk comes with the position right after
+        # it, or None when the parse cannot be continued from there
         raise NotImplementedError
+
+    def create_edges(self, sources, targets):
+        return self.symbol_table.create_edges(sources, targets)
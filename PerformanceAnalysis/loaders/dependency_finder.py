@@ -1,11 +1,24 @@
-import os
 import re
 import xml.etree.ElementTree as ET
+from xml.sax.saxutils import quoteattr
 
 from loaders.data_loader import DataLoader, EvaluationLevel
+from loaders.utils import skip_input
+
+ANONYMOUS_CLASS_PATTERN = re.compile(r'\.\d+?')
+
+# Bytes fed to the parser at once when the parse can be resumed, blocks are extended to the end of a class
+XML_BLOCK_SIZE = 1 << 20
+CLASS_END_LINES = {b'</class>', b'</package>'}
+
+# Between two classes only the document and a package element are open
+RESUMABLE_DEPTH = 2
 
 
 class DependencyFinderDataLoader(DataLoader):
+    # Files are the outer classes of both ends, edges inside a file are dropped
+    version = DataLoader.version + 1
+    resumable = True
 
     def get_name(self):
         return "Dependency Finder"
@@ -14,28 +27,12 @@ class DependencyFinderDataLoader(DataLoader):
         return 'dependencyFinder.xml'
 
     def support_evaluation_level(self, evaluation_level):
-        return evaluation_level == EvaluationLevel.CLASS
-
-    def load(self, evaluation_level):
-        if evaluation_level == EvaluationLevel.CLASS:
-            return self.load_class_data()
-        else:
-            return None
-
-    def load_xml_file(self):
-        # Check if the file exists
-        file_path = self.get_file_path()
-
-        if not self.file_exists():
-            print(f"File not found: {file_path}")
-            return None
-
-        # Load the XML file using Pandas
-        tree = ET.parse(file_path)
-        root = tree.getroot()
+        # Files are named by the outer classes of the related classes
+        return evaluation_level in [EvaluationLevel.FILE, EvaluationLevel.CLASS]
 
-        # Return the DataFrame
-        return root
+    def __init__(self, project, chunk_size=500_000, **kwargs):
+        super().__init__(project, **kwargs)
+        self.chunk_size = chunk_size
 
     def extract_class_name_from_feature(self, feature_reference, feature=True):
         # Find the position of the opening parenthesis
@@ -57,39 +54,160 @@ class DependencyFinderDataLoader(DataLoader):
         return feature_reference
 
     def load_class_data(self):
-        # Construct the full file path
-
-        root = self.load_xml_file()
-
-        class_inbound_relations = []
-
-        for package in root.findall('.//package'):
-            # Check if the package is confirmed
-            if package.attrib.get('confirmed') != 'yes':
-                continue  # Skip unconfirmed packages
-
-            for class_element in package.findall('.//class'):
-                # Check if the class is confirmed
-                if class_element.attrib.get('confirmed') != 'yes':
-                    continue  # Skip unconfirmed classes
-
-                class_name = class_element.find('name').text if class_element.find(
-                    'name') is not None else 'Unnamed Class'
-                class_name = self.extract_class_name_from_feature(class_name, False)
-                inbound_elements = class_element.findall('inbound')
-                for inbound in inbound_elements:
-                    # Check if the inbound reference is confirmed
-                    if inbound.attrib.get('confirmed') != 'yes':
-                        continue  # Skip unconfirmed inbound references
+        return self.load(EvaluationLevel.CLASS)
+
+    def load_file_data(self):
+        return self.load(EvaluationLevel.FILE)
+
+    def iter_level_chunks(self, evaluation_levels):
+        sources, targets = [], []
+        for source, target in self.iter_class_relations():
+            sources.append(source)
+            targets.append(target)
+
+            if len(sources) >= self.chunk_size:
+                yield self.create_level_edges(sources, targets)
+                sources, targets = [], []
+
+        yield self.create_level_edges(sources, targets)
+
+    def iter_positioned_chunks(self, evaluation_levels, position=None):
+        # Chunks end between two classes only, where the parse can be started again
+        sources, targets = [], []
+        for relations, position in self.iter_class_relation_blocks(position):
+            for source, target in relations:
+                sources.append(source)
+                targets.append(target)
+
+            if len(sources) >= self.chunk_size and position is not None:
+                yield self.create_level_edges(sources, targets), position
+                sources, targets = [], []
+
+        yield self.create_level_edges(sources, targets), position
+
+    def create_level_edges(self, sources, targets):
+        # Relations keep the '$' of nested classes, classes are named with dots and files by their outer class
+        file_sources, file_targets = [], []
+        for source, target in zip(sources, targets):
+            source_file = self.get_outer_class(source)
+            target_file = self.get_outer_class(target)
+            if source_file != target_file:
+                file_sources.append(source_file)
+                file_targets.append(target_file)
+
+        return {
+            EvaluationLevel.FILE: self.create_edges(file_sources, file_targets),
+            EvaluationLevel.CLASS: self.create_edges([source.replace("$", ".") for source in sources],
+                                                     [target.replace("$", ".") for target in targets]),
+        }
+
+    def get_outer_class(self, class_name):
+        return class_name.split('$', 1)[0]
+
+    def iter_class_relations(self):
+        # Check if the file exists
+        file_path = self.get_file_path()
 
-                    inbound_reference = inbound.text if inbound.text is not None else 'Unknown Reference'
-                    if inbound.attrib.get('type') == 'feature':  # Check if it's a feature
-                        inbound_reference = self.extract_class_name_from_feature(inbound_reference)
-                    relation_str = f"{inbound_reference}->{class_name}"
+        if not self.file_exists():
+            print(f"File not found: {file_path}")
+            return
 
-                    relation_str = relation_str.replace("$", ".")
+        with self.open_file() as file:
+            yield from self.iter_xml_class_relations(file)
 
-                    if not re.search(r'\.\d+?', relation_str):
-                        class_inbound_relations.append(relation_str)
+    def iter_class_relation_blocks(self, position=None):
+        # Feed the XML file block by block and yield the relations of the classes closed in every block, with the
+        # position to continue from after it, or None when the block does not end between two classes. A position
+        # holds the byte offset and the elements open there, which are opened again before reading on.
+        file_path = self.get_file_path()
 
-        return class_inbound_relations
+        if not self.file_exists():
+            print(f"File not found: {file_path}")
+            return
+
+        parser = ET.XMLPullParser(events=('start', 'end'))
+        open_elements = []
+        package_confirmations = []
+        offset = 0
+        with self.open_file() as file:
+            if position is not None:
+                offset = position['offset']
+                skip_input(file, file_path, offset)
+                parser.feed("".join(f"<{tag}{''.join(f' {name}={quoteattr(value)}' for name, value in attributes)}>"
+                                    for tag, attributes in position['open_elements']).encode('utf-8'))
+
+            while block := file.read(XML_BLOCK_SIZE):
+                # Dependency Finder writes a tag per line, so a block ending on a closing class line ends between
+                # two classes
+                lines = [block]
+                while line := file.readline():
+                    lines.append(line)
+                    if line.strip() in CLASS_END_LINES:
+                        break
+                block = b"".join(lines)
+                offset += len(block)
+                parser.feed(block)
+                relations = list(self.process_xml_events(parser.read_events(), open_elements, package_confirmations))
+
+                if len(open_elements) <= RESUMABLE_DEPTH and block.rstrip().endswith(b'>'):
+                    yield relations, {'offset': offset, 'open_elements': [
+                        [element.tag, list(element.attrib.items())] for element in open_elements]}
+                else:
+                    yield relations, None
+
+            parser.close()
+            yield list(self.process_xml_events(parser.read_events(), open_elements, package_confirmations)), None
+
+    def iter_xml_class_relations(self, file):
+        # Stream the XML file and handle every class as soon as it is closed, so the tree never
+        # holds more than the class being processed
+        open_elements = []
+        package_confirmations = []
+        yield from self.process_xml_events(ET.iterparse(file, events=('start', 'end')), open_elements,
+                                           package_confirmations)
+
+    def process_xml_events(self, events, open_elements, package_confirmations):
+        for event, element in events:
+            if event == 'start':
+                open_elements.append(element)
+                if element.tag == 'package':
+                    package_confirmations.append(element.attrib.get('confirmed') == 'yes')
+                continue
+
+            open_elements.pop()
+            if element.tag == 'class':
+                # Skip classes of unconfirmed packages
+                if any(package_confirmations):
+                    yield from self.extract_class_relations(element)
+            elif element.tag == 'package':
+                package_confirmations.pop()
+            else:
+                continue
+
+            # Free the processed element
+            element.clear()
+            if open_elements:
+                open_elements[-1].remove(element)
+
+    def extract_class_relations(self, class_element):
+        # Check if the class is confirmed
+        if class_element.attrib.get('confirmed') != 'yes':
+            return  # Skip unconfirmed classes
+
+        class_name = class_element.find('name').text if class_element.find(
+            'name') is not None else 'Unnamed Class'
+        class_name = self.extract_class_name_from_feature(class_name, False)
+        inbound_elements = class_element.findall('inbound')
+        for inbound in inbound_elements:
+            # Check if the inbound reference is confirmed
+            if inbound.attrib.get('confirmed') != 'yes':
+                continue  # Skip unconfirmed inbound references
+
+            inbound_reference = inbound.text if inbound.text is not None else 'Unknown Reference'
+            if inbound.attrib.get('type') == 'feature':  # Check if it's a feature
+                inbound_reference = self.extract_class_name_from_feature(inbound_reference)
+            source = inbound_reference.replace("$", ".")
+            target = class_name.replace("$", ".")
+
+            if not ANONYMOUS_CLASS_PATTERN.search(source) and not ANONYMOUS_CLASS_PATTERN.search(target):
+                yield inbound_reference, class_name
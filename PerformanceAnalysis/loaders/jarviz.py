@@ -1,10 +1,25 @@
 import json
 import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
 
 from loaders.data_loader import DataLoader, EvaluationLevel
+from loaders.utils import iter_file_range_lines, split_file_ranges
+
+ANONYMOUS_CLASS_PATTERN = re.compile(r'\.\d+?')
+
+# Shards per worker, more shards than workers keep the pool busy when line lengths vary
+SHARDS_PER_WORKER = 4
 
 
 class JarvizDataLoader(DataLoader):
+    # Null classes and methods are named 'None' again, as the original loader formatted them
+    version = DataLoader.version + 1
+
+    def __init__(self, project, chunk_size=500_000, workers=1, **kwargs):
+        super().__init__(project, **kwargs)
+        self.chunk_size = chunk_size
+        self.workers = workers
 
     def get_name(self):
         return "Jarviz"
@@ -13,47 +28,78 @@ class JarvizDataLoader(DataLoader):
         return 'jarviz.jsonl'
 
     def support_evaluation_level(self, evaluation_level: EvaluationLevel):
-        return evaluation_level in [EvaluationLevel.CLASS, EvaluationLevel.METHOD]
-
-    def load(self, evaluation_level: EvaluationLevel):
-        if evaluation_level == EvaluationLevel.CLASS:
-            return self.load_class_data()
-        elif evaluation_level == EvaluationLevel.METHOD:
-            return self.load_method_data()
+        return evaluation_level in [EvaluationLevel.FILE, EvaluationLevel.CLASS, EvaluationLevel.METHOD]
 
-        return None
+    def load_file_data(self):
+        return self.load(EvaluationLevel.FILE)
 
     def load_method_data(self):
-        class_data, method_data = self.load_jarviz_data()
-        return method_data
+        return self.load(EvaluationLevel.METHOD)
 
     def load_class_data(self):
-        class_data, method_data = self.load_jarviz_data()
-        return class_data
-
-    def load_jarviz_data(self):
-        # Construct the full file path
-
-        class_relations = []
-        method_relations = []
+        return self.load(EvaluationLevel.CLASS)
+
+    def iter_level_chunks(self, evaluation_levels):
+        # Byte ranges need a plain file, compressed and piped inputs are decoded sequentially
+        if self.workers > 1 and self.file_exists() and self.is_plain_file():
+            yield from self.iter_level_chunks_in_parallel()
+        else:
+            # Normalize at most chunk_size lines at a time, only the interned names outlive a chunk
+            json_objects = self.load_jsonl_file()
+            while chunk := list(islice(json_objects, self.chunk_size)):
+                yield self.process_json_objects(chunk)
+
+    def iter_level_chunks_in_parallel(self):
+        # Decode and normalize line aligned byte ranges in separate processes, every shard comes back
+        # with its own symbols, which are interned into the shared table here
+        file_path = self.get_file_path()
+        ranges = split_file_ranges(file_path, self.workers * SHARDS_PER_WORKER)
+        starts = [start for start, _ in ranges]
+        ends = [end for _, end in ranges]
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            for symbols, shard in executor.map(load_jarviz_shard, repeat(file_path), starts, ends):
+                yield {evaluation_level: self.symbol_table.import_edges(symbols, edges) for evaluation_level, edges in
+                       shard.items()}
+
+    def load_jarviz_range(self, start, end):
+        lines = iter_file_range_lines(self.get_file_path(), start, end)
+        return self.process_json_objects(json.loads(line) for line in lines if not line.isspace())
+
+    def process_json_objects(self, json_objects):
+        file_sources, file_targets = [], []
+        class_sources, class_targets = [], []
+        method_sources, method_targets = [], []
         # Load and process the file
-        for json_object in self.load_jsonl_file():
+        for json_object in json_objects:
             sourceClass, sourceMethod, targetClass, targetMethod = self.extract_parameters(json_object)
 
             # Generate the formatted strings and add them to the lists
             if sourceClass != targetClass:
-                relation = f"{sourceClass}->{targetClass}"
-                relation = relation.replace("$", ".")
+                # Nested and anonymous classes belong to the file of their outer class
+                source_file = self.get_outer_class(sourceClass)
+                target_file = self.get_outer_class(targetClass)
+                if source_file != target_file:
+                    file_sources.append(source_file)
+                    file_targets.append(target_file)
+
+                source = sourceClass.replace("$", ".")
+                target = targetClass.replace("$", ".")
 
                 # removing the numbers
-                if not re.search(r'\.\d+?', relation):
-                    class_relations.append(relation)
-                # class_relations.append(relation)
+                if not ANONYMOUS_CLASS_PATTERN.search(source) and not ANONYMOUS_CLASS_PATTERN.search(target):
+                    class_sources.append(source)
+                    class_targets.append(target)
 
             if sourceMethod != targetMethod:
-                method_relations.append(f"{sourceClass}:{sourceMethod}->{targetClass}:{targetMethod}")
+                method_sources.append(f"{sourceClass}:{sourceMethod}")
+                method_targets.append(f"{targetClass}:{targetMethod}")
 
-        return class_relations, method_relations
+        return {
+            EvaluationLevel.FILE: self.create_edges(file_sources, file_targets),
+            EvaluationLevel.CLASS: self.create_edges(class_sources, class_targets),
+            EvaluationLevel.METHOD: self.create_edges(method_sources, method_targets),
+        }
 
     def load_jsonl_file(self):
         # Check if the file exists
@@ -63,10 +109,13 @@ class JarvizDataLoader(DataLoader):
             return None
 
         # Load the JSONL file
-        with open(file_path, 'r') as file:
+        with self.open_file() as file:
             for line in file:
                 yield json.loads(line)
 
+    def get_outer_class(self, class_name):
+        return class_name.split('$', 1)[0]
+
     def extract_parameters(self, json_object):
         # Extract the required parameters
         sourceClass = json_object.get('sourceClass', 'N/A')
@@ -74,4 +123,16 @@ class JarvizDataLoader(DataLoader):
         targetClass = json_object.get('targetClass', 'N/A')
         targetMethod = json_object.get('targetMethod', 'N/A')
 
+        # JSON nulls are formatted as 'None', like the names used to be built with f-strings
+        sourceClass, sourceMethod, targetClass, targetMethod = [
+            f"{name}" for name in (sourceClass, sourceMethod, targetClass, targetMethod)]
+
         return sourceClass, sourceMethod, targetClass, targetMethod
+
+
+def load_jarviz_shard(file_path, start, end):
+    # Runs in a worker process with a private symbol table, its symbols are returned with the edges
+    loader = JarvizDataLoader(None, file_path=file_path)
+    shard = loader.load_jarviz_range(start, end)
+
+    return loader.symbol_table.symbols, shard
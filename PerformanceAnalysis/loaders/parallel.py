@@ -0,0 +1,87 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import resource_tracker, util
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from loaders.data_loader import EvaluationLevel
+from loaders.symbol_table import decode_symbols, encode_symbols
+
+# Arrays are placed in the shared block at offsets aligned to the largest item size
+ARRAY_ALIGNMENT = 8
+
+
+def load_in_parallel(data_loaders, evaluation_level, workers):
+    # Run every loader in its own process so the parses overlap, returns the edges of every loader in order
+    pooled_loaders = [dl for dl in data_loaders if not dl.is_stdin() and evaluation_level not in dl.loaded_levels]
+
+    # Workers inherit the running resource tracker, so the blocks they create and this process attaches to are
+    # tracked once and released cleanly when a worker unlinks them
+    resource_tracker.ensure_running()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(load_shared_levels, dl, evaluation_level): dl for dl in pooled_loaders}
+
+        # Child processes can not read the standard input, so those loaders run here meanwhile
+        for dl in data_loaders:
+            if dl not in futures.values():
+                dl.load(evaluation_level)
+
+        for future in as_completed(futures):
+            dl = futures[future]
+            dl.loaded_levels.update(receive_shared_levels(future.result(), dl.symbol_table))
+
+    return [dl.load(evaluation_level) for dl in data_loaders]
+
+
+def load_shared_levels(loader, evaluation_level):
+    # Runs in a worker process, the loader arrives with a private symbol table. Every pool worker already runs a
+    # loader, so loaders do not split their input over processes of their own as well.
+    if getattr(loader, 'workers', 1) > 1:
+        loader.workers = 1
+
+    loader.load(evaluation_level)
+    return share_levels(loader.loaded_levels, loader.symbol_table)
+
+
+def share_levels(levels, symbol_table):
+    # Copy the symbols and edges into one shared memory block, only its name and the layout are pickled back
+    symbols, symbol_lengths = encode_symbols(symbol_table.symbols)
+    arrays = [symbols, symbol_lengths] + list(levels.values())
+
+    offsets = []
+    size = 0
+    for array in arrays:
+        offsets.append(size)
+        size += -(-array.nbytes // ARRAY_ALIGNMENT) * ARRAY_ALIGNMENT
+
+    shared_memory = SharedMemory(create=True, size=max(size, 1))
+    for array, offset in zip(arrays, offsets):
+        np.ndarray(array.shape, array.dtype, buffer=shared_memory.buf, offset=offset)[...] = array
+
+    # The receiving process reads the block before the pool shuts down, the worker unlinks it when it exits
+    util.Finalize(None, release_shared_memory, args=(shared_memory,), exitpriority=0)
+
+    layout = [(offset, array.shape, array.dtype.str) for array, offset in zip(arrays, offsets)]
+    return shared_memory.name, [evaluation_level.name for evaluation_level in levels], layout
+
+
+def release_shared_memory(shared_memory):
+    shared_memory.close()
+    shared_memory.unlink()
+
+
+def receive_shared_levels(shared_levels, symbol_table):
+    name, level_names, layout = shared_levels
+
+    shared_memory = SharedMemory(name=name)
+    try:
+        arrays = [np.ndarray(shape, dtype, buffer=shared_memory.buf, offset=offset) for offset, shape, dtype in layout]
+        ids = symbol_table.intern_all(decode_symbols(arrays[0], arrays[1]))
+        levels = {EvaluationLevel[level_name]: ids[edges] for level_name, edges in zip(level_names, arrays[2:])}
+
+        # Views must be released before the block can be closed
+        del arrays
+    finally:
+        shared_memory.close()
+
+    return levels
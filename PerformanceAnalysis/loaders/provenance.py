@@ -0,0 +1,119 @@
+import json
+import os
+import shutil
+
+import numpy as np
+
+from loaders.symbol_table import compact_edges, concatenate_edges, edge_keys
+
+PROVENANCE_FOLDER = '.provenance'
+MANIFEST_FILE = 'index.json'
+SYMBOLS_FILE = 'symbols.npy'
+SYMBOL_OFFSETS_FILE = 'symbol_offsets.npy'
+
+
+def get_provenance_folder(file_path):
+    # The index of an input is kept in a hidden folder next to it
+    file_path = os.path.abspath(file_path)
+    return os.path.join(os.path.dirname(file_path), PROVENANCE_FOLDER, os.path.basename(file_path))
+
+
+class ProvenanceIndex(object):
+    # Maps the edges of every level to the byte offsets of the records they come from. Symbols are stored sorted
+    # by their UTF-8 bytes and edges as keys over the symbol ranks, sorted, so a lookup is a binary search over
+    # memory mapped arrays and never loads the index or the input.
+    def __init__(self, folder):
+        self.folder = folder
+
+    def get_key(self, loader):
+        stat = os.stat(loader.get_file_path())
+        return {'loader': type(loader).__name__, 'version': loader.version, 'size': stat.st_size,
+                'mtime': stat.st_mtime_ns}
+
+    def get_manifest(self):
+        manifest_path = os.path.join(self.folder, MANIFEST_FILE)
+        if not os.path.isfile(manifest_path):
+            return None
+
+        with open(manifest_path, 'r') as file:
+            return json.load(file)
+
+    def is_current(self, loader, evaluation_levels):
+        # Whether the index covers the levels of the input as it is now
+        manifest = self.get_manifest()
+        return manifest is not None and manifest['key'] == self.get_key(loader) and all(
+            evaluation_level.name in manifest['levels'] for evaluation_level in evaluation_levels)
+
+    def store(self, loader, level_records):
+        # level_records holds the edges of every level with the offset of the record of every edge
+        ids, local_edges = compact_edges(concatenate_edges([edges for edges, _ in level_records.values()]))
+
+        encoded_symbols = [symbol.encode('utf-8') for symbol in loader.symbol_table.get_symbols(ids)]
+        order = sorted(range(len(encoded_symbols)), key=encoded_symbols.__getitem__)
+        ranks = np.empty(len(order), dtype=np.int32)
+        ranks[order] = np.arange(len(order), dtype=np.int32)
+        symbol_lengths = np.fromiter((len(encoded_symbols[index]) for index in order), dtype=np.int64,
+                                     count=len(order))
+
+        # Build the index aside and swap it in at once, a lookup never sees half of it
+        temporary_folder = f"{self.folder}.{os.getpid()}.tmp"
+        os.makedirs(temporary_folder, exist_ok=True)
+        np.save(os.path.join(temporary_folder, SYMBOLS_FILE),
+                np.frombuffer(b"".join(encoded_symbols[index] for index in order), dtype=np.uint8))
+        np.save(os.path.join(temporary_folder, SYMBOL_OFFSETS_FILE), np.concatenate([[0], np.cumsum(symbol_lengths)]))
+
+        start = 0
+        for evaluation_level, (level_edges, offsets) in level_records.items():
+            keys = edge_keys(ranks[local_edges[start:start + len(level_edges)]])
+            order = np.lexsort((offsets, keys))
+            np.save(os.path.join(temporary_folder, f"{evaluation_level.name.lower()}.keys.npy"), keys[order])
+            np.save(os.path.join(temporary_folder, f"{evaluation_level.name.lower()}.offsets.npy"),
+                    np.asarray(offsets, dtype=np.int64)[order])
+            start += len(level_edges)
+
+        manifest = {'key': self.get_key(loader), 'file_path': os.path.abspath(loader.get_file_path()),
+                    'levels': [evaluation_level.name for evaluation_level in level_records]}
+        with open(os.path.join(temporary_folder, MANIFEST_FILE), 'w') as file:
+            json.dump(manifest, file, indent=2)
+
+        if os.path.isdir(self.folder):
+            shutil.rmtree(self.folder)
+        os.replace(temporary_folder, self.folder)
+
+    def load_array(self, file_name):
+        return np.load(os.path.join(self.folder, file_name), mmap_mode='r')
+
+    def find_symbol(self, symbol):
+        # The rank of a symbol, None when no edge of the index has it
+        symbols = self.load_array(SYMBOLS_FILE)
+        symbol_offsets = self.load_array(SYMBOL_OFFSETS_FILE)
+        encoded_symbol = symbol.encode('utf-8')
+
+        low, high = 0, len(symbol_offsets) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if symbols[symbol_offsets[middle]:symbol_offsets[middle + 1]].tobytes() < encoded_symbol:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low < len(symbol_offsets) - 1 and symbols[symbol_offsets[low]:symbol_offsets[low + 1]].tobytes() == \
+                encoded_symbol:
+            return low
+        return None
+
+    def lookup(self, source, target, evaluation_level):
+        # Byte offsets of the records an edge comes from, in file order
+        manifest = self.get_manifest()
+        if manifest is None or evaluation_level.name not in manifest['levels']:
+            raise KeyError(f"The index at {self.folder} has no {evaluation_level.name} level")
+
+        source_rank, target_rank = self.find_symbol(source), self.find_symbol(target)
+        if source_rank is None or target_rank is None:
+            return np.empty(0, dtype=np.int64)
+
+        key = edge_keys(np.array([[source_rank, target_rank]], dtype=np.int32))[0]
+        keys = self.load_array(f"{evaluation_level.name.lower()}.keys.npy")
+        start, end = np.searchsorted(keys, key, side='left'), np.searchsorted(keys, key, side='right')
+
+        return np.array(self.load_array(f"{evaluation_level.name.lower()}.offsets.npy")[start:end])
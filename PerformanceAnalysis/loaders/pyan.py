@@ -1,9 +1,17 @@
 import re
+from itertools import islice
 
 from loaders.data_loader import DataLoader, EvaluationLevel
+from loaders.rollup import create_roll_up
 
 
 class PyanDataLoader(DataLoader):
+    # Functions nested in methods roll up to the class of the method
+    version = DataLoader.version + 1
+
+    def __init__(self, project, chunk_size=500_000, **kwargs):
+        super().__init__(project, **kwargs)
+        self.chunk_size = chunk_size
 
     def get_name(self):
         return "Pyan"
@@ -12,36 +20,48 @@ class PyanDataLoader(DataLoader):
         return "pyan.dot"
 
     def support_evaluation_level(self, evaluation_level: EvaluationLevel):
-        return evaluation_level == EvaluationLevel.METHOD
-
-    def load(self, evaluation_level: EvaluationLevel):
-        if evaluation_level == EvaluationLevel.METHOD:
-            return self.load_data()
-
-    def load_data(self):
-        edges = self.get_edges_from__dot_file(self.get_file_path())
-        return edges
+        # Classes and files are rolled up from the methods
+        return evaluation_level in [EvaluationLevel.FILE, EvaluationLevel.CLASS, EvaluationLevel.METHOD]
 
-    def get_edges_from__dot_file(self, file_path):
-        extracted_lines = []
-        with open(file_path, 'r') as file:
-            for line in file:
-                if "->" in line:
-                    processed_line = line[:line.find("[")]
-                    processed_line = processed_line.strip()
+    def get_dependency_paths(self):
+        # The classes and files are rolled up using the modules of the project
+        return [self.get_paths_file_path()] if self.project is not None else []
 
-                    source, target = processed_line.split("->")
-                    source = self.convert_locator(source)
-                    target = self.convert_locator(target)
-                    if source == target:
-                        continue
+    def iter_level_chunks(self, evaluation_levels):
+        # Every chunk of method edges is rolled up on its own, the roll up keeps only the parents of the names
+        roll_up = create_roll_up(self)
+        for edges in self.iter_dot_file_edges():
+            yield roll_up.roll_up_levels(edges, evaluation_levels)
 
-                    if ".set" in target or ".print" in target:
-                        continue
-
-                    extracted_lines.append(f"{source}->{target}")
-
-        return extracted_lines
+    def load_data(self):
+        return self.load(EvaluationLevel.METHOD)
+
+    def iter_dot_file_edges(self):
+        # Edges of at most chunk_size lines of the dot file at a time
+        with self.open_file(text=True) as file:
+            while lines := list(islice(file, self.chunk_size)):
+                yield self.get_edges_from_lines(lines)
+
+    def get_edges_from_lines(self, lines):
+        sources, targets = [], []
+        for line in lines:
+            if "->" in line:
+                processed_line = line[:line.find("[")]
+                processed_line = processed_line.strip()
+
+                source, target = processed_line.split("->")
+                source = self.convert_locator(source)
+                target = self.convert_locator(target)
+                if source == target:
+                    continue
+
+                if ".set" in target or ".print" in target:
+                    continue
+
+                sources.append(source)
+                targets.append(target)
+
+        return self.create_edges(sources, targets)
 
     def get_path_mapping(self):
         paths = self.get_paths()
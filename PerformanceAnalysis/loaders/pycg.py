@@ -1,9 +1,16 @@
 import json
 
 from loaders.data_loader import DataLoader, EvaluationLevel
+from loaders.rollup import create_roll_up
 
 
 class PyCGDataLoader(DataLoader):
+    # Functions nested in methods roll up to the class of the method
+    version = DataLoader.version + 1
+
+    def __init__(self, project, chunk_size=500_000, **kwargs):
+        super().__init__(project, **kwargs)
+        self.chunk_size = chunk_size
 
     def get_name(self):
         return "PyCG"
@@ -12,13 +19,24 @@ class PyCGDataLoader(DataLoader):
         return "pycg.json"
 
     def support_evaluation_level(self, evaluation_level: EvaluationLevel):
-        return evaluation_level == EvaluationLevel.METHOD
+        # Classes and files are rolled up from the methods
+        return evaluation_level in [EvaluationLevel.FILE, EvaluationLevel.CLASS, EvaluationLevel.METHOD]
+
+    def get_dependency_paths(self):
+        # The classes and files are rolled up using the modules of the project
+        return [self.get_paths_file_path()] if self.project is not None else []
 
-    def load(self, evaluation_level: EvaluationLevel):
-        if evaluation_level == EvaluationLevel.METHOD:
-            return self.load_data()
+    def iter_level_chunks(self, evaluation_levels):
+        # Every chunk of method edges is rolled up on its own, the roll up keeps only the parents of the names
+        roll_up = create_roll_up(self)
+        for edges in self.iter_edges():
+            yield roll_up.roll_up_levels(edges, evaluation_levels)
 
     def load_data(self):
+        return self.load(EvaluationLevel.METHOD)
+
+    def iter_edges(self):
+        # The JSON document is read whole, its calls are turned into edges chunk_size calls at a time
         json_data = self.load_json_data()
 
         nodes = {}
@@ -31,20 +49,25 @@ class PyCGDataLoader(DataLoader):
                     name = self.create_method_name(name)
                     nodes[key] = name
 
-        edges = []
-        for edge in json_data["graph"]["internalCalls"]:
+        calls = json_data["graph"]["internalCalls"]
+        for start in range(0, len(calls), self.chunk_size):
+            yield self.get_edges_from_calls(calls[start:start + self.chunk_size], nodes)
+
+    def get_edges_from_calls(self, calls, nodes):
+        sources, targets = [], []
+        for edge in calls:
             if edge[0] in nodes and edge[1] in nodes:
                 source = nodes[edge[0]]
                 target = nodes[edge[1]]
-                if source != target:
-                    edges.append(f"{source}->{target}")
-
-        edges = self.filter_python_management_methods(edges)
+                if source != target and not self.is_python_management_method(source) and \
+                        not self.is_python_management_method(target):
+                    sources.append(source)
+                    targets.append(target)
 
-        return edges
+        return self.create_edges(sources, targets)
 
-    def filter_python_management_methods(self, edges):
-        return [e for e in edges if "__" not in e]
+    def is_python_management_method(self, name):
+        return "__" in name
 
     def create_method_name(self, name):
         if name.startswith("/"):
@@ -64,7 +87,7 @@ class PyCGDataLoader(DataLoader):
             print(f"File not found: {file_path}")
             return None
 
-        with open(file_path, 'r') as file:
+        with self.open_file() as file:
             data = json.load(file)
 
         return data
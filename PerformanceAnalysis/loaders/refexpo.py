@@ -1,12 +1,29 @@
 import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
 
 from loaders.data_loader import DataLoader, EvaluationLevel
-import pandas as pd
+from loaders.symbol_table import concatenate_edges, unique_edges
+from loaders.utils import (FOLLOW_IDLE_TIMEOUT, FOLLOW_POLL_INTERVAL, find_record_starts, follow_csv_records,
+                           iter_csv_record_blocks, load_csv_chunks, map_unique, read_csv_bytes, split_csv_ranges)
+
+REFEXPO_COLUMNS = [f'{tag}{field}' for tag in ['source', 'target'] for field in ['Path', 'ClassFull', 'Method', 'Structure']]
 
-from loaders.utils import load_csv_file
+# Shards per worker, more shards than workers keep the pool busy when records cluster unevenly
+SHARDS_PER_WORKER = 4
 
 
 class RefExpoDataLoader(DataLoader):
+    resumable = True
+
+    def __init__(self, project, chunk_size=500_000, workers=1, provenance_index=None, **kwargs):
+        super().__init__(project, **kwargs)
+        self.chunk_size = chunk_size
+        self.workers = workers
+        # A ProvenanceIndex built while parsing, the input is then parsed even when its edges are cached
+        self.provenance_index = provenance_index
 
     def get_name(self):
         return "RefExpo"
@@ -15,98 +32,190 @@ class RefExpoDataLoader(DataLoader):
         return 'refExpo.csv'
 
     def support_evaluation_level(self, evaluation_level: EvaluationLevel):
-        return evaluation_level in [EvaluationLevel.CLASS, EvaluationLevel.METHOD]
+        return evaluation_level in [EvaluationLevel.FILE, EvaluationLevel.CLASS, EvaluationLevel.METHOD]
 
-    def load(self, evaluation_level: EvaluationLevel):
-        if evaluation_level == EvaluationLevel.CLASS:
-            return self.load_class_data()
-        elif evaluation_level == EvaluationLevel.METHOD:
-            return self.load_method_data()
-        else:
-            return None
+    def load_file_data(self):
+        return self.load(EvaluationLevel.FILE)
 
     def load_class_data(self):
-        class_data, _ = self.load_refexpo_data()
-        return class_data
+        return self.load(EvaluationLevel.CLASS)
 
     def load_method_data(self):
-        _, method_data = self.load_refexpo_data()
-        return method_data
-
-    def load_refexpo_data(self):
-        refexpo_df = load_csv_file(self.get_file_path())
-        if refexpo_df is None:
-            return [], []
-
-        # Process RefExpo data
-        class_relations = []
-        method_relations = []
-        for _, row in refexpo_df.iterrows():
-            source_method = self.get_structure(row, True, False)
-            target_method = self.get_structure(row, False,False)
-            if source_method is not None and target_method is not None and source_method != target_method:
-                method_relations.append(f"{source_method}->{target_method}")
-
-            source_class = self.get_class(row, True)
-            target_class = self.get_class(row, False)
-            if source_method != None and target_class != None and source_class != target_class:
-                class_relations.append(f"{source_class}->{target_class}")
-
-        class_relations = self.filter_nans(class_relations)
-        method_relations = self.filter_nans(method_relations)
-
-        # method_relations = self.filter_python_management_methods(method_relations)
-        class_relations = [cr for cr in class_relations if 'None' not in cr]
-
-        return class_relations, method_relations
-
-    def filter_python_management_methods(self, method_relations):
-        return [e for e in method_relations if "__" not in e]
-
-    def get_class(self, row, source=True, ignore_nan=True):
+        return self.load(EvaluationLevel.METHOD)
+
+    def load_pass(self, evaluation_levels):
+        # Building the provenance index needs a parse, cached edges are used again once the index is current
+        if self.provenance_index is None or self.provenance_index.is_current(self, evaluation_levels):
+            return super().load_pass(evaluation_levels)
+
+        levels = self.load_levels_with_provenance(evaluation_levels)
+        if self.cache is not None:
+            self.cache.store(self, levels)
+
+        return levels
+
+    def load_levels_with_provenance(self, evaluation_levels):
+        # Parse block by block and keep the byte offset of the record every edge comes from in the index
+        if self.is_stdin() or not self.is_plain_file():
+            raise ValueError(f"Only plain files can be indexed, not {self.get_file_path()}")
+
+        level_edges = {evaluation_level: [] for evaluation_level in evaluation_levels}
+        level_offsets = {evaluation_level: [np.empty(0, dtype=np.int64)] for evaluation_level in evaluation_levels}
+        for header, records, end in iter_csv_record_blocks(self.get_file_path()):
+            chunk = read_csv_bytes(header + records, REFEXPO_COLUMNS)
+            record_offsets = end - len(records) + find_record_starts(records)
+            if len(record_offsets) != len(chunk):
+                raise ValueError(f"The records of {self.get_file_path()} before byte {end} could not be located")
+
+            for evaluation_level, (sources, targets) in self.get_level_relations(chunk, evaluation_levels).items():
+                level_edges[evaluation_level].append(self.create_edges(sources, targets))
+                level_offsets[evaluation_level].append(record_offsets[sources.index.to_numpy()])
+
+        self.provenance_index.store(self, {evaluation_level: (concatenate_edges(edges), np.concatenate(
+            level_offsets[evaluation_level])) for evaluation_level, edges in level_edges.items()})
+
+        return {evaluation_level: unique_edges(concatenate_edges(edges)) for evaluation_level, edges in
+                level_edges.items()}
+
+    def use_parallel_reader(self):
+        # Byte ranges need a plain file, compressed and piped inputs are read sequentially
+        return self.workers > 1 and self.file_exists() and self.is_plain_file()
+
+    def iter_level_chunks(self, evaluation_levels):
+        if self.use_parallel_reader():
+            for chunk, _ in self.iter_chunks_in_parallel(evaluation_levels):
+                yield chunk
+            return
+
+        # Process RefExpo data column-wise, one chunk at a time
+        for chunk in load_csv_chunks(self.get_file_path(), REFEXPO_COLUMNS, self.chunk_size):
+            yield self.process_chunk(chunk, evaluation_levels)
+
+    def iter_chunks_in_parallel(self, evaluation_levels, start=0):
+        # Parse and normalize record aligned byte ranges in separate processes, every shard comes back with its own
+        # symbols, which are interned into the shared table here. Shards come back in file order, so the end of a
+        # shard is a position to resume from.
+        file_path = self.get_file_path()
+        ranges = split_csv_ranges(file_path, self.workers * SHARDS_PER_WORKER, start)
+        starts = [range_start for range_start, _ in ranges]
+        ends = [range_end for _, range_end in ranges]
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            shards = executor.map(load_refexpo_shard, repeat(file_path), starts, ends, repeat(evaluation_levels))
+            for end, (symbols, shard) in zip(ends, shards):
+                yield {evaluation_level: self.symbol_table.import_edges(symbols, edges) for evaluation_level, edges in
+                       shard.items()}, {'offset': end}
+
+    def load_refexpo_range(self, start, end, evaluation_levels):
+        level_edges = {evaluation_level: [] for evaluation_level in evaluation_levels}
+        for header, records, _ in iter_csv_record_blocks(self.get_file_path(), start, end=end):
+            chunk = self.process_chunk(read_csv_bytes(header + records, REFEXPO_COLUMNS), evaluation_levels)
+            for evaluation_level in evaluation_levels:
+                level_edges[evaluation_level].append(chunk[evaluation_level])
+
+        return {evaluation_level: unique_edges(concatenate_edges(edges)) for evaluation_level, edges in
+                level_edges.items()}
+
+    def iter_positioned_chunks(self, evaluation_levels, position=None):
+        start = position['offset'] if position is not None else 0
+        if self.use_parallel_reader():
+            yield from self.iter_chunks_in_parallel(evaluation_levels, start)
+            return
+
+        # Read blocks of complete records, so the offset after every block is a record boundary to resume from
+        for header, records, offset in iter_csv_record_blocks(self.get_file_path(), start):
+            yield self.process_chunk(read_csv_bytes(header + records, REFEXPO_COLUMNS), evaluation_levels), {
+                'offset': offset}
+
+    def follow(self, evaluation_levels, poll_interval=FOLLOW_POLL_INTERVAL, idle_timeout=FOLLOW_IDLE_TIMEOUT):
+        # Parse the export while the plugin still writes it, yields the edges of every block of complete records
+        if self.is_stdin() or (os.path.isfile(self.get_file_path()) and not self.is_plain_file()):
+            raise ValueError(f"Only plain files can be followed, not {self.get_file_path()}")
+
+        for header, records in follow_csv_records(self.get_file_path(), poll_interval, idle_timeout):
+            yield self.process_chunk(read_csv_bytes(header + records, REFEXPO_COLUMNS), evaluation_levels)
+
+    def process_chunk(self, chunk, evaluation_levels):
+        return {evaluation_level: self.create_edges(sources, targets) for evaluation_level, (sources, targets) in
+                self.get_level_relations(chunk, evaluation_levels).items()}
+
+    def get_level_relations(self, chunk, evaluation_levels):
+        # Source and target names of every level, indexed by the rows of the chunk they come from
+        level_relations = {}
+        if EvaluationLevel.FILE in evaluation_levels:
+            level_relations[EvaluationLevel.FILE] = self.get_file_relations(chunk)
+        if EvaluationLevel.CLASS in evaluation_levels or EvaluationLevel.METHOD in evaluation_levels:
+            # Both levels come out of the same parse, keep only the requested ones
+            level_relations.update({evaluation_level: relations for evaluation_level, relations in
+                                    self.get_class_and_method_relations(chunk).items()
+                                    if evaluation_level in evaluation_levels})
+
+        return level_relations
+
+    def get_file_relations(self, chunk):
+        source_file = map_unique(chunk['sourcePath'], self.extract_file_name)
+        target_file = map_unique(chunk['targetPath'], self.extract_file_name)
+        file_mask = source_file.notna() & target_file.notna() & (source_file != target_file)
+
+        return source_file[file_mask], target_file[file_mask]
+
+    def get_class_and_method_relations(self, chunk):
+        source_method = self.get_structure(chunk, True)
+        target_method = self.get_structure(chunk, False)
+        method_mask = source_method.notna() & target_method.notna() & (source_method != target_method)
+        method_mask &= self.filter_nans(source_method, target_method)
+        # method_mask &= self.filter_python_management_methods(source_method, target_method)
+
+        source_class = self.get_class(chunk, True)
+        target_class = self.get_class(chunk, False)
+        class_mask = (source_method.notna() & source_class.notna() & target_class.notna() &
+                      (source_class != target_class))
+        class_mask &= self.filter_nans(source_class, target_class)
+        class_mask &= ~(self.contains(source_class, 'None') | self.contains(target_class, 'None'))
+
+        return {
+            EvaluationLevel.CLASS: (source_class[class_mask], target_class[class_mask]),
+            EvaluationLevel.METHOD: (source_method[method_mask], target_method[method_mask]),
+        }
+
+    def filter_python_management_methods(self, sources, targets):
+        return ~(self.contains(sources, '__') | self.contains(targets, '__'))
+
+    def get_class(self, chunk, source=True):
         indicator_tag = self.get_indicator_tag(source)
 
-        class_name = row[f'{indicator_tag}ClassFull']
-        if f"{class_name}" == 'nan' and ignore_nan:
-            return None
-
-        return class_name
+        return chunk[f'{indicator_tag}ClassFull']
 
-    def get_structure(self, row, source=True, ignore_nan=True):
+    def get_structure(self, chunk, source=True):
         indicator_tag = self.get_indicator_tag(source)
-        package_name = self.extract_package_or_module_name(row[f'{indicator_tag}Path'])
+        package_name = map_unique(chunk[f'{indicator_tag}Path'], self.extract_package_or_module_name)
 
-        structure = row[f'{indicator_tag}Structure']
-        if f"{structure}" == 'nan' or structure == '':
-            structure = self.get_method(row, source)
+        structure = chunk[f'{indicator_tag}Structure']
+        structure = structure.where(structure.notna() & (structure != ''), self.get_method(chunk, source))
 
-        if structure is None:
-            if ignore_nan:
-                return None
+        # Fall back to the package or module name when there is no structure at all
+        qualified_structure = package_name.fillna('None') + "." + structure
 
-            return package_name
+        return qualified_structure.where(structure.notna(), package_name)
 
-        return f"{package_name}.{structure}"
-
-    def get_method(self, row, source=True):
+    def get_method(self, chunk, source=True):
         indicator_tag = self.get_indicator_tag(source)
 
-        method_name = row[f'{indicator_tag}Method']
-        if f"{method_name}" == 'nan':
-            return None
-
-        class_name = self.get_class(row, source, ignore_nan=False)
-
-        if class_name is not None:
-            return f"{class_name}.{method_name}"
+        method_name = chunk[f'{indicator_tag}Method']
+        class_name = chunk[f'{indicator_tag}ClassFull'].fillna('nan')
 
-        return method_name
+        # Missing method names stay missing after the concatenation
+        return class_name + "." + method_name
 
     def get_indicator_tag(self, source):
         return 'source' if source else 'target'
 
-    def filter_nans(self, relations):
-        return [relation for relation in relations if 'nan' not in relation]
+    def filter_nans(self, sources, targets):
+        return ~(self.contains(sources, 'nan') | self.contains(targets, 'nan'))
+
+    def contains(self, names, text):
+        # Missing names do not contain anything
+        return names.str.contains(text, regex=False).fillna(False).astype(bool)
 
     def extract_package_or_module_name(self, relative_path):
         # Determine the file type (Java or Python)
@@ -117,6 +226,17 @@ class RefExpoDataLoader(DataLoader):
         else:
             return None
 
+    def extract_file_name(self, relative_path):
+        # Name files like the top level class of a Java file or the dotted name of a Python module
+        if relative_path.endswith(".java"):
+            package_name = self.extrac_java_package_name(relative_path)
+            file_name = relative_path.replace("\\", "/").rsplit("/", 1)[-1][:-len(".java")]
+            return f"{package_name}.{file_name}" if package_name else file_name
+        elif relative_path.endswith(".py"):
+            return self.extrac_python_module_name(relative_path)
+        else:
+            return None
+
     def extrac_java_package_name(self, relative_path):
         file_extension = ".java"
         base_directory = "src/main/java/"
@@ -145,3 +265,11 @@ class RefExpoDataLoader(DataLoader):
         package_or_module_name = relative_path.replace("/", ".").replace("\\", ".")
 
         return package_or_module_name
+
+
+def load_refexpo_shard(file_path, start, end, evaluation_levels):
+    # Runs in a worker process with a private symbol table, its symbols are returned with the edges
+    loader = RefExpoDataLoader(None, file_path=file_path)
+    shard = loader.load_refexpo_range(start, end, evaluation_levels)
+
+    return loader.symbol_table.symbols, shard
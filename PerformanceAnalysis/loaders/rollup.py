@@ -0,0 +1,153 @@
+import os
+
+import numpy as np
+
+from loaders.data_loader import EvaluationLevel
+from loaders.symbol_table import unique_edges
+
+# Coarser nodes a method node can be rolled up to
+CLASS_PARENT = 'class'
+FILE_PARENT = 'file'
+PACKAGE_PARENT = 'package'
+PARENTS = [CLASS_PARENT, FILE_PARENT, PACKAGE_PARENT]
+
+LEVEL_PARENTS = {EvaluationLevel.CLASS: CLASS_PARENT, EvaluationLevel.FILE: FILE_PARENT}
+
+PYTHON_EXTENSION = '.py'
+PACKAGE_MODULE = '__init__'
+
+# Key of the trie node where a module name ends, it can not clash with a name segment
+MODULE_END = None
+
+# Parent ids of symbols that were not resolved yet, symbols without a parent get NO_PARENT
+UNRESOLVED = -2
+NO_PARENT = -1
+
+
+def get_module_files(paths):
+    # Dotted module names of Python paths mapped to the name of their file, as RefExpo names files
+    module_files = {}
+    for path in paths:
+        if not path.endswith(PYTHON_EXTENSION):
+            continue
+
+        file_name = path[:-len(PYTHON_EXTENSION)].replace("/", ".").replace("\\", ".")
+        module_name = file_name[:-len(PACKAGE_MODULE) - 1] if file_name.endswith(f".{PACKAGE_MODULE}") else file_name
+        module_files[module_name] = file_name
+
+    return module_files
+
+
+def create_roll_up(loader):
+    # Modules are known from the paths of the project, without them module names are guessed
+    module_files = {}
+    if loader.project is not None and os.path.isfile(loader.get_paths_file_path()):
+        module_files = get_module_files(loader.get_paths())
+
+    return RollUp(loader.symbol_table, module_files)
+
+
+class NameTrie(object):
+    # Prefix trie over the dot separated segments of qualified names
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, name, value):
+        node = self.root
+        for segment in name.split('.'):
+            node = node.setdefault(segment, {})
+        node[MODULE_END] = value
+
+    def find_longest_prefix(self, segments):
+        # Number of segments of the longest inserted prefix and its value, (0, None) when there is none
+        node = self.root
+        length, value = 0, None
+        for index, segment in enumerate(segments):
+            node = node.get(segment)
+            if node is None:
+                break
+            if MODULE_END in node:
+                length, value = index + 1, node[MODULE_END]
+
+        return length, value
+
+
+class RollUp(object):
+    # Maps method nodes to their class, file and package and aggregates method edges into those coarser nodes.
+    # Names are resolved once per symbol, later lookups are a single array index.
+    def __init__(self, symbol_table, module_files=None):
+        self.symbol_table = symbol_table
+        self.modules = NameTrie()
+        for module_name, file_name in (module_files or {}).items():
+            self.modules.insert(module_name, file_name)
+
+        self.parent_ids = {parent: np.empty(0, dtype=np.int32) for parent in PARENTS}
+
+    def resolve(self, name):
+        # Returns the class, file and package names of a node, the ones it does not belong to are None
+        segments = name.split('.')
+        module_length, file_name = self.modules.find_longest_prefix(segments)
+        if module_length == 0:
+            module_length = self.guess_module_length(segments)
+            file_name = '.'.join(segments[:module_length]) if module_length else None
+
+        module_segments = segments[:module_length]
+        members = segments[module_length:]
+
+        # Members are classes down to the first function, functions nested in it and their classes roll up to the
+        # class the function belongs to
+        class_length = 0
+        while class_length < len(members) - 1 and self.is_class_scope(members[class_length]):
+            class_length += 1
+        class_name = '.'.join(module_segments + members[:class_length]) if class_length else None
+        package_name = '.'.join(module_segments[:-1]) if len(module_segments) > 1 else None
+
+        return {CLASS_PARENT: class_name, FILE_PARENT: file_name, PACKAGE_PARENT: package_name}
+
+    def is_class_scope(self, segment):
+        # Classes are capitalized, functions are not, leading underscores of private names aside
+        return segment.lstrip('_')[:1].isupper()
+
+    def guess_module_length(self, segments):
+        # Without a known module, classes are taken to start at the first capitalized segment
+        for index, segment in enumerate(segments):
+            if segment[:1].isupper():
+                return index
+
+        return len(segments) - 1
+
+    def get_parent_ids(self, ids, parent):
+        parent_ids = self.parent_ids[parent]
+        if len(parent_ids) < len(self.symbol_table):
+            for key in PARENTS:
+                grown_ids = np.full(len(self.symbol_table), UNRESOLVED, dtype=np.int32)
+                grown_ids[:len(self.parent_ids[key])] = self.parent_ids[key]
+                self.parent_ids[key] = grown_ids
+            parent_ids = self.parent_ids[parent]
+
+        # Resolve the names of the symbols seen for the first time, for all parents at once
+        unresolved_ids = np.unique(ids[parent_ids[ids] == UNRESOLVED])
+        if len(unresolved_ids):
+            parent_names = [self.resolve(name) for name in self.symbol_table.get_symbols(unresolved_ids)]
+            for key in PARENTS:
+                names = [parents[key] for parents in parent_names]
+                interned_ids = [self.symbol_table.intern(name) if name is not None else NO_PARENT for name in names]
+                self.parent_ids[key][unresolved_ids] = interned_ids
+
+        return self.parent_ids[parent][ids]
+
+    def roll_up(self, edges, parent):
+        # Replace both ends of every edge by their parents, dropping edges inside a parent or without one
+        sources = self.get_parent_ids(edges[:, 0], parent)
+        targets = self.get_parent_ids(edges[:, 1], parent)
+        mask = (sources != NO_PARENT) & (targets != NO_PARENT) & (sources != targets)
+
+        rolled_up_edges = np.empty((int(mask.sum()), 2), dtype=np.int32)
+        rolled_up_edges[:, 0] = sources[mask]
+        rolled_up_edges[:, 1] = targets[mask]
+        return unique_edges(rolled_up_edges)
+
+    def roll_up_levels(self, method_edges, evaluation_levels):
+        # Method edges and the edges of the coarser levels derived from them, keyed by level
+        return {evaluation_level: method_edges if evaluation_level == EvaluationLevel.METHOD else
+                self.roll_up(method_edges, LEVEL_PARENTS[evaluation_level]) for evaluation_level in evaluation_levels}
@@ -1,12 +1,24 @@
-import os
 import re
 
+import pandas as pd
+
 from loaders.data_loader import DataLoader, EvaluationLevel
-from loaders.utils import load_csv_file
+from loaders.utils import load_csv_chunks, map_unique
+
+SONARGRAPH_COLUMNS = ['From', 'From File', 'To', 'To File']
+
+BASE_PATH_PATTERN = re.compile(r':\./([^:]+):')
+EXTENSION_PATTERN = re.compile(r'\.([^.]+)$')
+ANONYMOUS_CLASS_PATTERN = re.compile(r'\.\d+?')
 
 
 class SonargraphDataLoader(DataLoader):
 
+    def __init__(self, project, chunk_size=500_000, **kwargs):
+        super().__init__(project, **kwargs)
+        self.chunk_size = chunk_size
+        self.class_patterns = {}
+
     def get_name(self):
         return "Sonargraph"
 
@@ -14,52 +26,68 @@ class SonargraphDataLoader(DataLoader):
         return 'sonargraph.csv'
 
     def support_evaluation_level(self, evaluation_level: EvaluationLevel):
-        return evaluation_level == EvaluationLevel.CLASS
+        # Classes are named after the file they come from, so both levels share the same edges
+        return evaluation_level in [EvaluationLevel.FILE, EvaluationLevel.CLASS]
 
-    def load(self, evaluation_level: EvaluationLevel):
-        if evaluation_level == EvaluationLevel.CLASS:
-            return self.load_class_data()
+    def load_class_data(self):
+        return self.load(EvaluationLevel.CLASS)
 
-        return None
+    def load_file_data(self):
+        return self.load(EvaluationLevel.FILE)
+
+    def iter_level_chunks(self, evaluation_levels):
+        for chunk in load_csv_chunks(self.get_file_path(), SONARGRAPH_COLUMNS, self.chunk_size):
+            edges = self.process_chunk(chunk)
+            yield {EvaluationLevel.FILE: edges, EvaluationLevel.CLASS: edges}
 
     def extract_base_path_and_extension(self, file_column):
-        match = re.search(r':\./([^:]+):', file_column)
+        match = BASE_PATH_PATTERN.search(file_column)
         base_path = match.group(1) if match else ''
-        extension = re.search(r'\.([^.]+)$', file_column)
+        extension = EXTENSION_PATTERN.search(file_column)
         extension = extension.group(1) if extension else ''
         return base_path, extension
 
-    # Function to extract package and class name
-    def extract_package_and_class(self, column, base_path, extension):
-        if base_path and extension:
-            regex_pattern = rf':\./{base_path}:((?:[^:]+:)*)([^:]+)\.{extension}'
-            match = re.search(regex_pattern, column)
-            if match:
-                package_name = match.group(1).rstrip(':').replace(':', '.')
-                class_name = match.group(2)
-                return f"{package_name}.{class_name}" if package_name and class_name else None
-        return None
+    def get_class_pattern(self, file_column):
+        base_path, extension = self.extract_base_path_and_extension(file_column)
+        if not base_path or not extension:
+            return None
 
-    def process_row(self, row):
-        from_base_path, from_extension = self.extract_base_path_and_extension(row['From File'])
-        to_base_path, to_extension = self.extract_base_path_and_extension(row['To File'])
-        from_full_name = self.extract_package_and_class(row['From'], from_base_path, from_extension)
-        to_full_name = self.extract_package_and_class(row['To'], to_base_path, to_extension)
+        # Compile the pattern only once per distinct base path and extension
+        key = (base_path, extension)
+        if key not in self.class_patterns:
+            self.class_patterns[key] = re.compile(rf':\./{base_path}:((?:[^:]+:)*)([^:]+)\.{extension}')
 
-        if not from_full_name or not to_full_name or from_full_name == to_full_name:
-            return None
+        return self.class_patterns[key]
+
+    # Function to extract package and class name
+    def extract_package_and_class(self, column, class_pattern):
+        match = class_pattern.search(column)
+        if match:
+            package_name = match.group(1).rstrip(':').replace(':', '.')
+            class_name = match.group(2)
+            return f"{package_name}.{class_name}" if package_name and class_name else None
+        return None
 
-        reference = f"{from_full_name}->{to_full_name}"
+    def extract_packages_and_classes(self, chunk, column, file_column):
+        # Patterns are resolved once per distinct file and names once per distinct value of each pattern
+        class_patterns = map_unique(chunk[file_column], self.get_class_pattern)
+        pattern_codes, unique_patterns = pd.factorize(class_patterns)
 
-        reference = reference.replace("$", ".")
+        full_names = pd.Series(None, index=chunk.index, dtype=object)
+        for code, class_pattern in enumerate(unique_patterns):
+            rows = pattern_codes == code
+            full_names[rows] = map_unique(chunk.loc[rows, column],
+                                          lambda value: self.extract_package_and_class(value, class_pattern)).to_numpy()
 
-        if re.search(r'\.\d+?', reference):
-            return None
+        return full_names
 
-        return reference
+    def process_chunk(self, chunk):
+        from_full_name = self.extract_packages_and_classes(chunk, 'From', 'From File')
+        to_full_name = self.extract_packages_and_classes(chunk, 'To', 'To File')
 
-    def load_class_data(self):
-        file_path = self.get_file_path()
+        mask = from_full_name.notna() & to_full_name.notna() & (from_full_name != to_full_name)
+        sources = from_full_name[mask].str.replace("$", ".", regex=False)
+        targets = to_full_name[mask].str.replace("$", ".", regex=False)
 
-        df = load_csv_file(file_path)
-        return df.apply(self.process_row, axis=1).dropna()
+        mask = ~(sources.str.contains(ANONYMOUS_CLASS_PATTERN) | targets.str.contains(ANONYMOUS_CLASS_PATTERN))
+        return self.create_edges(sources[mask], targets[mask])
@@ -0,0 +1,24 @@
+import json
+import os
+
+
+def get_file_fingerprint(file_path):
+    stat = os.stat(file_path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def load_json_state(state_path):
+    if not os.path.isfile(state_path):
+        return {}
+
+    with open(state_path, 'r') as file:
+        return json.load(file)
+
+
+def store_json_state(state_path, state):
+    # Replace the file at once so an interrupted run never leaves it half written, the temporary file is per
+    # process so concurrent runs never write into each other's
+    temporary_path = f"{state_path}.{os.getpid()}.tmp"
+    with open(temporary_path, 'w') as file:
+        json.dump(state, file)
+    os.replace(temporary_path, state_path)
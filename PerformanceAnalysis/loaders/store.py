@@ -0,0 +1,215 @@
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+
+from comparison.hashing import mix_keys
+from loaders.symbol_table import (compact_edges, concatenate_edges, decode_symbols, edge_keys, encode_symbols,
+                                  unique_edges)
+
+STORE_FOLDER = '.store'
+CHUNKS_FOLDER = 'chunks'
+SNAPSHOTS_FOLDER = 'snapshots'
+HISTORY_FILE = 'history.json'
+
+# A chunk ends after every edge whose hash has these low bits unset, chunks hold 1024 edges on average
+CHUNK_BOUNDARY_MASK = (1 << 10) - 1
+
+SYMBOL_HASH_SIZE = 8
+
+
+def get_store_folder(project, data_folder='data'):
+    return os.path.join(data_folder, project, STORE_FOLDER)
+
+
+def hash_symbols(symbols):
+    # Hashes of symbol names, unlike symbol ids they are the same in every process and every run
+    return np.fromiter((int.from_bytes(hashlib.blake2b(symbol.encode('utf-8'), digest_size=SYMBOL_HASH_SIZE).digest(),
+                                       'little') for symbol in symbols), dtype=np.uint64, count=len(symbols))
+
+
+def write_atomically(path, data):
+    # Write to a temporary file first so an interrupted run never leaves a truncated file behind
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, 'wb') as file:
+        file.write(data)
+    os.replace(temporary_path, path)
+
+
+class EdgeStore(object):
+    # Versioned store of the normalized edges of a project across its history. The edges of a level are ordered
+    # by a hash of their names and cut where the hash of an edge matches a boundary pattern, so the cuts depend
+    # on the edges only and an edge added or removed changes just the chunk it falls in. Chunks are stored once,
+    # named by the hash of their content, and a snapshot is a manifest of the chunks of every level.
+    def __init__(self, folder, symbol_table):
+        self.folder = folder
+        self.symbol_table = symbol_table
+        self.symbol_hashes = np.empty(0, dtype=np.uint64)
+
+    def get_symbol_hashes(self, ids):
+        # Hash the symbols once, the table only grows so the hashes of known ids stay valid
+        if len(self.symbol_hashes) < len(self.symbol_table):
+            new_symbols = self.symbol_table.symbols[len(self.symbol_hashes):]
+            self.symbol_hashes = np.concatenate([self.symbol_hashes, hash_symbols(new_symbols)])
+
+        return self.symbol_hashes[ids]
+
+    def get_chunk_path(self, chunk_id):
+        return os.path.join(self.folder, CHUNKS_FOLDER, chunk_id[:2], f"{chunk_id}.npz")
+
+    def get_snapshot_path(self, name):
+        return os.path.join(self.folder, SNAPSHOTS_FOLDER, f"{name}.json")
+
+    def get_history(self):
+        history_path = os.path.join(self.folder, HISTORY_FILE)
+        if not os.path.isfile(history_path):
+            return []
+
+        with open(history_path, 'r') as file:
+            return json.load(file)
+
+    def store_history(self, history):
+        os.makedirs(self.folder, exist_ok=True)
+        write_atomically(os.path.join(self.folder, HISTORY_FILE), json.dumps(history, indent=2).encode('utf-8'))
+
+    def split_chunks(self, edges):
+        # Order the distinct edges by the hash of their names and cut them at content defined boundaries
+        edges = unique_edges(edges)
+        source_hashes = self.get_symbol_hashes(edges[:, 0])
+        target_hashes = self.get_symbol_hashes(edges[:, 1])
+        with np.errstate(over='ignore'):
+            edge_hashes = mix_keys(source_hashes ^ (target_hashes * np.uint64(0x9E3779B97F4A7C15)))
+
+        order = np.lexsort((target_hashes, source_hashes, edge_hashes))
+        ends = np.flatnonzero((edge_hashes[order] & np.uint64(CHUNK_BOUNDARY_MASK)) == 0) + 1
+        if len(ends) == 0 or ends[-1] != len(order):
+            ends = np.append(ends, len(order))
+        starts = np.concatenate([[0], ends[:-1]])
+
+        pairs = np.stack([source_hashes[order], target_hashes[order]], axis=1)
+        return [(edges[order[start:end]], pairs[start:end]) for start, end in zip(starts, ends) if end > start]
+
+    def write_chunk(self, edges, pairs):
+        # The name of a chunk is the hash of the name hashes of its edges, a chunk that exists already is kept
+        chunk_id = hashlib.blake2b(np.ascontiguousarray(pairs).tobytes(), digest_size=16).hexdigest()
+        chunk_path = self.get_chunk_path(chunk_id)
+        if os.path.isfile(chunk_path):
+            return chunk_id, False
+
+        ids, local_edges = compact_edges(edges)
+        symbols, symbol_lengths = encode_symbols(self.symbol_table.get_symbols(ids))
+
+        data = io.BytesIO()
+        np.savez_compressed(data, symbols=symbols, symbol_lengths=symbol_lengths, edges=local_edges)
+        os.makedirs(os.path.dirname(chunk_path), exist_ok=True)
+        write_atomically(chunk_path, data.getvalue())
+
+        return chunk_id, True
+
+    def read_chunk(self, chunk_id):
+        with np.load(self.get_chunk_path(chunk_id)) as entry:
+            symbols = decode_symbols(entry['symbols'], entry['symbol_lengths'])
+            return self.symbol_table.import_edges(symbols, entry['edges'])
+
+    def add_snapshot(self, name, levels, metadata=None):
+        # Store the edges of every level as a new snapshot, returns the number of chunks written and reused
+        history = self.get_history()
+        if name in history:
+            raise ValueError(f"Snapshot {name} exists already")
+
+        manifest = {'name': name, 'metadata': metadata or {}, 'levels': {}}
+        written_count, reused_count = 0, 0
+        for evaluation_level, edges in levels.items():
+            chunks = self.split_chunks(edges)
+            chunk_ids = []
+            for chunk_edges, pairs in chunks:
+                chunk_id, written = self.write_chunk(chunk_edges, pairs)
+                chunk_ids.append(chunk_id)
+                written_count += written
+                reused_count += not written
+
+            edge_count = sum(len(chunk_edges) for chunk_edges, _ in chunks)
+            manifest['levels'][evaluation_level.name] = {'count': edge_count, 'chunks': chunk_ids}
+
+        os.makedirs(os.path.join(self.folder, SNAPSHOTS_FOLDER), exist_ok=True)
+        write_atomically(self.get_snapshot_path(name), json.dumps(manifest, indent=2).encode('utf-8'))
+        self.store_history(history + [name])
+
+        return written_count, reused_count
+
+    def get_manifest(self, name):
+        snapshot_path = self.get_snapshot_path(name)
+        if not os.path.isfile(snapshot_path):
+            raise KeyError(f"Unknown snapshot {name}")
+
+        with open(snapshot_path, 'r') as file:
+            return json.load(file)
+
+    def get_chunk_ids(self, name, evaluation_level):
+        level = self.get_manifest(name)['levels'].get(evaluation_level.name)
+        return level['chunks'] if level is not None else None
+
+    def materialize(self, name, evaluation_level):
+        # The edges of a level of a snapshot, None when the snapshot has no such level
+        chunk_ids = self.get_chunk_ids(name, evaluation_level)
+        if chunk_ids is None:
+            return None
+
+        return concatenate_edges([self.read_chunk(chunk_id) for chunk_id in chunk_ids])
+
+    def get_churn(self, old_name, new_name, evaluation_level):
+        # Edges removed and added between two snapshots. Chunks shared by both hold the same edges, and an edge
+        # is in one chunk of every snapshot, so only the chunks of either snapshot alone are read.
+        old_chunk_ids = self.get_chunk_ids(old_name, evaluation_level) or []
+        new_chunk_ids = self.get_chunk_ids(new_name, evaluation_level) or []
+        old_keys = self.read_chunk_keys(set(old_chunk_ids) - set(new_chunk_ids))
+        new_keys = self.read_chunk_keys(set(new_chunk_ids) - set(old_chunk_ids))
+
+        return (len(np.setdiff1d(old_keys, new_keys, assume_unique=True)),
+                len(np.setdiff1d(new_keys, old_keys, assume_unique=True)))
+
+    def read_chunk_keys(self, chunk_ids):
+        return np.unique(edge_keys(concatenate_edges([self.read_chunk(chunk_id) for chunk_id in sorted(chunk_ids)])))
+
+    def get_history_stats(self, evaluation_level):
+        # Size and churn of every snapshot against the one before it, in the order the snapshots were added
+        stats = []
+        previous_name = None
+        for name in self.get_history():
+            level = self.get_manifest(name)['levels'].get(evaluation_level.name)
+            if level is None:
+                continue
+
+            removed_count, added_count = self.get_churn(previous_name, name, evaluation_level) if previous_name else (
+                0, level['count'])
+            previous_count = stats[-1]['edges'] if stats else 0
+            stats.append({
+                'snapshot': name,
+                'edges': level['count'],
+                'added': added_count,
+                'removed': removed_count,
+                'churn': (added_count + removed_count) / previous_count if previous_count else None,
+                'chunks': len(level['chunks']),
+            })
+            previous_name = name
+
+        return stats
+
+    def remove_snapshot(self, name):
+        # Drop the manifest and the chunks no other snapshot refers to, returns the number of chunks removed
+        history = self.get_history()
+        removed_chunk_ids = {chunk_id for level in self.get_manifest(name)['levels'].values() for chunk_id in
+                             level['chunks']}
+
+        self.store_history([snapshot for snapshot in history if snapshot != name])
+        os.remove(self.get_snapshot_path(name))
+
+        for snapshot in self.get_history():
+            for level in self.get_manifest(snapshot)['levels'].values():
+                removed_chunk_ids.difference_update(level['chunks'])
+        for chunk_id in removed_chunk_ids:
+            os.remove(self.get_chunk_path(chunk_id))
+
+        return len(removed_chunk_ids)
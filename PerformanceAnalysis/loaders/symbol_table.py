@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+EDGE_SEPARATOR = "->"
+
+
+class SymbolTable(object):
+    def __init__(self):
+        self.ids = {}
+        self.symbols = []
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def intern(self, symbol):
+        symbol_id = self.ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = len(self.symbols)
+            self.ids[symbol] = symbol_id
+            self.symbols.append(symbol)
+
+        return symbol_id
+
+    def intern_all(self, symbols):
+        # Intern every distinct symbol once and broadcast the ids back
+        if isinstance(symbols, list):
+            symbols = np.asarray(symbols, dtype=object)
+
+        codes, uniques = pd.factorize(symbols)
+        ids = np.fromiter((self.intern(symbol) for symbol in uniques), dtype=np.int32, count=len(uniques))
+        return ids[codes]
+
+    def create_edges(self, sources, targets):
+        edges = np.empty((len(sources), 2), dtype=np.int32)
+        edges[:, 0] = self.intern_all(sources)
+        edges[:, 1] = self.intern_all(targets)
+        return edges
+
+    def import_edges(self, symbols, edges):
+        # Translate edges interned in another table, given as that table's symbols, into this table
+        return self.intern_all(symbols)[edges]
+
+    def get_symbols(self, ids):
+        return [self.symbols[symbol_id] for symbol_id in ids]
+
+    def format_edges(self, edges):
+        return [f"{self.symbols[source]}{EDGE_SEPARATOR}{self.symbols[target]}" for source, target in edges.tolist()]
+
+
+def encode_symbols(symbols):
+    # Pack symbols into one UTF-8 buffer and the byte length of every symbol
+    encoded = [symbol.encode('utf-8') for symbol in symbols]
+    lengths = np.fromiter((len(symbol) for symbol in encoded), dtype=np.int64, count=len(encoded))
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), lengths
+
+
+def decode_symbols(buffer, lengths):
+    data = buffer.tobytes()
+    ends = np.cumsum(lengths).tolist()
+    starts = [0] + ends[:-1]
+    return [data[start:end].decode('utf-8') for start, end in zip(starts, ends)]
+
+
+def empty_edges():
+    return np.empty((0, 2), dtype=np.int32)
+
+
+def edge_keys(edges):
+    # Pack every (source, target) pair into a single integer
+    return (edges[:, 0].astype(np.int64) << 32) | edges[:, 1].astype(np.int64)
+
+
+def keys_to_edges(keys):
+    edges = np.empty((len(keys), 2), dtype=np.int32)
+    edges[:, 0] = keys >> 32
+    edges[:, 1] = keys & 0xFFFFFFFF
+    return edges
+
+
+def unique_edges(edges):
+    return keys_to_edges(np.unique(edge_keys(edges)))
+
+
+def concatenate_edges(edge_arrays):
+    return np.concatenate(edge_arrays) if edge_arrays else empty_edges()
+
+
+def compact_edges(edges):
+    # Renumber the symbols used by the edges from zero, returns the original ids and the renumbered edges
+    ids, local_edges = np.unique(edges, return_inverse=True)
+    return ids, local_edges.reshape(edges.shape).astype(np.int32)
@@ -1,21 +1,331 @@
+import bz2
+import csv
+import gzip
+import io
+import lzma
 import os
+import sys
+import time
 from collections import Counter
 
+import numpy as np
 import pandas as pd
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+STDIN_PATH = '-'
+
+QUOTE = ord('"')
+NEWLINE = ord('\n')
+CARRIAGE_RETURN = ord('\r')
+COMMA = ord(',')
+
+# Bytes read around a split offset of a CSV file to find the next record, doubled while that is ambiguous
+CSV_PROBE_SIZE = 1 << 20
+
+# Seconds between checks of a followed file and without growth until it is taken as complete
+FOLLOW_POLL_INTERVAL = 1.0
+FOLLOW_IDLE_TIMEOUT = 60.0
+
+# Bytes read from a followed file at once
+FOLLOW_BLOCK_SIZE = 1 << 26
+COMPRESSED_EXTENSIONS = ['.zst', '.gz', '.xz', '.bz2']
+
+# Leading bytes of the supported compressed streams
+COMPRESSION_MAGIC_NUMBERS = {
+    'gzip': b'\x1f\x8b',
+    'xz': b'\xfd7zXZ\x00',
+    'bz2': b'BZh',
+    'zstd': b'\x28\xb5\x2f\xfd',
+}
+
+
+def input_exists(file_path):
+    return file_path == STDIN_PATH or os.path.isfile(file_path)
+
+
+def detect_compression(stream):
+    header = stream.peek(6)[:6]
+    for compression, magic_number in COMPRESSION_MAGIC_NUMBERS.items():
+        if header.startswith(magic_number):
+            return compression
+
+    return None
+
+
+def is_plain_file(file_path):
+    # Plain files on disk can be seeked and split into byte ranges
+    if file_path == STDIN_PATH:
+        return False
+
+    with open(file_path, 'rb') as file:
+        return detect_compression(file) is None
+
+
+def open_input(file_path, text=False):
+    # Standard input is read for '-', compressed streams are decompressed on the fly based on their content
+    stream = sys.stdin.buffer if file_path == STDIN_PATH else open(file_path, 'rb')
+
+    compression = detect_compression(stream)
+    if compression == 'gzip':
+        stream = gzip.GzipFile(fileobj=stream)
+    elif compression == 'xz':
+        stream = lzma.LZMAFile(stream)
+    elif compression == 'bz2':
+        stream = bz2.BZ2File(stream)
+    elif compression == 'zstd':
+        if zstandard is None:
+            raise ImportError(f"The zstandard package is required to read {file_path}")
+        stream = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(stream, closefd=True))
+
+    if text:
+        stream = io.TextIOWrapper(stream, encoding='utf-8')
+
+    return stream
+
 
 def load_csv_file(file_path):
     # Check if the file exists
-    if not os.path.isfile(file_path):
+    if not input_exists(file_path):
         print(f"File not found: {file_path}")
         return None
 
     # Load the CSV file using Pandas
-    df = pd.read_csv(file_path, dtype=str)
+    with open_input(file_path) as file:
+        df = pd.read_csv(file, dtype=str)
 
     # Return the DataFrame
     return df
 
 
+def load_csv_chunks(file_path, columns=None, chunk_size=500_000):
+    # Check if the file exists
+    if not input_exists(file_path):
+        print(f"File not found: {file_path}")
+        return
+
+    # Stream the CSV file in chunks, keeping only the requested columns
+    with open_input(file_path) as file:
+        with pd.read_csv(file, dtype=str, usecols=columns, chunksize=chunk_size) as reader:
+            for chunk in reader:
+                yield chunk
+
+
+def read_csv_bytes(data, columns=None):
+    return pd.read_csv(io.BytesIO(data), dtype=str, usecols=columns)
+
+
+def find_record_end(data):
+    # Offset just past the last line end of data that ends a CSV record, line ends inside quoted fields do not.
+    # Escaped quotes come in pairs, so a line end is outside quotes when an even number of quotes precede it.
+    # data must start at a record boundary, the result is 0 when it holds no complete record.
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    inside_quotes = (np.cumsum(buffer == QUOTE) & 1).astype(bool)
+    record_ends = np.flatnonzero((buffer == NEWLINE) & ~inside_quotes)
+
+    return int(record_ends[-1]) + 1 if len(record_ends) else 0
+
+
+def find_record_starts(data):
+    # Offsets of the records in data, which starts at a record boundary. Empty lines are no records, like for pandas.
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    inside_quotes = (np.cumsum(buffer == QUOTE) & 1).astype(bool)
+    record_starts = np.concatenate([[0], np.flatnonzero((buffer == NEWLINE) & ~inside_quotes) + 1])
+    record_starts = record_starts[record_starts < len(buffer)]
+
+    return record_starts[(buffer[record_starts] != NEWLINE) & (buffer[record_starts] != CARRIAGE_RETURN)]
+
+
+def read_csv_records(file_path, offsets):
+    # Read the records starting at the given byte offsets of a plain CSV file, as dictionaries keyed by the header
+    records = []
+    with open(file_path, 'rb') as file:
+        header = next(csv.reader([file.readline().decode('utf-8')]))
+        for offset in offsets:
+            file.seek(offset)
+            text = io.TextIOWrapper(file, encoding='utf-8', newline='')
+            records.append(dict(zip(header, next(csv.reader(text)))))
+            # Keep the file open for the next record
+            text.detach()
+
+    return records
+
+
+def follow_csv_records(file_path, poll_interval=FOLLOW_POLL_INTERVAL, idle_timeout=FOLLOW_IDLE_TIMEOUT,
+                       block_size=FOLLOW_BLOCK_SIZE):
+    # Tail a CSV file while it is still written, yields its header and every block of complete records as bytes,
+    # so half written records are never parsed. The file is taken as complete once it did not grow for
+    # idle_timeout seconds, a last record without a line end is yielded then.
+    header = None
+    pending = b''
+    file = None
+    idle_since = time.monotonic()
+    try:
+        while True:
+            if file is None and os.path.isfile(file_path):
+                file = open(file_path, 'rb')
+
+            data = file.read(block_size) if file is not None else b''
+            if not data:
+                if file is not None and os.path.getsize(file_path) < file.tell():
+                    raise RuntimeError(f"{file_path} was truncated while it was followed")
+                if time.monotonic() - idle_since >= idle_timeout:
+                    break
+
+                time.sleep(poll_interval)
+                continue
+
+            idle_since = time.monotonic()
+            pending += data
+            record_end = find_record_end(pending)
+            if record_end == 0:
+                continue
+
+            records, pending = pending[:record_end], pending[record_end:]
+            if header is None:
+                header_end = records.index(b'\n') + 1
+                header, records = records[:header_end], records[header_end:]
+            if records:
+                yield header, records
+
+        if header is not None and pending.strip():
+            yield header, pending
+    finally:
+        if file is not None:
+            file.close()
+
+
+def skip_input(file, file_path, offset, position=0):
+    # Move an input opened by open_input from the byte offset position it was read up to on to a byte offset,
+    # compressed streams are decompressed up to there
+    if is_plain_file(file_path):
+        file.seek(offset)
+        return
+
+    while position < offset:
+        data = file.read(min(FOLLOW_BLOCK_SIZE, offset - position))
+        if not data:
+            break
+        position += len(data)
+
+
+def iter_csv_record_blocks(file_path, start=0, block_size=FOLLOW_BLOCK_SIZE, end=None):
+    # Read a CSV input in blocks of complete records from a record boundary on, yields the header, the records and
+    # the offset just past them, from which the input can be read again later. Reading stops at end if given,
+    # which has to be a record boundary as well.
+    with open_input(file_path) as file:
+        header = file.readline()
+        offset = max(start, len(header))
+        if offset > len(header):
+            skip_input(file, file_path, offset, len(header))
+
+        pending = b''
+        while data := file.read(block_size if end is None else min(block_size, end - offset - len(pending))):
+            pending += data
+            record_end = find_record_end(pending)
+            if record_end:
+                offset += record_end
+                yield header, pending[:record_end], offset
+                pending = pending[record_end:]
+
+        if pending.strip():
+            yield header, pending, offset + len(pending)
+
+
+def find_csv_record_start(data, field_count):
+    # Offset of the first record starting in data, which may begin inside a quoted field. Both readings of the
+    # quotes before data are tried, the one whose complete records all have field_count fields tells where the
+    # records are. None when data is too short to tell the readings apart.
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    quote_parity = (np.cumsum(buffer == QUOTE) & 1).astype(bool)
+    newlines = buffer == NEWLINE
+    commas = buffer == COMMA
+
+    record_starts = []
+    for inside_quotes in [quote_parity, ~quote_parity]:
+        record_ends = np.flatnonzero(newlines & ~inside_quotes)
+        if len(record_ends) < 2:
+            continue
+
+        separators = np.cumsum(commas & ~inside_quotes)
+        if np.all(np.diff(separators[record_ends]) == field_count - 1):
+            record_starts.append(int(record_ends[0]) + 1)
+
+    return record_starts[0] if len(record_starts) == 1 else None
+
+
+def split_csv_ranges(file_path, parts, start=0):
+    # Split the records of a plain CSV file, from start on, into byte ranges of similar size that start at record
+    # boundaries. Quoted fields may hold commas and line ends, so the records are told apart by their field count,
+    # taken from the header.
+    size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as file:
+        header = file.readline()
+        field_count = len(header.split(b','))
+        boundaries = [max(start, len(header))]
+        for part in range(1, parts):
+            offset = max(boundaries[0] + (size - boundaries[0]) * part // parts, boundaries[-1])
+            probe_size = CSV_PROBE_SIZE
+            while True:
+                file.seek(offset)
+                data = file.read(probe_size)
+                record_start = find_csv_record_start(data, field_count)
+                if record_start is not None or offset + len(data) >= size:
+                    break
+                probe_size *= 2
+
+            # The remaining records stay in one range when no record start can be told apart
+            if record_start is None:
+                break
+            boundaries.append(offset + record_start)
+
+    boundaries.append(size)
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+
+def map_unique(series, function):
+    # Apply a scalar function once per distinct value and broadcast the results back,
+    # missing values are mapped to None
+    codes, uniques = pd.factorize(series)
+    mapped = np.array([function(value) for value in uniques] + [None], dtype=object)
+
+    return pd.Series(mapped[codes], index=series.index, dtype=object)
+
+
+def split_file_ranges(file_path, parts):
+    # Split the file into byte ranges of similar size that start at line boundaries
+    size = os.path.getsize(file_path)
+    boundaries = [0]
+    with open(file_path, 'rb') as file:
+        for part in range(1, parts):
+            offset = max(size * part // parts, boundaries[-1], 1)
+            if offset >= size:
+                break
+
+            # Move to the start of the first line beginning at or after the offset
+            file.seek(offset - 1)
+            file.readline()
+            boundaries.append(file.tell())
+
+    boundaries.append(size)
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+
+def iter_file_range_lines(file_path, start, end):
+    with open(file_path, 'rb') as file:
+        file.seek(start)
+        position = start
+        while position < end:
+            line = file.readline()
+            if not line:
+                break
+
+            position += len(line)
+            yield line
+
+
 def count_occurrences(refexpo_class_relations):
     return Counter(refexpo_class_relations)
@@ -1,62 +1,204 @@
 import argparse
-from collections import Counter
+import csv
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack
 
 from matplotlib import pyplot as plt
 
+from comparison.incremental import IncrementalComparison
+from comparison.membership import MembershipRegions
+from comparison.partitioned import PartitionedComparison
+from comparison.sketches import ApproximateComparison, EdgeSketch
+
+from loaders.cache import EdgeCache, get_cache_folder
+from loaders.checkpoint import CHECKPOINT_INTERVAL
 from loaders.data_loader import EvaluationLevel
 from loaders.dependency_finder import DependencyFinderDataLoader
 from loaders.jarviz import JarvizDataLoader
+from loaders.parallel import load_in_parallel
+from loaders.provenance import ProvenanceIndex, get_provenance_folder
 from loaders.pyan import PyanDataLoader
 from loaders.refexpo import RefExpoDataLoader
 from loaders.snoragraph import SonargraphDataLoader
 from loaders.pycg import PyCGDataLoader
+from loaders.symbol_table import SymbolTable, edge_keys, empty_edges
+from loaders.utils import FOLLOW_IDLE_TIMEOUT, FOLLOW_POLL_INTERVAL
 from pyvenn import venn
 
+DATA_FOLDER = 'data'
 
-def compare_relations(lists):
-    unique_sets = [set(lst) for lst in lists]
-    sizes = [len(lst) for lst in unique_sets]
-    total_count = len(set.union(*unique_sets))
+BATCH_COLUMNS = ['project', 'evaluation', 'subject', 'metric', 'count', 'percent', 'seconds', 'error']
 
-    # Check if the number of all elements is equal to sum of results
-    # print(len(set(itertools.chain.from_iterable(lists))))
 
-    # Count appearances across lists
-    appearances = Counter(string for lst in unique_sets for string in lst)
+def compare_relations(edge_arrays):
+    # Every edge array holds distinct edges, one pass assigns each edge the mask of the tools that found it
+    return MembershipRegions.from_key_arrays([edge_keys(edges) for edges in edge_arrays])
 
-    # Elements that appear in all lists
-    shared_elements = set.intersection(*unique_sets)
-    shared_count = len(shared_elements)
 
-    # Remove elements that appear in all lists
-    for element in shared_elements:
-        del appearances[element]
+def load_level_relations(level_loaders, workers):
+    # Loaders keep the levels of a pass, so every input is parsed once however many levels are compared
+    level_relations = {}
+    for evaluation_level, data_loaders in level_loaders.items():
+        if workers > 1:
+            level_relations[evaluation_level] = load_in_parallel(data_loaders, evaluation_level, workers)
+        else:
+            level_relations[evaluation_level] = [dl.load(evaluation_level) for dl in data_loaders]
 
-    # Count of elements grouped by the number of lists they appear in
-    grouped_appearances_count = Counter(appearances.values())
+    return level_relations
 
-    # Remove count of elements that appear in only one list
-    if 1 in grouped_appearances_count:
-        del grouped_appearances_count[1]
 
-    # Collect unique elements (not in other lists) for each list
-    unique_elements_lists = []
-    for current_set in unique_sets:
-        other_sets = unique_sets.copy()
-        other_sets.remove(current_set)
-        unique_elements = current_set - set().union(*other_sets)
-        unique_elements_lists.append(unique_elements)
+def stream_level_relations(level_loaders):
+    # Stream every loader once for all the levels it is compared on, yields (level, tool index, edges)
+    data_loaders = list(dict.fromkeys(dl for loaders in level_loaders.values() for dl in loaders))
+    for dl in data_loaders:
+        evaluation_levels = [level for level, loaders in level_loaders.items() if dl in loaders]
+        for chunk in dl.iter_level_edges(evaluation_levels):
+            for evaluation_level, edges in chunk.items():
+                yield evaluation_level, level_loaders[evaluation_level].index(dl), edges
 
-    return unique_elements_lists, shared_count, grouped_appearances_count, sizes, total_count
 
+def compare_relations_out_of_core(level_loaders, folder, partition_count, memory_budget, workers):
+    # Stream the edges of every loader into hash partitions on disk and compare the partitions one by one
+    with ExitStack() as stack:
+        comparisons = {evaluation_level: stack.enter_context(
+            PartitionedComparison(len(data_loaders), folder, partition_count, memory_budget, workers)) for
+            evaluation_level, data_loaders in level_loaders.items()}
 
-def draw_venn_diagram(lists, set_labels):
-    # Create a list of sets
-    data = [set(lst) for lst in lists]
+        for evaluation_level, tool_index, edges in stream_level_relations(level_loaders):
+            comparisons[evaluation_level].add_keys(tool_index, edge_keys(edges))
 
-    # Generate labels for the sets (optional)
-    labels = venn.get_labels(data, fill=['number', 'percent'])
+        level_comparisons = {evaluation_level: comparison.compare() for evaluation_level, comparison in
+                             comparisons.items()}
+
+    # Every comparison removed its partitions, drop the folder holding them unless something else is in there
+    if os.path.isdir(folder) and not os.listdir(folder):
+        os.rmdir(folder)
+
+    return level_comparisons
+
+
+def compare_relations_approximately(level_loaders, precision, signature_size):
+    # One streaming pass keeps a constant size sketch per loader and level instead of its edges. The loaders still
+    # intern the node names into the shared symbol table, which grows with the distinct nodes of all the outputs.
+    sketches = {evaluation_level: [EdgeSketch(precision, signature_size) for _ in data_loaders] for
+                evaluation_level, data_loaders in level_loaders.items()}
+
+    for evaluation_level, tool_index, edges in stream_level_relations(level_loaders):
+        sketches[evaluation_level][tool_index].add_keys(edge_keys(edges))
+
+    return {evaluation_level: ApproximateComparison(level_sketches) for evaluation_level, level_sketches in
+            sketches.items()}
+
+
+def compare_relations_following(level_loaders, followed_loader, poll_interval, idle_timeout, workers):
+    # Load the other tools first, then fold in the edges of the followed export block by block while it is written
+    other_loaders = {evaluation_level: [dl for dl in data_loaders if dl is not followed_loader] for
+                     evaluation_level, data_loaders in level_loaders.items()}
+    level_relations = load_level_relations(other_loaders, workers)
+
+    level_comparisons = {}
+    comparisons = {}
+    for evaluation_level, data_loaders in level_loaders.items():
+        if followed_loader not in data_loaders:
+            level_comparisons[evaluation_level] = compare_relations(level_relations[evaluation_level])
+            continue
+
+        other_edges = iter(level_relations[evaluation_level])
+        key_arrays = [edge_keys(empty_edges() if dl is followed_loader else next(other_edges)) for dl in data_loaders]
+        comparisons[evaluation_level] = IncrementalComparison(key_arrays, data_loaders.index(followed_loader))
+
+    for chunk in followed_loader.follow(list(comparisons), poll_interval, idle_timeout):
+        for evaluation_level, edges in chunk.items():
+            comparisons[evaluation_level].add_keys(edge_keys(edges))
+            print_follow_progress(comparisons[evaluation_level], followed_loader.get_name(), evaluation_level)
+
+    level_comparisons.update({evaluation_level: comparison.regions for evaluation_level, comparison in
+                              comparisons.items()})
+    return {evaluation_level: level_comparisons[evaluation_level] for evaluation_level in level_loaders}
+
+
+def print_follow_progress(comparison, name, evaluation_level):
+    regions = comparison.regions
+    size = regions.get_sizes()[comparison.tool_index]
+    unique_count = regions.get_unique_counts()[comparison.tool_index]
+    print(f"{name} {evaluation_level.name}: {size} edges so far, unique: {unique_count}, "
+          f"shared: {size - unique_count}, total edges: {regions.get_total_count()}", flush=True)
+
+
+def format_estimate(value, error, percent=False):
+    if percent:
+        return f"{value:.1%}" if error == 0 else f"{value:.1%} ±{error:.1%}"
+
+    return f"{value:.0f}" if error == 0 else f"~{value:.0f} ±{error:.0f}"
+
+
+def print_approximate_comparison(comparison, set_labels):
+    print("Approximate comparison, error bounds are for 95% confidence")
+    print(f"Total edges: {format_estimate(*comparison.get_total_count())}")
+    for i, (size, unique_fraction, unique_count) in enumerate(
+            zip(comparison.get_sizes(), comparison.get_unique_fractions(), comparison.get_unique_counts())):
+        print(f"{set_labels[i]} -> unique: {format_estimate(*unique_count)}({format_estimate(*unique_fraction, True)}),"
+              f" Total:{format_estimate(*size)}")
+
+    print(f"Pairwise overlap")
+    for (first, second), (jaccard, intersection) in comparison.get_pairwise_estimates().items():
+        print(f"\t{set_labels[first]} & {set_labels[second]} -> jaccard: {format_estimate(*jaccard, True)}, "
+              f"intersection: {format_estimate(*intersection)}")
+
+
+def print_comparison(regions, set_labels):
+    total_edges = regions.get_total_count()
+    sizes = regions.get_sizes()
+    shared_count = regions.get_shared_count()
 
+    print(f"Total edges: {total_edges}")
+    for i, unique_count in enumerate(regions.get_unique_counts()):
+        print(
+            f"{set_labels[i]} -> unique: {unique_count}({unique_count / total_edges:.0%}), shared: {sizes[i] - unique_count}({(sizes[i] - unique_count) / total_edges:.0%}), Total:{sizes[i]}({sizes[i] / total_edges:.0%})")
+
+    print(f"Number of shared elements: {shared_count}({shared_count / total_edges:.0%})")
+    print(f"Count of elements by number of lists they appear in")
+    # Leave out the elements found by a single tool or by all of them
+    grouped_appearances_count = regions.get_multiplicity_counts()[2:regions.tool_count]
+    for key, value in enumerate(grouped_appearances_count, start=2):
+        if value:
+            print(f"\t{key} -> {value}({value / total_edges:.0%})")
+
+    total_shared = shared_count + int(grouped_appearances_count.sum())
+    print(f"Total shared: {total_shared}({total_shared / total_edges:.0%})")
+
+
+def summarize_comparison(regions, set_labels):
+    # The numbers of the console output as (subject, metric, count, percent) rows
+    total_edges = regions.get_total_count()
+    sizes = regions.get_sizes()
+    shared_count = regions.get_shared_count()
+
+    def row(subject, metric, count):
+        return {'subject': subject, 'metric': metric, 'count': int(count),
+                'percent': round(count / total_edges, 4) if total_edges else 0.0}
+
+    rows = [row('', 'total edges', total_edges)]
+    for i, unique_count in enumerate(regions.get_unique_counts()):
+        rows.append(row(set_labels[i], 'unique', unique_count))
+        rows.append(row(set_labels[i], 'shared', sizes[i] - unique_count))
+        rows.append(row(set_labels[i], 'total', sizes[i]))
+
+    rows.append(row('', 'shared by all', shared_count))
+    grouped_appearances_count = regions.get_multiplicity_counts()[2:regions.tool_count]
+    for key, value in enumerate(grouped_appearances_count, start=2):
+        if value:
+            rows.append(row(f"{key} tools", 'shared by', value))
+
+    rows.append(row('', 'total shared', shared_count + int(grouped_appearances_count.sum())))
+    return rows
+
+
+def draw_venn_diagram(regions, set_labels):
     # Create a Venn diagram based on the data
     diagrams = {
         2: venn.venn2,
@@ -66,60 +208,278 @@ def draw_venn_diagram(lists, set_labels):
         6: venn.venn6,
     }
 
-    fig, _ = diagrams[len(data)](labels, names=set_labels)
+    if regions.tool_count not in diagrams:
+        print(f"Venn diagrams are only available for 2 to 6 tools, skipping {regions.tool_count}")
+        return
+
+    # Generate labels for the sets (optional)
+    labels = regions.get_venn_labels(fill=['number', 'percent'])
+
+    fig, _ = diagrams[regions.tool_count](labels, names=set_labels)
 
     # Set the title and display the diagram
     fig.show()
 
 
+def create_data_loaders(project, cache, symbol_table, workers=1):
+    return [
+        RefExpoDataLoader(project, cache=cache, symbol_table=symbol_table, workers=workers),
+        JarvizDataLoader(project, cache=cache, symbol_table=symbol_table, workers=workers),
+        DependencyFinderDataLoader(project, cache=cache, symbol_table=symbol_table),
+        SonargraphDataLoader(project, cache=cache, symbol_table=symbol_table),
+        PyanDataLoader(project, cache=cache, symbol_table=symbol_table),
+        PyCGDataLoader(project, cache=cache, symbol_table=symbol_table)
+    ]
+
+
+def get_supporting_loaders(data_loaders, evaluation_level, followed_loader=None):
+    # A followed input may not exist yet when the comparison starts
+    return [dl for dl in data_loaders if dl.support_evaluation_level(evaluation_level) and (
+            dl.file_exists() or dl is followed_loader)]
+
+
+def find_batch_jobs(data_folder=DATA_FOLDER):
+    # Every project with the levels at least two tools can be compared on, with the size of its inputs. A project is
+    # one job, so every input is parsed once for all its levels and no two jobs write the same cache entries.
+    jobs = []
+    for project in sorted(os.listdir(data_folder)):
+        if project.startswith('.') or not os.path.isdir(os.path.join(data_folder, project)):
+            continue
+
+        data_loaders = create_data_loaders(project, None, None)
+        evaluation_levels = [evaluation_level for evaluation_level in EvaluationLevel if
+                             len(get_supporting_loaders(data_loaders, evaluation_level)) >= 2]
+        if evaluation_levels:
+            size = sum(os.path.getsize(dl.get_file_path()) for dl in data_loaders if dl.file_exists())
+            jobs.append((size, project, evaluation_levels))
+
+    # Start with the largest projects so they do not end up running alone at the end
+    jobs.sort(key=lambda job: job[0], reverse=True)
+    return [(project, evaluation_levels) for _, project, evaluation_levels in jobs]
+
+
+def evaluate_project(project, evaluation_levels, use_cache=True):
+    # The loaders keep the levels of a pass, so every input is parsed once however many levels are evaluated
+    cache = EdgeCache(get_cache_folder(project)) if use_cache else None
+    data_loaders = create_data_loaders(project, cache, SymbolTable())
+
+    level_rows = {}
+    for evaluation_level in evaluation_levels:
+        supporting_loaders = get_supporting_loaders(data_loaders, evaluation_level)
+        regions = compare_relations([dl.load(evaluation_level) for dl in supporting_loaders])
+        level_rows[evaluation_level] = summarize_comparison(regions, [dl.get_name() for dl in supporting_loaders])
+
+    return level_rows
+
+
+def run_batch_job(project, evaluation_levels, use_cache):
+    # Runs in a worker process, failures are returned as rows so the other jobs go on
+    start = time.perf_counter()
+    error = ''
+    try:
+        level_rows = evaluate_project(project, evaluation_levels, use_cache)
+    except Exception:
+        level_rows = {evaluation_level: [{'subject': '', 'metric': 'error', 'count': None, 'percent': None}] for
+                      evaluation_level in evaluation_levels}
+        error = traceback.format_exc()
+
+    duration = round(time.perf_counter() - start, 3)
+    return [dict(project=project, evaluation=evaluation_level.name, **row, seconds=duration, error=error) for
+            evaluation_level, rows in level_rows.items() for row in rows]
+
+
+def run_batch(workers, use_cache, purge_cache, output_path):
+    jobs = find_batch_jobs()
+    print(f"Evaluating {len(jobs)} projects")
+
+    if purge_cache:
+        for project, _ in jobs:
+            EdgeCache(get_cache_folder(project)).purge()
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run_batch_job, project, evaluation_levels, use_cache): project for
+                   project, evaluation_levels in jobs}
+        for future in as_completed(futures):
+            project = futures[future]
+            rows = future.result()
+            results[project] = rows
+
+            if rows[0]['error']:
+                print(f"{project} failed: {rows[0]['error'].strip().splitlines()[-1]}")
+            else:
+                print(f"{project} done in {rows[0]['seconds']}s")
+
+    # Keep the table in the order of the jobs so it does not depend on which worker finished first
+    rows = [row for project in sorted(results) for row in results[project]]
+    write_batch_results(rows, output_path)
+    print(f"Results written to {output_path}")
+
+
+def write_batch_results(rows, output_path):
+    if output_path.endswith('.json'):
+        with open(output_path, 'w') as file:
+            json.dump(rows, file, indent=2)
+        return
+
+    with open(output_path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=BATCH_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
 def main():
     # Set up argument parser
     parser = argparse.ArgumentParser(description='Load a JSONL file from a specified project folder.')
-    parser.add_argument('-p', '--project', type=str, required=True,
+    parser.add_argument('-p', '--project', type=str,
                         help='The name of the project folder under the data directory')
 
-    parser.add_argument('-e', '--evaluation', type=str, required=True, choices=['FILE', 'CLASS', 'METHOD'],
-                        help='The evaluation level to load data from')
+    parser.add_argument('-e', '--evaluation', type=str, choices=['FILE', 'CLASS', 'METHOD', 'ALL'],
+                        help='The evaluation level to load data from, ALL evaluates every level from a single parse')
 
-    # Parse arguments
-    args = parser.parse_args()
-    project = args.project
-    evaluation_level = EvaluationLevel[args.evaluation]
-
-    data_loaders = [
-        RefExpoDataLoader(project),
-        JarvizDataLoader(project),
-        DependencyFinderDataLoader(project),
-        SonargraphDataLoader(project),
-        PyanDataLoader(project),
-        PyCGDataLoader(project)
-    ]
+    parser.add_argument('--batch', action='store_true',
+                        help='Evaluate every supported level of every project under the data directory')
 
-    supporting_loaders = [dl for dl in data_loaders if
-                          dl.support_evaluation_level(evaluation_level) and dl.file_exists()]
+    parser.add_argument('-o', '--output', type=str, default='batch_results.csv',
+                        help='The CSV or JSON file the batch results are written to')
 
-    data = [dl.load(evaluation_level) for dl in supporting_loaders]
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='The number of processes running the loaders concurrently and used by loaders that can parse their input in parallel')
 
-    # Example usage in your main function
-    unique_elements_lists, shared_count, grouped_appearances_count, sizes, total_edges = compare_relations(data)
+    parser.add_argument('-i', '--input', action='append', default=[], metavar='TOOL=PATH',
+                        help='Read the output of a tool (e.g. refexpo, jarviz) from PATH instead of the project folder, '
+                             'compressed files are supported and "-" reads the standard input')
 
-    set_labels = [dl.get_name() for dl in supporting_loaders]
+    parser.add_argument('--out-of-core', action='store_true',
+                        help='Compare the edges through hash partitions on disk for graphs that do not fit in memory')
 
-    print(f"Total edges: {total_edges}")
-    for i, unique_elements in enumerate(unique_elements_lists):
-        unique_count = len(unique_elements)
-        print(
-            f"{set_labels[i]} -> unique: {unique_count}({unique_count / total_edges:.0%}), shared: {sizes[i] - unique_count}({(sizes[i] - unique_count) / total_edges:.0%}), Total:{sizes[i]}({sizes[i] / total_edges:.0%})")
+    parser.add_argument('--memory-budget', type=int, default=1024,
+                        help='The memory in MB the out-of-core comparison may use for comparing partitions')
 
-    print(f"Number of shared elements: {shared_count}({shared_count / total_edges:.0%})")
-    print(f"Count of elements by number of lists they appear in")
-    for key, value in grouped_appearances_count.items():
-        print(f"\t{key} -> {value}({value / total_edges:.0%})")
+    parser.add_argument('--partitions', type=int, default=64,
+                        help='The number of on-disk partitions of the out-of-core comparison')
 
-    total_shared = shared_count + sum(grouped_appearances_count.values())
-    print(f"Total shared: {total_shared}({total_shared / total_edges:.0%})")
+    parser.add_argument('--approximate', action='store_true',
+                        help='Estimate the comparison from HyperLogLog and MinHash sketches in one streaming pass')
+
+    parser.add_argument('--sketch-precision', type=int, default=14,
+                        help='The HyperLogLog precision of the approximate comparison, uses 2^precision registers')
+
+    parser.add_argument('--signature-size', type=int, default=4096,
+                        help='The number of hashes kept in the MinHash signatures of the approximate comparison')
+
+    parser.add_argument('--follow', action='store_true',
+                        help='Follow the RefExpo export while the plugin still writes it and update the comparison '
+                             'as records arrive')
+
+    parser.add_argument('--poll-interval', type=float, default=FOLLOW_POLL_INTERVAL,
+                        help='The seconds between checks for new records of the followed export')
 
-    draw_venn_diagram(data, set_labels)
+    parser.add_argument('--idle-timeout', type=float, default=FOLLOW_IDLE_TIMEOUT,
+                        help='The seconds without new records after which the followed export is taken as complete')
+
+    parser.add_argument('--checkpoint-interval', type=float,
+                        help='The positive seconds between checkpoints of the RefExpo and Dependency Finder parses, '
+                             f"none are written by default, or every {CHECKPOINT_INTERVAL} seconds with --resume")
+
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue interrupted RefExpo and Dependency Finder parses from their last checkpoint')
+
+    parser.add_argument('--provenance', action='store_true',
+                        help='Index the RefExpo records every edge comes from while loading, for edge_provenance.py')
+
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Parse every input from scratch without reading or writing the edge cache')
+
+    parser.add_argument('--purge-cache', action='store_true',
+                        help='Remove the cached edges of the project, of every project with --batch, before loading')
+
+    # Parse arguments
+    args = parser.parse_args()
+
+    if args.batch:
+        run_batch(args.workers, not args.no_cache, args.purge_cache, args.output)
+        return
+    if args.project is None or args.evaluation is None:
+        parser.error('the following arguments are required: -p/--project, -e/--evaluation')
+    if args.follow and (args.approximate or args.out_of_core):
+        parser.error('--follow can not be combined with --approximate or --out-of-core')
+    if args.provenance and (args.follow or args.approximate or args.out_of_core):
+        parser.error('--provenance can not be combined with --follow, --approximate or --out-of-core')
+    if args.checkpoint_interval is not None and args.checkpoint_interval <= 0:
+        parser.error('--checkpoint-interval must be a positive number of seconds')
+
+    project = args.project
+    if args.evaluation == 'ALL':
+        evaluation_levels = list(EvaluationLevel)
+    else:
+        evaluation_levels = [EvaluationLevel[args.evaluation]]
+
+    inputs = dict(tool_input.split('=', 1) for tool_input in args.input if '=' in tool_input)
+    if len(inputs) != len(args.input):
+        parser.error('inputs should be given as TOOL=PATH')
+    if list(inputs.values()).count('-') > 1:
+        parser.error('only one tool can read from the standard input')
+
+    cache = EdgeCache(get_cache_folder(project))
+    if args.purge_cache:
+        cache.purge()
+    if args.no_cache:
+        cache = None
+
+    # A single symbol table so the edges of all tools share the same node ids
+    symbol_table = SymbolTable()
+
+    data_loaders = create_data_loaders(project, cache, symbol_table, args.workers)
+
+    # Checkpoints are written on request only, a resumed parse keeps writing them
+    checkpoint_interval = args.checkpoint_interval
+    if checkpoint_interval is None and args.resume:
+        checkpoint_interval = CHECKPOINT_INTERVAL
+
+    for dl in data_loaders:
+        tool = dl.get_name().replace(" ", "").lower()
+        if tool in inputs:
+            dl.file_path = inputs.pop(tool)
+        dl.checkpoint_interval = checkpoint_interval
+        dl.resume = args.resume
+        if args.provenance and isinstance(dl, RefExpoDataLoader) and dl.file_exists() and not dl.is_stdin():
+            dl.provenance_index = ProvenanceIndex(get_provenance_folder(dl.get_file_path()))
+    if inputs:
+        parser.error(f"unknown tools: {', '.join(inputs)}")
+
+    followed_loader = next(dl for dl in data_loaders if isinstance(dl, RefExpoDataLoader)) if args.follow else None
+    level_loaders = {evaluation_level: get_supporting_loaders(data_loaders, evaluation_level, followed_loader) for
+                     evaluation_level in evaluation_levels}
+    if len(evaluation_levels) > 1:
+        # Leave out the levels no tool supports for this project
+        level_loaders = {evaluation_level: supporting_loaders for evaluation_level, supporting_loaders in
+                         level_loaders.items() if supporting_loaders}
+
+    if args.approximate:
+        level_comparisons = compare_relations_approximately(level_loaders, args.sketch_precision, args.signature_size)
+    elif args.follow:
+        level_comparisons = compare_relations_following(level_loaders, followed_loader, args.poll_interval,
+                                                        args.idle_timeout, args.workers)
+    elif args.out_of_core:
+        level_comparisons = compare_relations_out_of_core(level_loaders, os.path.join('data', project, '.partitions'),
+                                                          args.partitions, args.memory_budget * 1024 * 1024,
+                                                          args.workers)
+    else:
+        level_comparisons = {evaluation_level: compare_relations(edge_arrays) for evaluation_level, edge_arrays in
+                             load_level_relations(level_loaders, args.workers).items()}
+
+    for evaluation_level, comparison in level_comparisons.items():
+        set_labels = [dl.get_name() for dl in level_loaders[evaluation_level]]
+        if len(level_comparisons) > 1:
+            print(f"{evaluation_level.name} level")
+
+        if args.approximate:
+            print_approximate_comparison(comparison, set_labels)
+            draw_venn_diagram(comparison.get_regions(), set_labels)
+        else:
+            print_comparison(comparison, set_labels)
+            draw_venn_diagram(comparison, set_labels)
 
 
 if __name__ == "__main__":
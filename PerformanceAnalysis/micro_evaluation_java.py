@@ -0,0 +1,164 @@
+import argparse
+import glob
+import os
+import re
+
+from java_test_suite_helper import extract_expected_calls, extract_level2_headers_and_java_blocks, list_md_files
+from loaders.data_loader import EvaluationLevel
+from loaders.jarviz import JarvizDataLoader
+from loaders.refexpo import RefExpoDataLoader
+from loaders.state import get_file_fingerprint, load_json_state, store_json_state
+from micro_evaluation_pycg import RESAMPLES, create_report, evaluate_categories, map_in_pool, print_report, write_report
+
+SUITE_BASE = '../MicroSuite-Java-Judge/src/main/java'
+PROJECT = 'micro-java'
+INDEX_FILE = 'ground_truth_index.json'
+
+PACKAGE_PATTERN = re.compile(r'^\s*package\s+([\w.]+)\s*;', re.MULTILINE)
+METHOD_PARAMETERS_PATTERN = re.compile(r'\([^)]*\)')
+
+
+def find_source_files(suite_path=None, markdown_path=None):
+    # Extracted test cases are laid out as <category>/<test case>/*.java, JCG markdown files hold a whole category
+    source_files = []
+    if suite_path:
+        source_files += glob.glob(os.path.join(suite_path, '*', '*', '*.java'))
+    if markdown_path:
+        source_files += list_md_files(markdown_path)
+
+    return sorted(os.path.abspath(file_path) for file_path in source_files)
+
+
+def get_source_cases(file_path):
+    # Test cases of a source file as (category, test case, package, code)
+    with open(file_path, 'r', encoding='utf-8') as file:
+        content = file.read()
+
+    if file_path.endswith('.md'):
+        category = os.path.splitext(os.path.basename(file_path))[0].lower()
+        _, java_blocks = extract_level2_headers_and_java_blocks(content)
+        return [(category, header, f"{category}.{header}".replace('_', '.'), code) for header, _, code in java_blocks]
+
+    category, case = os.path.normpath(file_path).split(os.sep)[-3:-1]
+    package = PACKAGE_PATTERN.search(content)
+    return [(category, case, package.group(1) if package else f"{category}.{case}", content)]
+
+
+def parse_source_file(file_path):
+    cases = []
+    for category, case, package_name, code in get_source_cases(file_path):
+        edges, call_sites = extract_expected_calls(code, package_name)
+        if call_sites:
+            cases.append({'category': category, 'case': case, 'edges': edges, 'call_sites': call_sites})
+
+    return cases
+
+
+def build_ground_truth_index(source_files, index_path, workers=1):
+    # Parse only the source files that changed since the index was stored, removed files are dropped
+    index = load_json_state(index_path)
+    fingerprints = {file_path: get_file_fingerprint(file_path) for file_path in source_files}
+    changed_files = [file_path for file_path in source_files if
+                     index.get(file_path, {}).get('fingerprint') != fingerprints[file_path]]
+
+    parsed_cases = map_in_pool(parse_source_file, workers, changed_files)
+
+    updated_index = {file_path: index[file_path] for file_path in source_files if file_path not in changed_files}
+    for file_path, cases in zip(changed_files, parsed_cases):
+        updated_index[file_path] = {'fingerprint': fingerprints[file_path], 'cases': cases}
+
+    if updated_index != index:
+        os.makedirs(os.path.dirname(index_path) or '.', exist_ok=True)
+        store_json_state(index_path, updated_index)
+
+    return updated_index
+
+
+def get_ground_truth(index):
+    # Expected edges by category and test case, and the call sites every test case answers for
+    ground_truth = {}
+    call_sites = {}
+    for file_path in sorted(index):
+        for case in index[file_path]['cases']:
+            edges = ground_truth.setdefault(case['category'], {}).setdefault(case['case'], [])
+            edges.extend(tuple(edge) for edge in case['edges'])
+            for call_site in case['call_sites']:
+                call_sites[tuple(call_site)] = (case['category'], case['case'])
+
+    return ground_truth, call_sites
+
+
+def normalize_method(name):
+    # Tools separate methods and nested classes differently and may keep the parameters
+    return METHOD_PARAMETERS_PATTERN.sub('', name).replace(':', '.').replace('$', '.')
+
+
+def load_tool_references(data_loader, call_sites):
+    # Method edges of a tool grouped like the ground truth, only the annotated call sites are judged
+    edges = data_loader.load(EvaluationLevel.METHOD)
+    references = {}
+    if edges is None:
+        return references
+
+    names = {}
+    for source_id, target_id in edges.tolist():
+        for symbol_id in (source_id, target_id):
+            if symbol_id not in names:
+                names[symbol_id] = normalize_method(data_loader.symbol_table.symbols[symbol_id])
+
+        source, target = names[source_id], names[target_id]
+        case = call_sites.get((source, target.rsplit('.', 1)[-1]))
+        if case is not None:
+            category, test_case = case
+            references.setdefault(category, {}).setdefault(test_case, set()).add((source, target))
+
+    return references
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Evaluate call graph tools against the MicroSuite-Java-Judge.')
+    parser.add_argument('-p', '--project', type=str, default=PROJECT,
+                        help='The project folder under the data directory holding the tool outputs of the suite')
+
+    parser.add_argument('-s', '--suite', type=str, default=SUITE_BASE,
+                        help='The folder of the extracted test cases, laid out as <category>/<test case>/*.java')
+
+    parser.add_argument('-m', '--markdown', type=str,
+                        help='A folder of JCG markdown files to read test cases from as well')
+
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='The number of processes parsing test cases and comparing categories')
+
+    parser.add_argument('-b', '--resamples', type=int, default=RESAMPLES,
+                        help='The number of bootstrap resamples for the confidence intervals')
+
+    parser.add_argument('--seed', type=int,
+                        help='The seed of the bootstrap resamples, for reproducible intervals')
+
+    parser.add_argument('-j', '--json', type=str,
+                        help='A JSON file to write the report of every tool to, confidence intervals included')
+
+    args = parser.parse_args()
+
+    source_files = find_source_files(args.suite, args.markdown)
+    index = build_ground_truth_index(source_files, os.path.join('data', args.project, INDEX_FILE), args.workers)
+    ground_truth, call_sites = get_ground_truth(index)
+
+    reports = {}
+    for data_loader in [RefExpoDataLoader(args.project), JarvizDataLoader(args.project)]:
+        if not data_loader.file_exists():
+            continue
+
+        references = load_tool_references(data_loader, call_sites)
+        evaluation = evaluate_categories(ground_truth, references, args.workers)
+        reports[data_loader.get_name()] = create_report(evaluation, args.resamples, args.seed)
+
+        print(f"{data_loader.get_name()}:")
+        print_report(reports[data_loader.get_name()])
+
+    if args.json:
+        write_report(reports, args.json)
+
+
+if __name__ == "__main__":
+    main()
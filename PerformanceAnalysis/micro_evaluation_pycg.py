@@ -1,13 +1,25 @@
-import pandas as pd
-import os
+import argparse
 import json
-import csv
-from loaders.utils import load_csv_file
+import math
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from loaders.utils import load_csv_file, map_unique
 
-# Assuming df is your DataFrame
+SNIPPETS_BASE = '../MicroSuite-Python-PyCG'
+REFEXPO_FILE = 'data/micro-pycg/refExpo.csv'
+CALLGRAPH_FILE = 'cleaned_callgraph.json'
 
-# Initialize an empty dictionary to store the grouped references
-references = {}
+# Bootstrap resamples of the feature categories and the confidence of the intervals drawn from them
+RESAMPLES = 10_000
+CONFIDENCE = 0.95
+
+# Precision and recall without any reference are NaN while computing, so they drop out of means and percentiles,
+# and printed and written as -1
+UNDEFINED_METRIC = -1
 
 
 # Function to parse and extract the required parts of the location strings
@@ -28,16 +40,31 @@ def format_file_path(file_path):
     return formatted_path
 
 
-# Function to update the references dictionary without repetitions
-def update_references(feature, feature_category, remainder_source, remainder_target):
-    if feature not in references:
-        references[feature] = {}
-    if feature_category not in references[feature]:
-        references[feature][feature_category] = []
-    reference = (remainder_source, remainder_target)
-    # Check for duplicate before appending
-    if reference not in references[feature][feature_category]:
-        references[feature][feature_category].append(reference)
+# Function to update the references dictionary, sets drop the repetitions
+def update_references(references, feature, feature_category, remainder_source, remainder_target):
+    references.setdefault(feature, {}).setdefault(feature_category, set()).add((remainder_source, remainder_target))
+
+
+def get_method_names(df, tag):
+    # The full method name, or the file path followed by the structure or method name when it is missing
+    names = map_unique(df[f'{tag}Path'], format_file_path)
+    member = df[f'{tag}Structure'].where(df[f'{tag}Structure'].notna(), df[f'{tag}Method'])
+    names = names.where(member.isna(), names + "." + member)
+
+    return df[f'{tag}MethodFull'].where(df[f'{tag}MethodFull'].notna(), names)
+
+
+def load_references(refexpo_path):
+    # RefExpo references grouped by feature and feature category
+    df = load_csv_file(refexpo_path)
+    sources = map_unique(get_method_names(df, 'source'), parse_location)
+    targets = map_unique(get_method_names(df, 'target'), parse_location)
+
+    references = {}
+    for (source_feature, source_feature_category, source_remainder), (_, _, target_remainder) in zip(sources, targets):
+        update_references(references, source_feature, source_feature_category, source_remainder, target_remainder)
+
+    return references
 
 
 def read_callgraph_references(callgraph_path):
@@ -49,30 +76,78 @@ def read_callgraph_references(callgraph_path):
                 "builtin" not in source and "builtin" not in target]
 
 
+def get_features(base_path):
+    return [f for f in os.listdir(base_path) if os.path.isdir(os.path.join(base_path, f))]
+
+
 def get_feature_categories(base_path, feature):
     feature_path = os.path.join(base_path, feature)
     categories = [fc for fc in os.listdir(feature_path) if os.path.isdir(os.path.join(feature_path, fc))]
     return feature_path, categories
 
 
-def compare_and_record_mismatches(feature, feature_category, callgraph_references, existing_references, mismatches):
-    for reference in callgraph_references:
-        if reference not in existing_references:
-            mismatches.setdefault(feature, {}).setdefault(feature_category, []).append(reference)
+def map_in_pool(function, workers, *iterables):
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(function, *iterables, chunksize=8))
+
+    return list(map(function, *iterables))
+
+
+def load_ground_truth(base_path, workers=1):
+    # Read the call graph of every feature category once, categories without one are kept as None
+    categories = [(feature, feature_category) for feature in get_features(base_path) for feature_category in
+                  get_feature_categories(base_path, feature)[1]]
+    callgraph_files = [os.path.join(base_path, feature, feature_category, CALLGRAPH_FILE) for
+                       feature, feature_category in categories]
+
+    existing_files = [callgraph_file for callgraph_file in callgraph_files if os.path.isfile(callgraph_file)]
+    callgraphs = dict(zip(existing_files, map_in_pool(read_callgraph_references, workers, existing_files)))
+
+    ground_truth = {feature: {} for feature in get_features(base_path)}
+    for (feature, feature_category), callgraph_file in zip(categories, callgraph_files):
+        ground_truth[feature][feature_category] = callgraphs.get(callgraph_file)
+
+    return ground_truth
+
+
+def compare_category(callgraph_references, existing_references):
+    # Every number the reports need comes out of this single comparison of a feature category
+    expected_references = set(callgraph_references)
+    mismatches = [reference for reference in callgraph_references if reference not in existing_references]
+
+    return {
+        'covered': len(mismatches) < len(callgraph_references),
+        'mismatches': mismatches,
+        'tp': len(expected_references & existing_references),
+        'fp': len(existing_references - expected_references),
+        'fn': len(expected_references - existing_references),
+    }
+
+
+def evaluate_categories(ground_truth, references, workers=1):
+    # Compare the feature categories concurrently, categories without a call graph get None
+    categories = [(feature, feature_category) for feature, feature_categories in ground_truth.items() for
+                  feature_category, callgraph_references in feature_categories.items() if
+                  callgraph_references is not None]
+    results = map_in_pool(compare_category, workers,
+                          [ground_truth[feature][feature_category] for feature, feature_category in categories],
+                          [references.get(feature, {}).get(feature_category, set()) for feature, feature_category in
+                           categories])
 
+    evaluation = {feature: dict.fromkeys(feature_categories) for feature, feature_categories in ground_truth.items()}
+    for (feature, feature_category), result in zip(categories, results):
+        evaluation[feature][feature_category] = result
 
-def find_mismatches(base_path, references):
+    return evaluation
+
+
+def find_mismatches(evaluation):
     mismatches = {}
-    features = [f for f in os.listdir(base_path) if os.path.isdir(os.path.join(base_path, f))]
-    for feature in features:
-        feature_path, feature_categories = get_feature_categories(base_path, feature)
-        for feature_category in feature_categories:
-            callgraph_file = os.path.join(feature_path, feature_category, 'cleaned_callgraph.json')
-            if os.path.isfile(callgraph_file):
-                callgraph_references = read_callgraph_references(callgraph_file)
-                existing_references = references.get(feature, {}).get(feature_category, [])
-                compare_and_record_mismatches(feature, feature_category, callgraph_references, existing_references,
-                                              mismatches)
+    for feature, feature_categories in evaluation.items():
+        for feature_category, result in feature_categories.items():
+            if result is not None and result['mismatches']:
+                mismatches.setdefault(feature, {})[feature_category] = result['mismatches']
     return mismatches
 
 
@@ -90,7 +165,7 @@ def print_prettified_mismatches(mismatches):
         print("-" * 60)  # Separator for readability
 
 
-def analyze_coverage_detailed(base_path, references):
+def analyze_coverage_detailed(evaluation):
     coverage_summary = {
         'total_feature_categories': 0,
         'covered_feature_categories': 0,
@@ -98,30 +173,20 @@ def analyze_coverage_detailed(base_path, references):
         'details_per_feature': {}
     }
 
-    features = [f for f in os.listdir(base_path) if os.path.isdir(os.path.join(base_path, f))]
-    for feature in features:
-        feature_path = os.path.join(base_path, feature)
-        _, feature_categories = get_feature_categories(base_path, feature)
+    for feature, feature_categories in evaluation.items():
         feature_summary = {
             'total': 0,
             'covered': 0,
             'not_covered': 0
         }
 
-        for feature_category in feature_categories:
+        for result in feature_categories.values():
             coverage_summary['total_feature_categories'] += 1
             feature_summary['total'] += 1
 
-            category_path = os.path.join(feature_path, feature_category)
-            callgraph_file = os.path.join(category_path, 'cleaned_callgraph.json')
-
-            if os.path.isfile(callgraph_file):
-                callgraph_references = read_callgraph_references(callgraph_file)
-                existing_references = references.get(feature, {}).get(feature_category, [])
-
+            if result is not None:
                 # Check for coverage
-                is_covered = any(ref in existing_references for ref in callgraph_references)
-                if is_covered:
+                if result['covered']:
                     coverage_summary['covered_feature_categories'] += 1
                     feature_summary['covered'] += 1
                 else:
@@ -133,89 +198,44 @@ def analyze_coverage_detailed(base_path, references):
     return coverage_summary
 
 
-def get_method_name_from_csv_row(row, tag):
-    if pd.notna(row[f'{tag}MethodFull']):
-        return row[f'{tag}MethodFull']
-    else:
-        name = format_file_path(row[f'{tag}Path'])
-        if pd.notna(row[f'{tag}Structure']):
-            name += f".{row[f'{tag}Structure']}"
-        elif pd.notna(row[f'{tag}Method']):
-            name += f".{row[f'{tag}Method']}"
-
-        return name
-
-
-snippets_base = '../MicroSuite-Python-PyCG'
-df = load_csv_file('data/micro-pycg/refExpo.csv')
+def print_coverage_summary(coverage_summary):
+    print("Overall Coverage Summary:")
+    print(
+        f"Total Feature Categories: {coverage_summary['covered_feature_categories']}/{coverage_summary['total_feature_categories']}")
+    print("\nCoverage Details Per Feature:")
+    for feature, detail in coverage_summary['details_per_feature'].items():
+        print(f"Feature: {feature} -> {detail['covered']}/{detail['total']}")
 
-for index, row in df.iterrows():
-    source = get_method_name_from_csv_row(row, 'source')
-    target = get_method_name_from_csv_row(row, 'target')
 
-    source_feature, source_feature_category, source_remainder = parse_location(source)
-    target_feature, target_feature_category, target_remainder = parse_location(target)
+def get_precision_and_recall(tp, fp, fn):
+    precision = tp / (tp + fp) if (tp + fp) > 0 else math.nan
+    recall = tp / (tp + fn) if (tp + fn) > 0 else math.nan
+    return precision, recall
 
-    update_references(source_feature, source_feature_category, source_remainder, target_remainder)
 
-print(references)
+def get_defined_mean(values):
+    # Mean of the defined metrics, NaN when none is
+    defined_values = [value for value in values if not math.isnan(value)]
+    return sum(defined_values) / len(defined_values) if defined_values else math.nan
 
-mismatches = find_mismatches(snippets_base, references)
 
-print_prettified_mismatches(mismatches)
-
-coverage_summary = analyze_coverage_detailed(snippets_base, references)
-print("Overall Coverage Summary:")
-print(
-    f"Total Feature Categories: {coverage_summary['covered_feature_categories']}/{coverage_summary['total_feature_categories']}")
-# print(f"Covered Feature Categories: {coverage_summary['covered_feature_categories']}")
-# print(f"Not Covered Feature Categories: {coverage_summary['not_covered_feature_categories']}")
-print("\nCoverage Details Per Feature:")
-for feature, detail in coverage_summary['details_per_feature'].items():
-    print(f"Feature: {feature} -> {detail['covered']}/{detail['total']}")
-    # print(f"  Total Categories: {detail['total']}")
-    # print(f"  Covered Categories: {detail['covered']}")
-    # print(f"  Not Covered Categories: {detail['not_covered']}")
-
-
-def analyze_coverage_with_total_precision_recall(base_path, references):
+def analyze_coverage_with_total_precision_recall(evaluation):
     # Initialize counters for total analysis
     total_tp = 0
     total_fp = 0
     total_fn = 0
     feature_analysis = {}
 
-    features = [f for f in os.listdir(base_path) if os.path.isdir(os.path.join(base_path, f))]
-    for feature in features:
-        feature_path = os.path.join(base_path, feature)
-        _, feature_categories = get_feature_categories(base_path, feature)
-
-        # Initialize counters for the feature
-        feature_tp = 0
-        feature_fp = 0
-        feature_fn = 0
-
-        for feature_category in feature_categories:
-            category_path = os.path.join(feature_path, feature_category)
-            callgraph_file = os.path.join(category_path, 'cleaned_callgraph.json')
-
-            if os.path.isfile(callgraph_file):
-                callgraph_references = set(read_callgraph_references(callgraph_file))
-                existing_references = set(references.get(feature, {}).get(feature_category, []))
+    for feature, feature_categories in evaluation.items():
+        results = [result for result in feature_categories.values() if result is not None]
 
-                # Calculate TP, FP, FN for this feature_category
-                tp = len(callgraph_references.intersection(existing_references))
-                fp = len(existing_references.difference(callgraph_references))
-                fn = len(callgraph_references.difference(existing_references))
-
-                # Update feature-level counters
-                feature_tp += tp
-                feature_fp += fp
-                feature_fn += fn
+        # Sum TP, FP, FN over the feature categories
+        feature_tp = sum(result['tp'] for result in results)
+        feature_fp = sum(result['fp'] for result in results)
+        feature_fn = sum(result['fn'] for result in results)
 
         # Calculate precision and recall for the feature
-        precision = feature_tp / (feature_tp + feature_fp) if (feature_tp + feature_fp) > 0 else -1
-        recall = feature_tp / (feature_tp + feature_fn) if (feature_tp + feature_fn) > 0 else -1
+        precision, recall = get_precision_and_recall(feature_tp, feature_fp, feature_fn)
 
         # Update total counters
         total_tp += feature_tp
@@ -226,64 +246,28 @@ def analyze_coverage_with_total_precision_recall(base_path, references):
         feature_analysis[feature] = {'precision': precision, 'recall': recall}
 
     # Calculate total precision and recall across all features
-    total_precision = total_tp / (total_tp + total_fp) if (total_tp + total_fp) > 0 else -1
-    total_recall = total_tp / (total_tp + total_fn) if (total_tp + total_fn) > 0 else -1
+    total_precision, total_recall = get_precision_and_recall(total_tp, total_fp, total_fn)
 
     return feature_analysis, total_precision, total_recall
 
 
-# Perform the analysis
-feature_analysis, total_precision, total_recall = analyze_coverage_with_total_precision_recall(snippets_base,
-                                                                                               references)
-
-# Print total precision and recall
-print(f"\nTotal -> P: {total_precision:.2f}, R: {total_recall:.2f}")
-
-for feature, metrics in feature_analysis.items():
-    print(f"Feature: {feature} -> P: {metrics['precision']:.2f}, Recall: {metrics['recall']:.2f}")
-
-
-def analyze_coverage_with_averaged_precision_recall(base_path, references):
+def analyze_coverage_with_averaged_precision_recall(evaluation):
     # Initialize variables for calculating averages across all features
     overall_feature_precisions = []
     overall_feature_recalls = []
 
     feature_analysis = {}
 
-    features = [f for f in os.listdir(base_path) if os.path.isdir(os.path.join(base_path, f))]
-    for feature in features:
-        feature_path = os.path.join(base_path, feature)
-        _, feature_categories = get_feature_categories(base_path, feature)
-
-        # Lists to store precision and recall for each feature_category
-        feature_category_precisions = []
-        feature_category_recalls = []
-
-        for feature_category in feature_categories:
-            category_path = os.path.join(feature_path, feature_category)
-            callgraph_file = os.path.join(category_path, 'cleaned_callgraph.json')
-
-            if os.path.isfile(callgraph_file):
-                callgraph_references = set(read_callgraph_references(callgraph_file))
-                existing_references = set(references.get(feature, {}).get(feature_category, []))
-
-                # Calculate TP, FP, and FN
-                tp = len(callgraph_references.intersection(existing_references))
-                fp = len(existing_references.difference(callgraph_references))
-                fn = len(callgraph_references.difference(existing_references))
-
-                # Calculate precision and recall for this feature_category
-                precision = tp / (tp + fp) if (tp + fp) > 0 else -1
-                recall = tp / (tp + fn) if (tp + fn) > 0 else -1
-
-                feature_category_precisions.append(precision)
-                feature_category_recalls.append(recall)
+    for feature, feature_categories in evaluation.items():
+        # Precision and recall of each feature_category
+        category_metrics = [get_precision_and_recall(result['tp'], result['fp'], result['fn']) for result in
+                            feature_categories.values() if result is not None]
+        feature_category_precisions = [precision for precision, _ in category_metrics]
+        feature_category_recalls = [recall for _, recall in category_metrics]
 
         # Calculate the average precision and recall for the feature
-        avg_feature_precision = sum(feature_category_precisions) / len(
-            feature_category_precisions) if feature_category_precisions else -1
-        avg_feature_recall = sum(feature_category_recalls) / len(
-            feature_category_recalls) if feature_category_recalls else -1
+        avg_feature_precision = get_defined_mean(feature_category_precisions)
+        avg_feature_recall = get_defined_mean(feature_category_recalls)
 
         # Store the averaged precision and recall for this feature
         feature_analysis[feature] = {'precision': avg_feature_precision, 'recall': avg_feature_recall}
@@ -293,56 +277,189 @@ def analyze_coverage_with_averaged_precision_recall(base_path, references):
         overall_feature_recalls.append(avg_feature_recall)
 
     # Calculate total averaged precision and recall across all features
-    total_avg_precision = sum(overall_feature_precisions) / len(
-        overall_feature_precisions) if overall_feature_precisions else 0
-    total_avg_recall = sum(overall_feature_recalls) / len(overall_feature_recalls) if overall_feature_recalls else 0
+    total_avg_precision = get_defined_mean(overall_feature_precisions) if overall_feature_precisions else 0
+    total_avg_recall = get_defined_mean(overall_feature_recalls) if overall_feature_recalls else 0
 
     return feature_analysis, total_avg_precision, total_avg_recall
 
 
-# Perform the analysis
-feature_analysis, total_avg_precision, total_avg_recall = analyze_coverage_with_averaged_precision_recall(snippets_base,
-                                                                                                          references)
-
-# Print total precision and recall
-print(f"\nTotal -> P: {total_avg_precision:.2f}, R: {total_avg_recall:.2f}")
-
-# Print the results
-for feature, metrics in feature_analysis.items():
-    print(f"Feature: {feature} -> P: {metrics['precision']:.2f}, Recall: {metrics['recall']:.2f}")
-
-
-
-
-# def export_analysis_to_csv(base_path, references, output_file):
-#     with open(output_file, mode='w', newline='') as file:
-#         writer = csv.writer(file)
-#         # Write the header row
-#         writer.writerow(['Feature', 'Feature Category', 'Number of Edges', 'Number of Correct Identifications'])
-#
-#         features = [f for f in os.listdir(base_path) if os.path.isdir(os.path.join(base_path, f))]
-#         for feature in features:
-#             feature_path = os.path.join(base_path, feature)
-#             _, feature_categories = get_feature_categories(base_path, feature)
-#
-#             for feature_category in feature_categories:
-#                 category_path = os.path.join(feature_path, feature_category)
-#                 callgraph_file = os.path.join(category_path, 'callgraph.json')
-#
-#                 if os.path.isfile(callgraph_file):
-#                     callgraph_references = read_callgraph_references(callgraph_file)
-#                     existing_references = references.get(feature, {}).get(feature_category, [])
-#
-#                     # Calculate the number of edges and correct identifications
-#                     num_edges = len(callgraph_references)
-#                     num_correct_identifications = sum(1 for ref in callgraph_references if ref in existing_references)
-#
-#                     # Write data row for this feature category
-#                     writer.writerow([feature, feature_category, num_edges, num_correct_identifications])
-#
-#
-# # Define the base path, references dictionary, and the desired output file path
-# output_file = 'data/pycg-micro-report.csv'
-#
-# # Assume `references` is already defined as per previous discussions
-# export_analysis_to_csv(snippets_base, references, output_file)
+def get_category_counts(evaluation):
+    # TP, FP and FN of every compared feature category as one array, the categories of a feature are adjacent
+    features = list(evaluation)
+    feature_results = [[result for result in evaluation[feature].values() if result is not None] for feature in
+                       features]
+
+    counts = np.array([[result['tp'], result['fp'], result['fn']] for results in feature_results for result in
+                       results], dtype=np.int64).reshape(-1, 3)
+    sizes = np.array([len(results) for results in feature_results], dtype=np.int64)
+
+    return features, counts, sizes
+
+
+def get_precisions_and_recalls(counts):
+    # Vectorized get_precision_and_recall over the last axis of TP, FP and FN counts
+    tp, fp, fn = counts[..., 0], counts[..., 1], counts[..., 2]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.where(tp + fp > 0, tp / (tp + fp), np.nan)
+        recall = np.where(tp + fn > 0, tp / (tp + fn), np.nan)
+
+    return np.stack([precision, recall], axis=-1)
+
+
+def get_interval(values, confidence=CONFIDENCE):
+    # Percentile interval over the resamples on the first axis, leaving out undefined metrics. It is NaN where
+    # no resample has a defined one.
+    tail = (1 - confidence) / 2 * 100
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.nanpercentile(values, [tail, 100 - tail], axis=0)
+
+
+def get_defined_means(values, axis):
+    # Vectorized get_defined_mean along an axis
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.nanmean(values, axis=axis)
+
+
+def bootstrap_precision_recall(evaluation, resamples=RESAMPLES, confidence=CONFIDENCE, seed=None):
+    # Confidence intervals of the total and averaged precision and recall. Every resample draws the categories
+    # of each feature with replacement, all resamples of all features are drawn as one index array.
+    features, counts, sizes = get_category_counts(evaluation)
+    non_empty = sizes > 0
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    feature_ids = np.repeat(np.arange(len(features)), sizes)
+
+    random = np.random.default_rng(seed)
+    indexes = starts[feature_ids] + (random.random((resamples, len(counts))) * sizes[feature_ids]).astype(np.int64)
+
+    # Resampled counts and category metrics, shaped (resamples, categories, 3) and (resamples, categories, 2)
+    sampled_counts = counts[indexes]
+    sampled_metrics = get_precisions_and_recalls(counts)[indexes]
+
+    # Sums and means of the defined metrics per non empty feature, shaped (resamples, features, ...), empty
+    # features stay undefined
+    feature_starts = starts[non_empty]
+    feature_totals = np.full((resamples, len(features), 2), np.nan)
+    feature_totals[:, non_empty] = get_precisions_and_recalls(np.add.reduceat(sampled_counts, feature_starts, axis=1))
+    feature_averages = np.full((resamples, len(features), 2), np.nan)
+    defined_metrics = ~np.isnan(sampled_metrics)
+    feature_metric_sums = np.add.reduceat(np.where(defined_metrics, sampled_metrics, 0.0), feature_starts, axis=1)
+    feature_metric_counts = np.add.reduceat(defined_metrics, feature_starts, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        feature_averages[:, non_empty] = np.where(feature_metric_counts > 0,
+                                                  feature_metric_sums / feature_metric_counts, np.nan)
+
+    total = get_interval(get_precisions_and_recalls(sampled_counts.sum(axis=1)), confidence)
+    averaged = get_interval(get_defined_means(feature_averages, 1), confidence) if len(features) else np.zeros((2, 2))
+
+    return {
+        'total': get_interval_analysis(features, get_interval(feature_totals, confidence), total),
+        'averaged': get_interval_analysis(features, get_interval(feature_averages, confidence), averaged),
+    }
+
+
+def get_interval_analysis(features, feature_intervals, total_interval):
+    # Intervals shaped (2, ..., 2) as lower and upper bound of precision and recall
+    def get_metrics(lower, upper):
+        return {'precision': (float(lower[0]), float(upper[0])), 'recall': (float(lower[1]), float(upper[1]))}
+
+    return {
+        'features': {feature: get_metrics(feature_intervals[0, index], feature_intervals[1, index]) for index, feature
+                     in enumerate(features)},
+        'total': get_metrics(total_interval[0], total_interval[1]),
+    }
+
+
+def get_reported_value(value):
+    # Undefined metrics are reported as UNDEFINED_METRIC
+    if isinstance(value, float) and math.isnan(value):
+        return UNDEFINED_METRIC
+    if isinstance(value, dict):
+        return {key: get_reported_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [get_reported_value(item) for item in value]
+
+    return value
+
+
+def format_metric(value, interval=None):
+    value = get_reported_value(value)
+    if interval is None:
+        return f"{value:.2f}"
+
+    lower, upper = get_reported_value(interval)
+    return f"{value:.2f} [{lower:.2f}, {upper:.2f}]"
+
+
+def print_precision_recall(feature_analysis, total_precision, total_recall, intervals=None):
+    # Print total precision and recall, with their confidence intervals when there are some
+    total_intervals = intervals['total'] if intervals else {}
+    print(f"\nTotal -> P: {format_metric(total_precision, total_intervals.get('precision'))}, "
+          f"R: {format_metric(total_recall, total_intervals.get('recall'))}")
+
+    for feature, metrics in feature_analysis.items():
+        feature_intervals = intervals['features'][feature] if intervals else {}
+        print(f"Feature: {feature} -> P: {format_metric(metrics['precision'], feature_intervals.get('precision'))}, "
+              f"Recall: {format_metric(metrics['recall'], feature_intervals.get('recall'))}")
+
+
+def print_report(report):
+    print_prettified_mismatches(report['mismatches'])
+    print_coverage_summary(report['coverage'])
+    print_precision_recall(*report['total'], report['intervals']['total'])
+    print_precision_recall(*report['averaged'], report['intervals']['averaged'])
+
+
+def write_report(report, json_path):
+    with open(json_path, 'w') as json_file:
+        json.dump(get_reported_value(report), json_file, indent=4)
+
+
+def evaluate(base_path, references, workers=1, resamples=RESAMPLES, seed=None):
+    # Load the ground truth once and derive every report from the same per category comparison
+    evaluation = evaluate_categories(load_ground_truth(base_path, workers), references, workers)
+    return create_report(evaluation, resamples, seed)
+
+
+def create_report(evaluation, resamples=RESAMPLES, seed=None):
+    return {
+        'mismatches': find_mismatches(evaluation),
+        'coverage': analyze_coverage_detailed(evaluation),
+        'total': analyze_coverage_with_total_precision_recall(evaluation),
+        'averaged': analyze_coverage_with_averaged_precision_recall(evaluation),
+        'intervals': bootstrap_precision_recall(evaluation, resamples, seed=seed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Evaluate RefExpo against the MicroSuite-Python-PyCG call graphs.')
+    parser.add_argument('-s', '--snippets', type=str, default=SNIPPETS_BASE,
+                        help='The folder of the micro suite')
+
+    parser.add_argument('-r', '--refexpo', type=str, default=REFEXPO_FILE,
+                        help='The RefExpo output of the micro suite')
+
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='The number of processes comparing the feature categories')
+
+    parser.add_argument('-b', '--resamples', type=int, default=RESAMPLES,
+                        help='The number of bootstrap resamples for the confidence intervals')
+
+    parser.add_argument('--seed', type=int,
+                        help='The seed of the bootstrap resamples, for reproducible intervals')
+
+    parser.add_argument('-j', '--json', type=str,
+                        help='A JSON file to write the whole report to, confidence intervals included')
+
+    args = parser.parse_args()
+
+    report = evaluate(args.snippets, load_references(args.refexpo), args.workers, args.resamples, args.seed)
+    print_report(report)
+
+    if args.json:
+        write_report(report, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+
+from loaders.state import load_json_state, store_json_state
+from micro_evaluation_pycg import (SNIPPETS_BASE, get_feature_categories, get_features, map_in_pool,
+                                   read_callgraph_references)
+from pycg_tracer import ENTRY_FILE, PYTHON_EXTENSION
+
+TRACER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pycg_tracer.py')
+CACHE_FILE = 'data/micro-pycg/traced_callgraphs.json'
+EXPECTED_FILE = 'callgraph.json'
+
+# Seconds a snippet may run before it is stopped
+TRACE_TIMEOUT = 30
+
+
+def find_snippets(base_path):
+    return sorted(os.path.join(feature, feature_category) for feature in get_features(base_path) for
+                  feature_category in get_feature_categories(base_path, feature)[1] if
+                  os.path.isfile(os.path.join(base_path, feature, feature_category, ENTRY_FILE)))
+
+
+def get_tracer_hash():
+    # Traces depend on the tracer and the interpreter running it as much as on the snippet
+    digest = hashlib.sha256(sys.version.encode())
+    with open(TRACER_FILE, 'rb') as file:
+        digest.update(file.read())
+
+    return digest.hexdigest()
+
+
+def get_snippet_hash(snippet_path, tracer_hash):
+    # Content hash of the Python files of a snippet, module names come from their paths so those count as well
+    digest = hashlib.sha256(tracer_hash.encode())
+    for root, folders, files in os.walk(snippet_path):
+        folders.sort()
+        for file_name in sorted(files):
+            if file_name.endswith(PYTHON_EXTENSION):
+                file_path = os.path.join(root, file_name)
+                digest.update(os.path.relpath(file_path, snippet_path).encode() + b'\0')
+                with open(file_path, 'rb') as file:
+                    digest.update(file.read() + b'\0')
+
+    return digest.hexdigest()
+
+
+def trace_snippet(snippet_path, timeout=TRACE_TIMEOUT):
+    # Every snippet runs in its own isolated interpreter, so imports and state never leak between snippets
+    try:
+        completed_process = subprocess.run([sys.executable, '-I', TRACER_FILE, snippet_path], cwd=snippet_path,
+                                           capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {'callgraph': {}, 'error': f"Timed out after {timeout} seconds"}
+
+    if completed_process.returncode != 0:
+        error_lines = completed_process.stderr.strip().splitlines()
+        return {'callgraph': {}, 'error': error_lines[-1] if error_lines else f"Exit code {completed_process.returncode}"}
+
+    return json.loads(completed_process.stdout)
+
+
+def trace_snippets(base_path, cache_path, workers=1, timeout=TRACE_TIMEOUT):
+    # Traces of every snippet keyed by its path, only snippets whose content hash is not cached run again
+    cache = load_json_state(cache_path)
+    tracer_hash = get_tracer_hash()
+
+    snippets = find_snippets(base_path)
+    snippet_hashes = [get_snippet_hash(os.path.join(base_path, snippet), tracer_hash) for snippet in snippets]
+    traced_hashes = sorted(set(snippet_hash for snippet_hash in snippet_hashes if snippet_hash not in cache))
+    traced_paths = {snippet_hash: os.path.abspath(os.path.join(base_path, snippet)) for snippet, snippet_hash in
+                    zip(snippets, snippet_hashes)}
+
+    traces = map_in_pool(trace_snippet, workers, [traced_paths[snippet_hash] for snippet_hash in traced_hashes],
+                         [timeout] * len(traced_hashes))
+
+    # Hashes of removed or changed snippets are dropped
+    updated_cache = {snippet_hash: cache[snippet_hash] for snippet_hash in snippet_hashes if snippet_hash in cache}
+    updated_cache.update(zip(traced_hashes, traces))
+    if updated_cache != cache:
+        os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+        store_json_state(cache_path, updated_cache)
+
+    return {snippet: updated_cache[snippet_hash] for snippet, snippet_hash in zip(snippets, snippet_hashes)}, len(
+        traced_hashes)
+
+
+def get_traced_references(callgraph):
+    # Builtins are left out like in the evaluation
+    return {(source, target) for source, targets in callgraph.items() for target in targets if
+            "builtin" not in source and "builtin" not in target}
+
+
+def diff_callgraphs(base_path, traces, expected_file=EXPECTED_FILE):
+    # Expected edges that were not traced and traced edges that are not expected, per snippet that differs
+    differences = {}
+    for snippet, trace in traces.items():
+        expected_path = os.path.join(base_path, snippet, expected_file)
+        expected_references = set(read_callgraph_references(expected_path)) if os.path.isfile(expected_path) else set()
+        traced_references = get_traced_references(trace['callgraph'])
+
+        missing = sorted(expected_references - traced_references)
+        unexpected = sorted(traced_references - expected_references)
+        if missing or unexpected or trace['error']:
+            differences[snippet] = {'missing': missing, 'unexpected': unexpected, 'error': trace['error']}
+
+    return differences
+
+
+def print_differences(differences, snippet_count, traced_count):
+    for snippet, difference in differences.items():
+        print(f"Snippet: {snippet}")
+        if difference['error']:
+            print(f"  Error: {difference['error']}")
+        for source, target in difference['missing']:
+            print(f"    Not traced: Source -> '{source}' | Target -> '{target}'")
+        for source, target in difference['unexpected']:
+            print(f"    Not expected: Source -> '{source}' | Target -> '{target}'")
+        print("-" * 60)
+
+    print(f"{snippet_count - len(differences)}/{snippet_count} snippets match their call graph, "
+          f"{traced_count} traced and {snippet_count - traced_count} from the cache")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Trace the MicroSuite-Python-PyCG snippets and compare the calls '
+                                                 'they make with their call graphs.')
+    parser.add_argument('-s', '--snippets', type=str, default=SNIPPETS_BASE,
+                        help='The folder of the micro suite')
+
+    parser.add_argument('-c', '--cache', type=str, default=CACHE_FILE,
+                        help='The file caching the traces by the content hash of the snippets')
+
+    parser.add_argument('-e', '--expected', type=str, default=EXPECTED_FILE,
+                        help='The call graph file of every snippet to compare the traces with')
+
+    parser.add_argument('-o', '--output', type=str,
+                        help='A JSON file to write the traced call graphs of all snippets to')
+
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='The number of snippets traced at once')
+
+    parser.add_argument('-t', '--timeout', type=int, default=TRACE_TIMEOUT,
+                        help='The seconds a snippet may run before it is stopped')
+
+    args = parser.parse_args()
+
+    traces, traced_count = trace_snippets(args.snippets, args.cache, args.workers, args.timeout)
+    print_differences(diff_callgraphs(args.snippets, traces, args.expected), len(traces), traced_count)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({snippet: trace['callgraph'] for snippet, trace in traces.items()}, file, indent=4)
+
+
+if __name__ == "__main__":
+    main()
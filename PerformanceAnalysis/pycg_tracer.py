@@ -0,0 +1,155 @@
+import ast
+import json
+import os
+import runpy
+import sys
+import threading
+
+# Runs one snippet of the MicroSuite-Python-PyCG and prints the calls it made as a call graph in the naming
+# scheme of the suite. It is started in an isolated interpreter per snippet, so it only uses the standard library.
+
+ENTRY_FILE = 'main.py'
+PYTHON_EXTENSION = '.py'
+PACKAGE_MODULE = '__init__'
+MODULE_CODE_NAME = '<module>'
+LAMBDA_CODE_NAME = '<lambda>'
+BUILTIN_PREFIX = '<builtin>'
+
+# Frames of comprehensions belong to the node they are written in
+TRANSPARENT_CODE_NAMES = {'<listcomp>', '<dictcomp>', '<setcomp>', '<genexpr>'}
+
+# Builtins called by the interpreter for class statements and imports rather than by the snippet
+IMPLICIT_BUILTINS = {'__build_class__', '__import__'}
+
+
+def get_module_name(snippet_path, file_path):
+    module_name = os.path.relpath(file_path, snippet_path)[:-len(PYTHON_EXTENSION)].replace(os.sep, '.')
+    return module_name[:-len(PACKAGE_MODULE) - 1] if module_name.endswith(f".{PACKAGE_MODULE}") else module_name
+
+
+def get_first_line(node):
+    # Code objects of decorated definitions start at their first decorator
+    return min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+
+
+def collect_names(node, scope, names, lambda_counts):
+    # Names of the functions and lambdas of a scope keyed like their code objects, by first line and code name.
+    # Lambdas are numbered in their scope in source order, class bodies name their methods but are no nodes.
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        # Decorators and defaults are evaluated in the enclosing scope
+        outer_nodes = list(node.decorator_list)
+        if not isinstance(node, ast.ClassDef):
+            outer_nodes += node.args.defaults + [default for default in node.args.kw_defaults if default is not None]
+        for outer_node in outer_nodes:
+            collect_names(outer_node, scope, names, lambda_counts)
+
+        name = f"{scope}.{node.name}"
+        names[(get_first_line(node), node.name)] = None if isinstance(node, ast.ClassDef) else name
+        for child in node.body:
+            collect_names(child, name, names, lambda_counts)
+        return
+
+    if isinstance(node, ast.Lambda):
+        lambda_counts[scope] = lambda_counts.get(scope, 0) + 1
+        scope = f"{scope}.<lambda{lambda_counts[scope]}>"
+        names[(node.lineno, LAMBDA_CODE_NAME)] = scope
+
+    for child in ast.iter_child_nodes(node):
+        collect_names(child, scope, names, lambda_counts)
+
+
+class SnippetNames(object):
+    # Names code objects of the snippet files, code of other files and class bodies has no name
+    def __init__(self, snippet_path):
+        self.snippet_path = snippet_path
+        self.module_names = {}
+        self.file_names = {}
+
+    def get_file_names(self, file_path):
+        if file_path not in self.file_names:
+            self.file_names[file_path] = {}
+            absolute_path = os.path.abspath(file_path)
+            if absolute_path.endswith(PYTHON_EXTENSION) and absolute_path.startswith(self.snippet_path + os.sep):
+                module_name = get_module_name(self.snippet_path, absolute_path)
+                with open(absolute_path, 'r', encoding='utf-8') as file:
+                    tree = ast.parse(file.read(), absolute_path)
+
+                self.module_names[file_path] = module_name
+                collect_names(tree, module_name, self.file_names[file_path], {})
+
+        return self.file_names[file_path]
+
+    def get_name(self, code):
+        names = self.get_file_names(code.co_filename)
+        if code.co_name == MODULE_CODE_NAME:
+            return self.module_names.get(code.co_filename)
+
+        return names.get((code.co_firstlineno, code.co_name))
+
+
+class CallGraphTracer(object):
+    def __init__(self, snippet_names):
+        self.snippet_names = snippet_names
+        self.callgraph = {}
+
+    def get_caller(self, frame):
+        # The nearest frame running a node of the snippet, library code calling back into the snippet is skipped
+        while frame is not None:
+            if frame.f_code.co_name not in TRANSPARENT_CODE_NAMES:
+                name = self.snippet_names.get_name(frame.f_code)
+                if name is not None:
+                    return name
+            frame = frame.f_back
+
+        return None
+
+    def add_call(self, caller, callee):
+        self.callgraph.setdefault(callee, set())
+        if caller is not None:
+            self.callgraph.setdefault(caller, set()).add(callee)
+
+    def profile(self, frame, event, arg):
+        if event == 'call':
+            callee = self.snippet_names.get_name(frame.f_code)
+            if callee is None:
+                return
+
+            # Modules run when they are imported, the suite has no edges for that
+            caller = None if frame.f_code.co_name == MODULE_CODE_NAME else self.get_caller(frame.f_back)
+            self.add_call(caller, callee)
+        elif (event == 'c_call' and getattr(arg, '__module__', None) == 'builtins' and
+              arg.__name__ not in IMPLICIT_BUILTINS):
+            caller = self.get_caller(frame)
+            if caller is not None:
+                self.add_call(caller, f"{BUILTIN_PREFIX}.{arg.__name__}")
+
+
+def trace_snippet(snippet_path):
+    snippet_path = os.path.abspath(snippet_path)
+    os.chdir(snippet_path)
+    sys.path.insert(0, snippet_path)
+
+    tracer = CallGraphTracer(SnippetNames(snippet_path))
+    error = None
+
+    # The output of the snippet would mix with the call graph
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    threading.setprofile(tracer.profile)
+    sys.setprofile(tracer.profile)
+    try:
+        runpy.run_path(os.path.join(snippet_path, ENTRY_FILE), run_name='__main__')
+    except BaseException as exception:
+        error = f"{type(exception).__name__}: {exception}"
+    finally:
+        sys.setprofile(None)
+        threading.setprofile(None)
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    callgraph = {source: sorted(targets) for source, targets in sorted(tracer.callgraph.items())}
+    json.dump({'callgraph': callgraph, 'error': error}, sys.stdout)
+
+
+if __name__ == "__main__":
+    trace_snippet(sys.argv[1])
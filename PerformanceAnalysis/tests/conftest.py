@@ -0,0 +1,18 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+# The scripts import the loaders and comparison packages from the PerformanceAnalysis folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIXTURES_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+SAMPLE_PROJECT = 'sample'
+
+
+@pytest.fixture
+def data_folder(tmp_path):
+    # A copy of the sample project, so tests may write caches and checkpoints next to the inputs
+    shutil.copytree(os.path.join(FIXTURES_FOLDER, SAMPLE_PROJECT), tmp_path / SAMPLE_PROJECT)
+    return str(tmp_path)
@@ -0,0 +1,69 @@
+import os
+import shutil
+
+import pytest
+
+from conftest import FIXTURES_FOLDER, SAMPLE_PROJECT
+from loaders.data_loader import EvaluationLevel
+from loaders.jarviz import JarvizDataLoader
+from loaders.refexpo import RefExpoDataLoader
+from loaders.symbol_table import SymbolTable
+
+analyzer = pytest.importorskip('macro_performance_analyzer')
+
+
+def test_out_of_core_removes_partitions_folder(data_folder):
+    symbol_table = SymbolTable()
+    level_loaders = {EvaluationLevel.CLASS: [
+        RefExpoDataLoader(SAMPLE_PROJECT, data_folder=data_folder, symbol_table=symbol_table),
+        JarvizDataLoader(SAMPLE_PROJECT, data_folder=data_folder, symbol_table=symbol_table)]}
+    folder = os.path.join(data_folder, SAMPLE_PROJECT, '.partitions')
+
+    in_memory = analyzer.compare_relations(
+        [dl.load(EvaluationLevel.CLASS) for dl in level_loaders[EvaluationLevel.CLASS]])
+    out_of_core = analyzer.compare_relations_out_of_core(level_loaders, folder, 4, 1 << 20, 1)
+
+    assert out_of_core[EvaluationLevel.CLASS].get_sizes() == in_memory.get_sizes()
+    assert out_of_core[EvaluationLevel.CLASS].get_shared_count() == in_memory.get_shared_count()
+    assert not os.path.exists(folder)
+
+
+def test_batch_runs_one_job_per_project(tmp_path, monkeypatch):
+    shutil.copytree(os.path.join(FIXTURES_FOLDER, SAMPLE_PROJECT), tmp_path / 'data' / SAMPLE_PROJECT)
+    monkeypatch.chdir(tmp_path)
+
+    jobs = analyzer.find_batch_jobs()
+    assert jobs == [(SAMPLE_PROJECT, list(EvaluationLevel))]
+
+    rows = analyzer.run_batch_job(SAMPLE_PROJECT, list(EvaluationLevel), True)
+    assert not any(row['error'] for row in rows)
+    assert [row['evaluation'] for row in rows if row['metric'] == 'total edges'] == \
+           [evaluation_level.name for evaluation_level in EvaluationLevel]
+
+
+@pytest.mark.parametrize('evaluation_level', [EvaluationLevel.CLASS, EvaluationLevel.METHOD],
+                         ids=lambda evaluation_level: evaluation_level.name)
+def test_following_a_single_level_matches_loading(evaluation_level, data_folder):
+    symbol_table = SymbolTable()
+    followed_loader = RefExpoDataLoader(SAMPLE_PROJECT, data_folder=data_folder, symbol_table=symbol_table)
+    level_loaders = {evaluation_level: [
+        followed_loader, JarvizDataLoader(SAMPLE_PROJECT, data_folder=data_folder, symbol_table=symbol_table)]}
+
+    loaded = analyzer.compare_relations([dl.load(evaluation_level) for dl in level_loaders[evaluation_level]])
+    followed = analyzer.compare_relations_following(level_loaders, followed_loader, 0.01, 0.05, 1)
+
+    assert list(followed) == [evaluation_level]
+    assert followed[evaluation_level].get_sizes() == loaded.get_sizes()
+    assert followed[evaluation_level].get_shared_count() == loaded.get_shared_count()
+
+
+@pytest.mark.parametrize('interval', ['0', '-5'])
+def test_checkpoint_interval_must_be_positive(interval, monkeypatch, capsys):
+    monkeypatch.setattr('sys.argv', ['macro_performance_analyzer.py', '-p', SAMPLE_PROJECT, '-e', 'CLASS',
+                                     '--resume', '--checkpoint-interval', interval])
+
+    with pytest.raises(SystemExit) as error:
+        analyzer.main()
+
+    assert error.value.code == 2
+    assert '--checkpoint-interval must be a positive number of seconds' in capsys.readouterr().err
@@ -0,0 +1,73 @@
+import os
+
+from conftest import SAMPLE_PROJECT
+from loaders.cache import EdgeCache, get_cache_folder
+from loaders.data_loader import EvaluationLevel
+from loaders.pyan import PyanDataLoader
+from loaders.refexpo import RefExpoDataLoader
+
+LEVELS = [EvaluationLevel.CLASS, EvaluationLevel.METHOD]
+
+
+def create_cache(data_folder):
+    return EdgeCache(get_cache_folder(SAMPLE_PROJECT, data_folder))
+
+
+def test_cached_edges_are_returned(data_folder):
+    cache = create_cache(data_folder)
+    loader = RefExpoDataLoader(SAMPLE_PROJECT, data_folder=data_folder, cache=cache)
+    levels = loader.load_pass(LEVELS)
+
+    cached_loader = RefExpoDataLoader(SAMPLE_PROJECT, data_folder=data_folder)
+    cached_levels = cache.load(cached_loader, LEVELS)
+    assert cached_levels is not None
+    for evaluation_level in LEVELS:
+        assert (set(cached_loader.symbol_table.format_edges(cached_levels[evaluation_level])) ==
+                set(loader.symbol_table.format_edges(levels[evaluation_level])))
+
+
+def test_changed_input_invalidates_the_cache(data_folder):
+    cache = create_cache(data_folder)
+    loader = RefExpoDataLoader(SAMPLE_PROJECT, data_folder=data_folder, cache=cache)
+    loader.load_pass(LEVELS)
+
+    with open(loader.get_file_path(), 'a') as file:
+        file.write("a/B.java,1,B,a.B,m,a.B.m,B.m,a/C.java,2,C,a.C,n,a.C.n,C.n\n")
+    assert cache.load(RefExpoDataLoader(SAMPLE_PROJECT, data_folder=data_folder), LEVELS) is None
+
+
+def test_loader_version_invalidates_the_cache(data_folder):
+    cache = create_cache(data_folder)
+    RefExpoDataLoader(SAMPLE_PROJECT, data_folder=data_folder, cache=cache).load_pass(LEVELS)
+
+    class ChangedRefExpoDataLoader(RefExpoDataLoader):
+        version = RefExpoDataLoader.version + 1
+
+    # The class name is part of the key as well, only the version differs here
+    ChangedRefExpoDataLoader.__name__ = RefExpoDataLoader.__name__
+    assert cache.load(ChangedRefExpoDataLoader(SAMPLE_PROJECT, data_folder=data_folder), LEVELS) is None
+
+
+def test_changed_paths_invalidate_rolled_up_edges(data_folder):
+    cache = create_cache(data_folder)
+    levels = [EvaluationLevel.FILE, EvaluationLevel.CLASS]
+    PyanDataLoader(SAMPLE_PROJECT, data_folder=data_folder, cache=cache).load_pass(levels)
+    assert cache.load(PyanDataLoader(SAMPLE_PROJECT, data_folder=data_folder), levels) is not None
+
+    with open(os.path.join(data_folder, SAMPLE_PROJECT, 'paths.txt'), 'a') as file:
+        file.write("./pkg/extra.py\n")
+    assert cache.load(PyanDataLoader(SAMPLE_PROJECT, data_folder=data_folder), levels) is None
+
+
+def test_fingerprints_are_kept_per_input(data_folder):
+    cache = create_cache(data_folder)
+    refexpo_loader = RefExpoDataLoader(SAMPLE_PROJECT, data_folder=data_folder)
+    pyan_loader = PyanDataLoader(SAMPLE_PROJECT, data_folder=data_folder)
+
+    # Processes fingerprinting different inputs at once never write the same file
+    cache.get_fingerprint(refexpo_loader.get_file_path())
+    cache.get_fingerprint(pyan_loader.get_file_path())
+    assert cache.get_fingerprint_path(refexpo_loader.get_file_path()) != \
+           cache.get_fingerprint_path(pyan_loader.get_file_path())
+    assert cache.load_fingerprint(refexpo_loader.get_file_path())['hash'] == \
+           cache.hash_file(refexpo_loader.get_file_path())
@@ -0,0 +1,92 @@
+import gzip
+import os
+import shutil
+
+import pytest
+
+from conftest import SAMPLE_PROJECT
+from loaders.checkpoint import Checkpoint
+from loaders.data_loader import EvaluationLevel
+from loaders.dependency_finder import DependencyFinderDataLoader
+from loaders.refexpo import RefExpoDataLoader
+from loaders.symbol_table import SymbolTable, concatenate_edges, unique_edges
+from loaders.utils import iter_csv_record_blocks
+
+LEVELS = [EvaluationLevel.CLASS, EvaluationLevel.METHOD]
+
+# Small blocks so the sample export has record boundaries to resume from
+BLOCK_SIZE = 4096
+
+
+def prepare_export(data_folder, compression):
+    file_path = os.path.join(data_folder, SAMPLE_PROJECT, 'refExpo.csv')
+    if compression == 'gzip':
+        with open(file_path, 'rb') as source, gzip.open(f"{file_path}.gz", 'wb') as target:
+            shutil.copyfileobj(source, target)
+        return file_path, f"{file_path}.gz"
+
+    return file_path, file_path
+
+
+def format_levels(loader, levels):
+    return {evaluation_level: set(loader.symbol_table.format_edges(edges)) for evaluation_level, edges in
+            levels.items()}
+
+
+@pytest.mark.parametrize('compression', [None, 'gzip'])
+def test_record_blocks_resume_at_their_offsets(data_folder, compression):
+    plain_path, file_path = prepare_export(data_folder, compression)
+    blocks = list(iter_csv_record_blocks(file_path, block_size=BLOCK_SIZE))
+    assert len(blocks) > 2
+
+    with open(plain_path, 'rb') as file:
+        data = file.read()
+    _, _, offset = blocks[1]
+    resumed_records = b"".join(records for _, records, _ in iter_csv_record_blocks(file_path, offset, BLOCK_SIZE))
+    assert resumed_records == data[offset:]
+
+
+@pytest.mark.parametrize('compression', [None, 'gzip'])
+def test_refexpo_resumes_from_a_checkpoint(data_folder, compression):
+    plain_path, file_path = prepare_export(data_folder, compression)
+    _, _, offset = list(iter_csv_record_blocks(file_path, block_size=BLOCK_SIZE))[1]
+
+    # The checkpoint of a parse interrupted after the records before offset
+    with open(plain_path, 'rb') as file:
+        parsed_part = file.read(offset)
+    part_path = os.path.join(data_folder, 'refExpo.part.csv')
+    with open(part_path, 'wb') as file:
+        file.write(parsed_part)
+
+    symbol_table = SymbolTable()
+    parsed_levels = RefExpoDataLoader(None, file_path=part_path, symbol_table=symbol_table).load_levels(LEVELS)
+    loader = RefExpoDataLoader(None, file_path=file_path, symbol_table=symbol_table, checkpoint_interval=3600,
+                               resume=True)
+    Checkpoint(loader, LEVELS).store({'offset': offset}, parsed_levels)
+
+    resumed_levels = loader.load_levels(LEVELS)
+    assert not os.path.exists(Checkpoint(loader, LEVELS).path)
+
+    complete_loader = RefExpoDataLoader(None, file_path=file_path)
+    assert format_levels(loader, resumed_levels) == format_levels(complete_loader, complete_loader.load_levels(LEVELS))
+
+
+def test_dependency_finder_resumes_between_classes(data_folder, monkeypatch):
+    monkeypatch.setattr('loaders.dependency_finder.XML_BLOCK_SIZE', 64)
+    levels = [EvaluationLevel.FILE, EvaluationLevel.CLASS]
+    loader = DependencyFinderDataLoader(SAMPLE_PROJECT, data_folder=data_folder, chunk_size=1,
+                                        checkpoint_interval=3600, resume=True)
+
+    chunks = list(loader.iter_positioned_chunks(levels))
+    resumable_indexes = [index for index, (_, position) in enumerate(chunks[:-1]) if position is not None]
+    assert len(resumable_indexes) > 1
+
+    complete_loader = DependencyFinderDataLoader(SAMPLE_PROJECT, data_folder=data_folder)
+    complete_levels = format_levels(complete_loader, complete_loader.load_levels(levels))
+
+    # Resuming after any chunk with a position gives the edges of a complete parse
+    for index in resumable_indexes:
+        parsed_levels = {evaluation_level: unique_edges(concatenate_edges(
+            [chunk[evaluation_level] for chunk, _ in chunks[:index + 1]])) for evaluation_level in levels}
+        Checkpoint(loader, levels).store(chunks[index][1], parsed_levels)
+        assert format_levels(loader, loader.load_levels(levels)) == complete_levels, index
@@ -0,0 +1,64 @@
+import os
+
+from comparison.delta import EdgeDelta, diff_snapshots
+from conftest import SAMPLE_PROJECT
+from edge_diff import iter_snapshot_chunks, load_snapshot
+from loaders.data_loader import EvaluationLevel
+from loaders.symbol_table import SymbolTable
+
+LEVELS = list(EvaluationLevel)
+
+
+def write_new_export(data_folder):
+    # The newer export drops the first records and adds a few others
+    old_path = os.path.join(data_folder, SAMPLE_PROJECT, 'refExpo.csv')
+    with open(old_path, 'r') as file:
+        lines = file.readlines()
+
+    new_path = os.path.join(data_folder, 'refExpo.new.csv')
+    with open(new_path, 'w') as file:
+        file.writelines([lines[0]] + lines[40:])
+        file.write("src/a/B.java,1,B,a.B,m,a.B.m,B.m,src/a/C.java,2,C,a.C,n,a.C.n,C.n\n"
+                   "src/a/C.java,3,C,a.C,n,a.C.n,C.n,src/d/E.java,4,E,d.E,o,d.E.o,E.o\n")
+
+    return old_path, new_path
+
+
+def format_levels(levels, symbol_table):
+    return {evaluation_level: set(symbol_table.format_edges(edges)) for evaluation_level, edges in levels.items()}
+
+
+def test_diff_and_apply_rebuild_the_new_snapshot(data_folder, tmp_path):
+    old_path, new_path = write_new_export(data_folder)
+
+    symbol_table = SymbolTable()
+    delta, sizes = diff_snapshots(iter_snapshot_chunks(old_path, LEVELS, symbol_table),
+                                  iter_snapshot_chunks(new_path, LEVELS, symbol_table), LEVELS, str(tmp_path),
+                                  run_size=16)
+    assert all(len(delta.added[evaluation_level]) for evaluation_level in LEVELS)
+    assert all(len(delta.removed[evaluation_level]) for evaluation_level in LEVELS)
+    delta_path = str(tmp_path / 'delta.npz')
+    delta.store(delta_path, symbol_table)
+
+    # Applied in a fresh symbol table, as edge_diff.py apply does
+    apply_table = SymbolTable()
+    applied_levels = EdgeDelta.load(delta_path, apply_table).apply(load_snapshot(old_path, LEVELS, apply_table))
+
+    new_table = SymbolTable()
+    new_levels = load_snapshot(new_path, LEVELS, new_table)
+    assert format_levels(applied_levels, apply_table) == format_levels(new_levels, new_table)
+    for evaluation_level in LEVELS:
+        assert sizes[evaluation_level][1] == len(new_levels[evaluation_level])
+
+
+def test_stored_snapshot_reads_like_the_export(data_folder, tmp_path):
+    old_path, _ = write_new_export(data_folder)
+    symbol_table = SymbolTable()
+    levels = load_snapshot(old_path, LEVELS, symbol_table)
+
+    snapshot_path = str(tmp_path / 'old.npz')
+    EdgeDelta(added=levels).store(snapshot_path, symbol_table)
+
+    snapshot_table = SymbolTable()
+    assert format_levels(load_snapshot(snapshot_path, LEVELS, snapshot_table), snapshot_table) == \
+           format_levels(levels, symbol_table)
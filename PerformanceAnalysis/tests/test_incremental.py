@@ -0,0 +1,22 @@
+import numpy as np
+
+from comparison.incremental import IncrementalComparison
+from comparison.membership import MembershipRegions
+
+
+def test_incremental_regions_match_batch_regions():
+    random = np.random.default_rng(7)
+    key_arrays = [np.unique(random.integers(0, 2000, size)) for size in [800, 1200, 600]]
+    growing_keys = random.integers(0, 2000, 3000)
+
+    comparison = IncrementalComparison([key_arrays[0], np.empty(0, dtype=np.int64), key_arrays[2]], 1)
+    # Blocks repeat keys within and across each other
+    for block in np.array_split(growing_keys, 17):
+        comparison.add_keys(block)
+
+    assert np.array_equal(comparison.seen_keys, np.unique(growing_keys))
+    assert comparison.get_size() == len(np.unique(growing_keys))
+
+    expected = MembershipRegions.from_key_arrays([key_arrays[0], np.unique(growing_keys), key_arrays[2]])
+    assert np.array_equal(comparison.regions.masks, expected.masks)
+    assert np.array_equal(comparison.regions.counts, expected.counts)
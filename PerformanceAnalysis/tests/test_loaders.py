@@ -0,0 +1,76 @@
+import json
+import os
+
+import pytest
+
+from conftest import FIXTURES_FOLDER, SAMPLE_PROJECT
+from loaders.data_loader import EvaluationLevel
+from loaders.dependency_finder import DependencyFinderDataLoader
+from loaders.jarviz import JarvizDataLoader
+from loaders.pycg import PyCGDataLoader
+from loaders.pyan import PyanDataLoader
+from loaders.refexpo import RefExpoDataLoader
+from loaders.snoragraph import SonargraphDataLoader
+
+LOADERS = [RefExpoDataLoader, JarvizDataLoader, DependencyFinderDataLoader, SonargraphDataLoader, PyanDataLoader,
+           PyCGDataLoader]
+
+# Distinct edges of the levels the loaders had before they were rewritten, produced by the original loaders
+with open(os.path.join(FIXTURES_FOLDER, 'baseline_edges.json'), 'r') as file:
+    BASELINE_EDGES = json.load(file)
+
+
+def load_edge_names(loader, evaluation_level):
+    return set(loader.symbol_table.format_edges(loader.load(evaluation_level)))
+
+
+@pytest.mark.parametrize('loader_class', LOADERS, ids=lambda loader_class: loader_class.__name__)
+def test_loaders_match_baseline(loader_class, data_folder):
+    loader = loader_class(SAMPLE_PROJECT, data_folder=data_folder)
+    for level_name, edges in BASELINE_EDGES[loader.get_file_name()].items():
+        assert load_edge_names(loader, EvaluationLevel[level_name]) == set(edges), level_name
+
+
+def test_parallel_jarviz_matches_sequential(data_folder):
+    sequential = JarvizDataLoader(SAMPLE_PROJECT, data_folder=data_folder)
+    parallel = JarvizDataLoader(SAMPLE_PROJECT, data_folder=data_folder, workers=2)
+    for evaluation_level in [EvaluationLevel.FILE, EvaluationLevel.CLASS, EvaluationLevel.METHOD]:
+        assert load_edge_names(parallel, evaluation_level) == load_edge_names(sequential, evaluation_level)
+
+
+def test_jarviz_tolerates_null_names(tmp_path):
+    jarviz_path = tmp_path / 'jarviz.jsonl'
+    jarviz_path.write_text('{"sourceClass": null, "sourceMethod": "run", "targetClass": "a.B$C", "targetMethod": null}\n'
+                           '{"sourceClass": "a.D", "sourceMethod": "go", "targetClass": "a.B", "targetMethod": "m"}\n')
+
+    loader = JarvizDataLoader(None, file_path=str(jarviz_path))
+    assert load_edge_names(loader, EvaluationLevel.CLASS) == {'None->a.B.C', 'a.D->a.B'}
+    assert load_edge_names(loader, EvaluationLevel.METHOD) == {'None:run->a.B$C:None', 'a.D:go->a.B:m'}
+
+
+@pytest.mark.parametrize('loader_class', [JarvizDataLoader, PyanDataLoader, PyCGDataLoader],
+                         ids=lambda loader_class: loader_class.__name__)
+def test_chunked_loaders_match_baseline(loader_class, data_folder):
+    loader = loader_class(SAMPLE_PROJECT, data_folder=data_folder, chunk_size=7)
+    assert len(list(loader.iter_level_chunks([EvaluationLevel.METHOD]))) > 1
+    for level_name, edges in BASELINE_EDGES[loader.get_file_name()].items():
+        assert load_edge_names(loader, EvaluationLevel[level_name]) == set(edges), level_name
+
+
+def test_dependency_finder_files_are_outer_classes(data_folder):
+    # Inner classes belong to the file of their outer class, edges inside a file are dropped
+    loader = DependencyFinderDataLoader(SAMPLE_PROJECT, data_folder=data_folder)
+    assert load_edge_names(loader, EvaluationLevel.FILE) == {
+        'com.acme.core.Foo->com.acme.util.Bar', 'com.acme.util.Bar->com.acme.core.Foo',
+        'com.acme.util.Baz->com.acme.core.Foo'}
+
+
+@pytest.mark.parametrize('evaluation_level', [EvaluationLevel.CLASS, EvaluationLevel.METHOD],
+                         ids=lambda evaluation_level: evaluation_level.name)
+def test_followed_refexpo_yields_requested_levels(evaluation_level, data_folder):
+    loader = RefExpoDataLoader(SAMPLE_PROJECT, data_folder=data_folder)
+    chunks = list(loader.follow([evaluation_level], 0.01, 0.05))
+
+    assert chunks and all(list(chunk) == [evaluation_level] for chunk in chunks)
+    edges = set().union(*(loader.symbol_table.format_edges(chunk[evaluation_level]) for chunk in chunks))
+    assert edges == set(BASELINE_EDGES[loader.get_file_name()][evaluation_level.name])
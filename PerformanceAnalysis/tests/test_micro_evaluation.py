@@ -0,0 +1,48 @@
+import json
+import math
+
+from micro_evaluation_pycg import UNDEFINED_METRIC, create_report, format_metric, write_report
+
+
+def create_result(tp, fp, fn):
+    return {'covered': tp > 0, 'mismatches': [], 'tp': tp, 'fp': fp, 'fn': fn}
+
+
+# Every feature has categories without any reference, whose precision or recall is undefined
+EVALUATION = {
+    'arguments': {'call': create_result(3, 1, 0), 'nested': create_result(0, 0, 2), 'lambda': create_result(2, 2, 1),
+                  'kwargs': create_result(4, 0, 1), 'missing': None},
+    'classes': {'base': create_result(5, 1, 2), 'super': create_result(0, 3, 0), 'mro': create_result(1, 0, 0)},
+    'empty': {'none': create_result(0, 0, 0)},
+}
+
+
+def assert_contains(interval, value):
+    # Undefined categories must not drag the bounds out of the range of the metrics
+    assert 0 <= interval[0] and interval[0] - 1e-9 <= value <= interval[1] + 1e-9 and interval[1] <= 1, \
+        (interval, value)
+
+
+def test_intervals_contain_the_point_estimates():
+    report = create_report(EVALUATION, resamples=2000, seed=1)
+    for analysis in ['total', 'averaged']:
+        feature_analysis, precision, recall = report[analysis]
+        intervals = report['intervals'][analysis]
+        assert_contains(intervals['total']['precision'], precision)
+        assert_contains(intervals['total']['recall'], recall)
+
+        for feature in ['arguments', 'classes']:
+            assert_contains(intervals['features'][feature]['precision'], feature_analysis[feature]['precision'])
+            assert_contains(intervals['features'][feature]['recall'], feature_analysis[feature]['recall'])
+
+
+def test_undefined_metrics_are_reported_as_sentinel(tmp_path):
+    report = create_report(EVALUATION, resamples=100, seed=1)
+    assert math.isnan(report['averaged'][0]['empty']['precision'])
+    assert format_metric(math.nan, (math.nan, math.nan)) == f"{UNDEFINED_METRIC:.2f} [-1.00, -1.00]"
+
+    json_path = tmp_path / 'report.json'
+    write_report(report, str(json_path))
+    written = json.loads(json_path.read_text())
+    assert written['averaged'][0]['empty']['precision'] == UNDEFINED_METRIC
+    assert written['intervals']['averaged']['features']['empty']['recall'] == [UNDEFINED_METRIC, UNDEFINED_METRIC]
@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+from conftest import SAMPLE_PROJECT
+from loaders.data_loader import EvaluationLevel
+from loaders.jarviz import JarvizDataLoader
+from loaders.parallel import load_in_parallel
+from loaders.refexpo import RefExpoDataLoader
+from loaders.snoragraph import SonargraphDataLoader
+from loaders.symbol_table import SymbolTable
+
+LOADERS = [RefExpoDataLoader, JarvizDataLoader, SonargraphDataLoader]
+
+SHARED_MEMORY_FOLDER = '/dev/shm'
+
+
+def create_loaders(data_folder):
+    symbol_table = SymbolTable()
+    return [loader_class(SAMPLE_PROJECT, data_folder=data_folder, symbol_table=symbol_table) for loader_class in
+            LOADERS]
+
+
+def test_parallel_loading_matches_sequential(data_folder):
+    pooled_loaders = create_loaders(data_folder)
+    pooled_levels = load_in_parallel(pooled_loaders, EvaluationLevel.CLASS, 2)
+
+    for loader, edges in zip(create_loaders(data_folder), pooled_levels):
+        assert set(loader.symbol_table.format_edges(loader.load(EvaluationLevel.CLASS))) == \
+               set(pooled_loaders[0].symbol_table.format_edges(edges))
+
+
+@pytest.mark.skipif(not os.path.isdir(SHARED_MEMORY_FOLDER), reason='shared memory blocks are not listed as files')
+def test_parallel_loading_releases_shared_memory(data_folder):
+    data_loaders = create_loaders(data_folder)
+    # Loaders that split their input run on one process inside the pool
+    for loader in data_loaders[:2]:
+        loader.workers = 2
+
+    blocks = set(os.listdir(SHARED_MEMORY_FOLDER))
+    load_in_parallel(data_loaders, EvaluationLevel.METHOD, 2)
+
+    assert set(os.listdir(SHARED_MEMORY_FOLDER)) <= blocks
@@ -0,0 +1,64 @@
+from collections import defaultdict
+
+from conftest import SAMPLE_PROJECT
+from loaders.data_loader import EvaluationLevel
+from loaders.provenance import ProvenanceIndex, get_provenance_folder
+from loaders.refexpo import REFEXPO_COLUMNS, RefExpoDataLoader
+from loaders.utils import read_csv_bytes, read_csv_records
+
+LEVELS = list(EvaluationLevel)
+
+
+def get_expected_offsets(loader):
+    # The sample export has a record per line, so the offset of a row is the length of the lines before it
+    with open(loader.get_file_path(), 'rb') as file:
+        data = file.read()
+    header_end = data.index(b'\n') + 1
+    line_offsets = [header_end]
+    for line in data[header_end:].splitlines(keepends=True):
+        line_offsets.append(line_offsets[-1] + len(line))
+
+    expected_offsets = {evaluation_level: defaultdict(list) for evaluation_level in LEVELS}
+    relations = loader.get_level_relations(read_csv_bytes(data, REFEXPO_COLUMNS), LEVELS)
+    for evaluation_level, (sources, targets) in relations.items():
+        for row, source, target in zip(sources.index, sources, targets):
+            expected_offsets[evaluation_level][(source, target)].append(line_offsets[row])
+
+    return expected_offsets
+
+
+def test_lookup_returns_the_offsets_of_every_record(data_folder):
+    loader = RefExpoDataLoader(SAMPLE_PROJECT, data_folder=data_folder)
+    loader.provenance_index = ProvenanceIndex(get_provenance_folder(loader.get_file_path()))
+    levels = loader.load_levels_with_provenance(LEVELS)
+    assert loader.provenance_index.is_current(loader, LEVELS)
+
+    # Looked up by a later run, which only has the index
+    index = ProvenanceIndex(get_provenance_folder(loader.get_file_path()))
+    for evaluation_level, edge_offsets in get_expected_offsets(loader).items():
+        assert len(edge_offsets) == len(levels[evaluation_level])
+        for (source, target), offsets in edge_offsets.items():
+            assert index.lookup(source, target, evaluation_level).tolist() == offsets
+
+
+def test_lookup_reads_the_records_back(data_folder):
+    loader = RefExpoDataLoader(SAMPLE_PROJECT, data_folder=data_folder)
+    loader.provenance_index = ProvenanceIndex(get_provenance_folder(loader.get_file_path()))
+    edges = loader.load_levels_with_provenance([EvaluationLevel.CLASS])[EvaluationLevel.CLASS]
+
+    source, target = loader.symbol_table.get_symbols(edges[0])
+    offsets = loader.provenance_index.lookup(source, target, EvaluationLevel.CLASS)
+    for record in read_csv_records(loader.get_file_path(), offsets):
+        assert (record['sourceClassFull'], record['targetClassFull']) == (source, target)
+
+    assert len(loader.provenance_index.lookup(source, 'com.acme.Missing', EvaluationLevel.CLASS)) == 0
+
+
+def test_changed_export_outdates_the_index(data_folder):
+    loader = RefExpoDataLoader(SAMPLE_PROJECT, data_folder=data_folder)
+    loader.provenance_index = ProvenanceIndex(get_provenance_folder(loader.get_file_path()))
+    loader.load_levels_with_provenance(LEVELS)
+
+    with open(loader.get_file_path(), 'a') as file:
+        file.write("src/a/B.java,1,B,a.B,m,a.B.m,B.m,src/a/C.java,2,C,a.C,n,a.C.n,C.n\n")
+    assert not loader.provenance_index.is_current(loader, LEVELS)
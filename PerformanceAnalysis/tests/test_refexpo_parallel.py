@@ -0,0 +1,62 @@
+import csv
+import io
+import os
+
+import pytest
+
+from conftest import SAMPLE_PROJECT
+from loaders.data_loader import EvaluationLevel
+from loaders.refexpo import RefExpoDataLoader
+from loaders.utils import split_csv_ranges
+
+LEVELS = list(EvaluationLevel)
+
+
+def write_quoted_export(data_folder):
+    # Every few records get paths and names holding commas, quotes and line ends inside quoted fields
+    with open(os.path.join(data_folder, SAMPLE_PROJECT, 'refExpo.csv'), 'r', newline='') as file:
+        rows = list(csv.reader(file))
+
+    for index, row in enumerate(rows[1:], 1):
+        if index % 7 == 0:
+            row[0] = row[0].replace('/', ',\n/', 1)
+        if index % 11 == 0:
+            row[4] = f'{row[4]}"x,\n"'
+
+    data = io.StringIO()
+    csv.writer(data, lineterminator='\n').writerows(rows)
+    file_path = os.path.join(data_folder, 'refExpo.quoted.csv')
+    with open(file_path, 'w', newline='') as file:
+        file.write(data.getvalue())
+
+    return file_path
+
+
+def load_edge_names(loader):
+    return {evaluation_level: set(loader.symbol_table.format_edges(edges)) for evaluation_level, edges in
+            loader.load_levels(LEVELS).items()}
+
+
+@pytest.mark.parametrize('quoted', [False, True])
+def test_parallel_reader_matches_sequential(data_folder, monkeypatch, quoted):
+    # Small probes so record starts are searched for in several steps
+    monkeypatch.setattr('loaders.utils.CSV_PROBE_SIZE', 256)
+    file_path = write_quoted_export(data_folder) if quoted else os.path.join(data_folder, SAMPLE_PROJECT,
+                                                                             'refExpo.csv')
+
+    assert len(split_csv_ranges(file_path, 8)) > 1
+    parallel_loader = RefExpoDataLoader(None, file_path=file_path, workers=2)
+    assert parallel_loader.use_parallel_reader()
+    assert load_edge_names(parallel_loader) == load_edge_names(RefExpoDataLoader(None, file_path=file_path))
+
+
+def test_csv_ranges_start_at_records(data_folder):
+    file_path = write_quoted_export(data_folder)
+    with open(file_path, 'rb') as file:
+        data = file.read()
+
+    ranges = split_csv_ranges(file_path, 8)
+    header_end = data.index(b'\n') + 1
+    assert ranges[0][0] == header_end and ranges[-1][1] == len(data)
+    records = [row for start, end in ranges for row in csv.reader(io.StringIO(data[start:end].decode('utf-8')))]
+    assert records == list(csv.reader(io.StringIO(data[header_end:].decode('utf-8'))))
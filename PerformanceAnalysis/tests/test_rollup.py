@@ -0,0 +1,34 @@
+from loaders.data_loader import EvaluationLevel
+from loaders.pycg import PyCGDataLoader
+from loaders.rollup import CLASS_PARENT, RollUp, create_roll_up
+from loaders.symbol_table import SymbolTable
+
+MODULE_FILES = {'pkg.mod': 'pkg.mod', 'pkg': 'pkg.__init__'}
+
+
+def resolve_class(name):
+    return RollUp(SymbolTable(), MODULE_FILES).resolve(name)[CLASS_PARENT]
+
+
+def test_methods_roll_up_to_their_class():
+    assert resolve_class('pkg.mod.Foo.run') == 'pkg.mod.Foo'
+    assert resolve_class('pkg.mod.Outer.Inner.run') == 'pkg.mod.Outer.Inner'
+    assert resolve_class('pkg.mod._Private.run') == 'pkg.mod._Private'
+    assert resolve_class('pkg.mod.func') is None
+
+
+def test_nested_functions_stop_the_class_roll_up():
+    assert resolve_class('pkg.mod.Foo.run.helper') == 'pkg.mod.Foo'
+    assert resolve_class('pkg.mod.func.inner') is None
+    assert resolve_class('pkg.mod.func.Local.run') is None
+
+
+def test_roll_up_without_project():
+    symbol_table = SymbolTable()
+    roll_up = create_roll_up(PyCGDataLoader(None, file_path='pycg.json', symbol_table=symbol_table))
+    edges = symbol_table.create_edges(['pkg.mod.Foo.run', 'pkg.mod.Foo.run.helper'],
+                                      ['pkg.other.Bar.get', 'pkg.mod.func'])
+
+    levels = roll_up.roll_up_levels(edges, [EvaluationLevel.CLASS, EvaluationLevel.FILE])
+    assert symbol_table.format_edges(levels[EvaluationLevel.CLASS]) == ['pkg.mod.Foo->pkg.other.Bar']
+    assert symbol_table.format_edges(levels[EvaluationLevel.FILE]) == ['pkg.mod->pkg.other']
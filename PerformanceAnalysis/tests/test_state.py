@@ -0,0 +1,33 @@
+import os
+
+from loaders.state import get_file_fingerprint, load_json_state, store_json_state
+
+
+def test_json_state_round_trip(tmp_path):
+    state_path = str(tmp_path / 'state.json')
+    assert load_json_state(state_path) == {}
+
+    source_path = tmp_path / 'Case.java'
+    source_path.write_text('class Case {}\n')
+    state = {str(source_path): get_file_fingerprint(str(source_path))}
+    store_json_state(state_path, state)
+
+    assert load_json_state(state_path) == state
+    assert sorted(os.listdir(tmp_path)) == ['Case.java', 'state.json']
+
+    source_path.write_text('class Case { void run() {} }\n')
+    assert get_file_fingerprint(str(source_path)) != state[str(source_path)]
+
+
+def test_json_state_leaves_other_processes_temporary_files(tmp_path):
+    state_path = str(tmp_path / 'state.json')
+    # Temporary file of another run storing the same state at this moment
+    other_path = f"{state_path}.{os.getpid() + 1}.tmp"
+    with open(other_path, 'w') as file:
+        file.write('{"other": ')
+
+    store_json_state(state_path, {'run': 1})
+
+    assert load_json_state(state_path) == {'run': 1}
+    with open(other_path, 'r') as file:
+        assert file.read() == '{"other": '
@@ -0,0 +1,61 @@
+import os
+
+from conftest import SAMPLE_PROJECT
+from loaders.data_loader import EvaluationLevel
+from loaders.refexpo import RefExpoDataLoader
+from loaders.store import EdgeStore, get_store_folder
+from loaders.symbol_table import SymbolTable
+
+LEVELS = list(EvaluationLevel)
+
+
+def load_refexpo_levels(file_path, symbol_table):
+    return RefExpoDataLoader(None, file_path=file_path, symbol_table=symbol_table).load_levels(LEVELS)
+
+
+def write_changed_export(data_folder):
+    # A later export with a few records dropped and one added
+    file_path = os.path.join(data_folder, SAMPLE_PROJECT, 'refExpo.csv')
+    with open(file_path, 'r') as file:
+        lines = file.readlines()
+
+    changed_path = os.path.join(data_folder, 'refExpo.changed.csv')
+    with open(changed_path, 'w') as file:
+        file.writelines(lines[:-5])
+        file.write("src/a/B.java,1,B,a.B,m,a.B.m,B.m,src/a/C.java,2,C,a.C,n,a.C.n,C.n\n")
+
+    return file_path, changed_path
+
+
+def test_materialized_snapshots_equal_the_exports(data_folder):
+    file_path, changed_path = write_changed_export(data_folder)
+    folder = get_store_folder(SAMPLE_PROJECT, data_folder)
+
+    store = EdgeStore(folder, SymbolTable())
+    store.add_snapshot('v1', load_refexpo_levels(file_path, store.symbol_table))
+    store.add_snapshot('v2', load_refexpo_levels(changed_path, store.symbol_table))
+
+    # Materialized by a later run, in a fresh symbol table
+    reopened_store = EdgeStore(folder, SymbolTable())
+    for name, path in [('v1', file_path), ('v2', changed_path)]:
+        symbol_table = SymbolTable()
+        levels = load_refexpo_levels(path, symbol_table)
+        for evaluation_level in LEVELS:
+            materialized_edges = reopened_store.materialize(name, evaluation_level)
+            assert len(materialized_edges) == len(levels[evaluation_level])
+            assert set(reopened_store.symbol_table.format_edges(materialized_edges)) == \
+                   set(symbol_table.format_edges(levels[evaluation_level]))
+
+
+def test_snapshot_churn_matches_the_set_difference(data_folder):
+    file_path, changed_path = write_changed_export(data_folder)
+    store = EdgeStore(get_store_folder(SAMPLE_PROJECT, data_folder), SymbolTable())
+    old_levels = load_refexpo_levels(file_path, store.symbol_table)
+    new_levels = load_refexpo_levels(changed_path, store.symbol_table)
+    store.add_snapshot('v1', old_levels)
+    store.add_snapshot('v2', new_levels)
+
+    for evaluation_level in LEVELS:
+        old_edges = set(store.symbol_table.format_edges(old_levels[evaluation_level]))
+        new_edges = set(store.symbol_table.format_edges(new_levels[evaluation_level]))
+        assert store.get_churn('v1', 'v2', evaluation_level) == (len(old_edges - new_edges), len(new_edges - old_edges))